@@ -1,18 +1,23 @@
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
-from joblib import load
 
 from dialogue_manager.state import State
+from dialogue_manager.speculation import SpeculativeTask
 
-from utils.asr import record_audio, recognize_speech_fast
+from utils.asr import record_audio, recognize_speech_fast, record_audio_streaming
 from utils.asr import recognize_speech
 from user.log_utils import log_user_query
 from user.get_location import get_location
 
-from recommendation_engine.recommender import recommend_places
+from recommendation_engine.recommender import recommendation_pages
 from recommendation_engine.prompt_builder import build_prompt, save_prompt
-from recommendation_engine.prompt_builder import update_prompt_history, load_prompt
+from recommendation_engine.prompt_builder import update_prompt_history
+from recommendation_engine.context_manager import DialogueContext
+from recommendation_engine.response_templates import ResponsePolicy, render_recommendations
+from recommendation_engine.response_templates import record_response_metrics
 from recommendation_engine.evaluation import collect_user_feedback, evaluate_recommendations
 from recommendation_engine.evaluation import is_empty_log_feedback
 from recommendation_engine.evaluation import compute_BERTScore, compute_ROUGE_L
@@ -21,24 +26,27 @@ from information_retriever.retriever import retrieve_stations
 from information_retriever.retriever import retrieve_restaurants
 from information_retriever.retriever import  retrieve_hobby_activity
 
-from language_model.gpt4_driver_assistant import get_response
-from language_model.llama_driver_assistant import get_llama_response
-from language_model.gemini_driver_assistant import get_gemini_response
-from language_model.deepseek_driver_assistant import get_deepseek_response
-from language_model.claude_driver_assistant import get_claude_response
+from language_model.async_client import TurnBudget, chat_with_deadline, stream_with_deadline
+from language_model.racing import RACING_ENABLED, race, race_stream
+from language_model.metrics import set_dialogue_state
 
+from intent_classifier.compact_model import load_intent_model
 from intent_classifier.classifier2 import get_intent
+from intent_classifier.hybrid_classifier import HybridIntentClassifier
+from intent_classifier.early_intent import EarlyIntentPredictor, SUPPORTED_INTENTS
 
 from preferences_database.update_preferences import add_history_entry
+from preferences_database.preference_profile import compile_preferences
 
 
 PROMPT_DIR = Path("prompts")
-# Path to the saved model
-MODEL_PATH = Path("intent_classifier/Models/intent_classifier.pkl")
+# Minimum local confidence to speculate on the local intent while the LLM
+# classifies the query (below it, the most recent intent is used instead)
+SPECULATION_MIN_CONFIDENCE = 0.4
 
 
 class DialogueManager:
-    def __init__(self, user_preferences:dict):
+    def __init__(self, user_preferences:dict, early_intent: bool = True, stream_responses: bool = True):
         """
         Initialize the DialogueManager with the user's preferences.
 
@@ -46,6 +54,10 @@ class DialogueManager:
             user_preferences (dict): A dictionary containing the user's settings,
                 including fuel type, preferred providers, max detour distance,
                 power requirements, and history.
+            early_intent (bool): predict the intent from partial transcripts and
+                start POI retrieval speculatively while the driver is talking.
+            stream_responses (bool): return LLM responses as a stream of text deltas
+                so they can be displayed and spoken sentence by sentence.
         """
         self.state = State.IDLE
 
@@ -54,17 +66,50 @@ class DialogueManager:
         self.exit = False
 
         self.user_preferences = user_preferences
+        # Compiled once for the retriever filters and the scoring
+        self.profile = compile_preferences(user_preferences)
 
         self.user_query = ""
         self.response_user = ""
 
-        self.model = load(MODEL_PATH)
+        # SpeechHandle of the reply currently being spoken (set by main.py)
+        self.playback = None
+        self.stream_responses = stream_responses
+        # Latency budget of the LLM calls of the current stage (LLM_TURN_BUDGET in .env):
+        # restarted for the intent classification and for the response, so that
+        # the driver's answers and the POI retrieval in between are not counted
+        self.turn_budget = None
+        # Recent turns verbatim + summary of the older ones, within a token budget
+        self.context = DialogueContext()
+        # Template or LLM for the listing turns (RESPONSE_MODE in .env)
+        self.response_policy = ResponsePolicy()
+
+        # Compact NumPy model (falls back to the joblib pipeline)
+        self.model = load_intent_model()
+        # Local model first, LLM only for low-confidence queries
+        self.intent_classifier = HybridIntentClassifier(self.model, llm_classifier=self._classify_with_llm)
         self.intent = ""
         self.keyword = ""
         self.feedback = None
 
+        # Early intent prediction + speculative retrieval
+        self.early_intent = early_intent
+        self.early_predictor = EarlyIntentPredictor(self.model)
+        self.speculation = SpeculativeTask(name="speculative-retrieval")
+
+        # Current location, resolved in the background once per turn
+        self.location_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="location")
+        self.location_future = None
+        # Intent of the previous turn (fallback guess for speculation)
+        self.last_intent = None
+        # Timestamps of the intent classification of the current turn
+        self.intent_started_at = 0.0
+        self.intent_finished_at = 0.0
+
         self.nearby_POIs = []
+        # Recommendations ranked so far; further pages are pulled on PROPOSE_NEXT
         self.recommendations = []
+        self.recommendation_pages = iter(())
         self.selected_recommendation = None
 
         self.timeToRecommendation = 0
@@ -78,6 +123,254 @@ class DialogueManager:
         self.ind = 0 
         self.bert_score = 0.0
         self.rouge_l_score = 0.0
+        # BERTScore/ROUGE-L of the first response, computed in the background
+        self.scoring_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="scoring")
+        self.scoring_future = None
+
+    def _retrieve_POIs(self, intent: str, keywords: list, latlon=None, location_input: str = "",
+                       should_stop=lambda: False) -> list:
+        """
+        Retrieve the nearby points of interest matching the intent.
+
+        Args:
+            intent (str): "stations", "restaurants" or "hobbies"
+            keywords (list): keywords returned by the intent classifier
+            latlon (Tuple[float, float]): GPS coordinates (optional)
+            location_input (str): user address (optional)
+            should_stop (Callable[[], bool]): polled before each API request (speculative retrievals)
+
+        Returns:
+            list: nearby points of interest
+        """
+        if intent == "stations":
+            return retrieve_stations(self.user_preferences, location_input=location_input, latlon=latlon, profile=self.profile,
+                                     should_stop=should_stop)
+        elif intent == "restaurants":
+            return retrieve_restaurants(self.user_preferences, keywords=keywords, location_input=location_input, latlon=latlon,
+                                        profile=self.profile, should_stop=should_stop)
+        elif intent == "hobbies":
+            return retrieve_hobby_activity(self.user_preferences, keywords=keywords, location_input=location_input, latlon=latlon,
+                                           profile=self.profile, should_stop=should_stop)
+        return []
+
+    def _classify_with_llm(self, query: str) -> list:
+        """
+        Classify a query with the LLM within the turn budget.
+        """
+        return get_intent(query, deadline=self.turn_budget.deadline() if self.turn_budget else None)
+
+    def _resolve_location_async(self):
+        """
+        Start resolving the current location in the background (once per turn).
+        """
+        if self.location_future is None:
+            self.location_future = self.location_executor.submit(get_location)
+
+    def _current_location(self):
+        """
+        Return the current location, waiting for the background lookup if needed.
+        """
+        self._resolve_location_async()
+        try:
+            return self.location_future.result()
+        except Exception as e:
+            print(f"[WARNING] Background location lookup failed: {e}")
+            self.location_future = None
+            return get_location()
+
+    def _retrieve_POIs_here(self, intent: str, keywords: list, should_stop=lambda: False) -> list:
+        """
+        Retrieve the nearby points of interest around the current location.
+        """
+        return self._retrieve_POIs(intent, keywords, latlon=self._current_location(), should_stop=should_stop)
+
+    @staticmethod
+    def _speculation_key(intent: str, keywords: list) -> tuple:
+        """
+        Identify a retrieval by what actually changes its result.
+        Station retrieval ignores the keywords, the other ones do not.
+        """
+        if intent == "stations":
+            return (intent,)
+        return (intent, *keywords[1:])
+
+    def _on_partial_query(self, partial: str):
+        """
+        Run the fast intent pass on a partial transcript and, once the intent
+        is stable, start retrieving POIs around the current location.
+        """
+        intent = self.early_predictor.update(partial)
+        if intent:
+            keywords, _ = self.intent_classifier.slot_extractor.extract(partial, intent)
+            self.speculation.start(self._speculation_key(intent, keywords), self._retrieve_POIs_here, intent, keywords)
+
+    def _recent_intent(self):
+        """
+        Most recent intent: the one of the previous turn, otherwise the
+        category of the latest entry of the user's history.
+        """
+        if self.last_intent:
+            return self.last_intent
+
+        latest, latest_intent = "", None
+        for intent in SUPPORTED_INTENTS:
+            for entry in self.user_preferences.get(intent, {}).get("history", []):
+                if entry.get("timestamp", "") > latest:
+                    latest, latest_intent = entry["timestamp"], intent
+        return latest_intent
+
+    def _on_intent_fallback(self, local_intent: str, confidence: float):
+        """
+        Called right before the LLM classifies the query: start retrieving POIs
+        for the most likely intent so that the retrieval overlaps the LLM call.
+        """
+        if confidence >= SPECULATION_MIN_CONFIDENCE and local_intent in SUPPORTED_INTENTS:
+            intent = local_intent
+        else:
+            intent = self._recent_intent()
+        if not intent:
+            return
+
+        # Keeps the early intent speculation if it was started for the same key
+        keywords, _ = self.intent_classifier.slot_extractor.extract(self.user_query, intent)
+        self.speculation.start(self._speculation_key(intent, keywords), self._retrieve_POIs_here, intent, keywords)
+
+    def _report_overlap(self, committed_at: float):
+        """
+        Print how much of the committed speculative retrieval was hidden behind
+        the intent classification and the location question.
+        """
+        started, finished = self.speculation.last_timing
+        finished = finished or committed_at
+        retrieval = finished - started
+        overlap_intent = max(0.0, min(finished, self.intent_finished_at) - max(started, self.intent_started_at))
+        overlap_total = max(0.0, min(finished, committed_at) - started)
+        print(f"[INFO] Retrieval {retrieval:.2f}s: {overlap_total:.2f}s overlapped "
+              f"({overlap_intent:.2f}s with intent classification), "
+              f"{retrieval - overlap_total:.2f}s left on the critical path")
+
+    def _generate(self, prompt: str, on_complete, use_cache: bool = True):
+        """
+        Get the LLM response to a prompt.
+
+        Without streaming, the full response is returned. With streaming, a
+        generator of text deltas is returned instead; `on_complete` is called
+        with the full response once the generator has been consumed, or with
+        the part already spoken (and `interrupted=True`) when the driver cuts
+        the assistant off and the generator is closed.
+
+        Args:
+            prompt (str): prompt sent to the LLM
+            on_complete (Callable[..., None]): called with the response and an `interrupted` flag
+            use_cache (bool): allow a cached response for an identical prompt
+
+        Returns:
+            str or Iterator[str]: the response or its stream of deltas
+        """
+        # The call must answer within what is left of the turn budget
+        deadline = self.turn_budget.deadline() if self.turn_budget else None
+
+        # The stream is consumed after the state has moved on
+        state = self.state.name
+
+        # With LLM_RACE_MODELS set, the fastest of several models answers
+        if not self.stream_responses:
+            response = race(prompt, state=state, deadline=deadline, use_cache=use_cache) if RACING_ENABLED else chat_with_deadline(prompt, deadline=deadline, use_cache=use_cache, state=state)
+            on_complete(response)
+            return response
+
+        def stream():
+            chunks = []
+            finished = False
+            deltas = race_stream(prompt, state=state, deadline=deadline, use_cache=use_cache) if RACING_ENABLED else stream_with_deadline(prompt, deadline=deadline, use_cache=use_cache, state=state)
+            try:
+                for delta in deltas:
+                    chunks.append(delta)
+                    yield delta
+                finished = True
+            finally:
+                # Also runs when a barge-in closes the generator: cancel the request, keep the turn
+                deltas.close()
+                on_complete("".join(chunks).strip(), interrupted=not finished)
+
+        return stream()
+
+    def _on_first_response(self, last_file: str, start: float, response: str, source: str = "llm",
+                           interrupted: bool = False):
+        """
+        Log the first response of a dialogue and start scoring it.
+
+        Scoring loads a large model, so it runs in the background and the
+        response is handed to the TTS right away; SAVE_FEEDBACK waits for the
+        scores. An interrupted response is kept in the history as far as it
+        was spoken, but it is not scored: a partial answer would skew the scores.
+        """
+        end = time.time()
+        print(f"Response time ({source}): {end - start:.2f} seconds")
+
+        # Update the conversation history
+        update_prompt_history(last_file, response, who="assistant")
+
+        self.bert_score = None
+        self.rouge_l_score = None
+        self.scoring_future = None
+        if interrupted:
+            print("[INFO] Response interrupted by the driver, not scored")
+            record_response_metrics(source, self.intent, end - start, interrupted=True)
+        else:
+            self.scoring_future = self.scoring_executor.submit(self._score_response, response, source,
+                                                               self.intent, end - start)
+
+    def _score_response(self, response: str, source: str, intent: str, latency: float):
+        """
+        Score the first response and log it with the latency the driver experienced.
+
+        Returns:
+            Tuple[float, float]: BERTScore and ROUGE-L F1 of the response
+        """
+        # Calcul de BERTScore
+        bert_score = compute_BERTScore(response)
+
+        # Calcul de ROUGE-L
+        rouge_l_score = compute_ROUGE_L(response)
+
+        record_response_metrics(source, intent, latency, bert_score, rouge_l_score)
+        return bert_score, rouge_l_score
+
+    def _wait_for_scores(self):
+        """
+        Wait for the background scoring of the first response, if any.
+        """
+        if self.scoring_future is None:
+            return
+        try:
+            self.bert_score, self.rouge_l_score = self.scoring_future.result()
+        except Exception as e:
+            print(f"[WARNING] Scoring of the response failed: {e}")
+        self.scoring_future = None
+
+    def _on_next_proposal(self, last_file: str, start: float, response: str, source: str = "llm",
+                          interrupted: bool = False):
+        """
+        Log the response proposing the next recommendations.
+        """
+        update_prompt_history(last_file, response, who="assistant")
+        record_response_metrics(source, self.intent, time.time() - start, interrupted=interrupted)
+
+    def _on_follow_up(self, last_file: str, response: str, interrupted: bool = False):
+        """
+        Log the answer to a follow-up question of the driver.
+        """
+        update_prompt_history(last_file, response, who="assistant")
+
+    def _wait_for_playback(self):
+        """
+        Wait until the assistant has finished speaking (or has been
+        interrupted by the driver) before recording the microphone.
+        """
+        if self.playback is not None:
+            self.playback.wait()
+            self.playback = None
 
     def handle_input(self):
         """
@@ -91,6 +384,8 @@ class DialogueManager:
             str: The assistant's spoken or printed response at the current step,
                 or None if no output is needed.
         """
+        # LLM calls are recorded with the state they are made in
+        set_dialogue_state(self.state.name)
 
         if self.state == State.IDLE:
             if self.beginning:
@@ -102,29 +397,48 @@ class DialogueManager:
                 self.state = State.ASK_QUESTION
 
         elif self.state == State.ASK_QUESTION:
-            audio_file = record_audio(duration=3)
+            self._wait_for_playback()
 
-            # Log the raw query
-            ### self.user_query = recognize_speech(audio_file)
-            self.user_query = recognize_speech_fast(audio_file)
+            # The car has moved since the previous turn
+            self.location_future = None
+
+            if self.early_intent:
+                # Transcribe while recording and speculate on the intent
+                self.early_predictor.reset()
+                self.speculation.cancel()
+                audio_file, self.user_query = record_audio_streaming(duration=3, on_partial=self._on_partial_query)
+            else:
+                audio_file = record_audio(duration=3)
+
+                # Log the raw query
+                ### self.user_query = recognize_speech(audio_file)
+                self.user_query = recognize_speech_fast(audio_file)
             print(f"👤 User : {self.user_query}")
 
             if not self.user_query:
+                self.speculation.cancel()
                 self.state == State.ASK_QUESTION
                 return "Sorry, I couldn't record your audio. Please try again."
             
             else:
                 log_user_query(self.user_query)
 
+            # Budget of the intent classification
+            self.turn_budget = TurnBudget()
             self.state = State.INTENT_CLASSIFIER
 
         elif self.state == State.INTENT_CLASSIFIER:
             # Predict the intent of the user's query
             print("Predicting intent...")
-            # self.intent = self.model.predict([self.user_query])[0]
-            keywords = get_intent(self.user_query)
+            # Resolve the location and, if the LLM is needed, retrieve POIs
+            # for the most likely intent while waiting for its answer
+            self._resolve_location_async()
+            self.intent_started_at = time.time()
+            keywords = self.intent_classifier.classify(self.user_query, on_fallback=self._on_intent_fallback)
+            self.intent_finished_at = time.time()
             self.intent = keywords[0] 
             self.keyword = keywords
+            self.last_intent = self.intent
             print(f"Predicted intent: {self.intent}\n")
 
             self.state = State.RETRIEVE_POIs
@@ -133,32 +447,27 @@ class DialogueManager:
             question = input("Do you want to use your current location? (yes/no): ").strip().lower()
 
             if question in ["yes", "y"]:
-                # Get the user's location
-                coords = get_location()
-
-                if self.intent == "stations":
-                    # Get the nearby stations
-                    self.nearby_POIs = retrieve_stations(self.user_preferences, latlon=coords)
-                elif self.intent == "restaurants":
-                    # Get the nearby restaurants
-                    self.nearby_POIs = retrieve_restaurants(self.user_preferences, keywords=self.keyword, latlon=coords)
-                elif self.intent == "hobbies":
-                    # Get the nearby hobby activities
-                    self.nearby_POIs = retrieve_hobby_activity(self.user_preferences, keyword=self.keyword, latlon=coords)
+                # Reuse the speculative retrieval if it was started for the right intent
+                committed_at = time.time()
+                speculative = self.speculation.commit(self._speculation_key(self.intent, self.keyword))
+
+                if speculative is not None:
+                    print("[INFO] Using speculatively retrieved points of interest")
+                    self._report_overlap(committed_at)
+                    self.nearby_POIs = speculative
+                else:
+                    # Get the user's location and the nearby POIs
+                    self.nearby_POIs = self._retrieve_POIs_here(self.intent, self.keyword)
 
             elif question in ["no", "n"]:
+                # The speculative retrieval used the current location
+                self.speculation.cancel()
+
                 # Ask the user for their location address
                 address = input("Please provide your location address: ")
 
-                if self.intent == "stations":
-                    # Get the nearby stations based on the provided address
-                    self.nearby_POIs = retrieve_stations(self.user_preferences, location_input=address)
-                elif self.intent == "restaurants":
-                    # Get the nearby restaurants based on the provided address
-                    self.nearby_POIs = retrieve_restaurants(self.user_preferences, keywords=self.keyword, location_input=address)
-                elif self.intent == "hobbies":
-                    # Get the nearby hobby activities based on the provided address
-                    self.nearby_POIs = retrieve_hobby_activity(self.user_preferences, keyword=self.keyword, location_input=address)
+                # Get the nearby POIs based on the provided address
+                self.nearby_POIs = self._retrieve_POIs(self.intent, self.keyword, location_input=address)
 
             if not self.nearby_POIs:
                 self.state = State.END
@@ -167,9 +476,14 @@ class DialogueManager:
             self.state = State.GET_RECOMMENDATION
         
         elif self.state == State.GET_RECOMMENDATION:
+            # The response gets the full budget: the location question and the
+            # retrieval are not counted against it
+            self.turn_budget = TurnBudget()
             self.feedback = is_empty_log_feedback()
             # Filter and rank the stations based on user preferences
-            self.recommendations = recommend_places(self.user_preferences, self.nearby_POIs, self.intent, self.feedback)
+            self.recommendation_pages = recommendation_pages(self.user_preferences, self.nearby_POIs, self.intent, self.feedback,
+                                                             profile=self.profile)
+            self.recommendations = next(self.recommendation_pages, [])
             
             if not self.recommendations:
                 self.state = State.END
@@ -191,35 +505,16 @@ class DialogueManager:
 
                 # Get the response from the LLM
                 start = time.time()
-
-                # GPT4
-                response = get_response(prompt)
-
-                # Llama
-                ## response = get_llama_response(prompt)
-
-                # Gemini
-                ## response = get_gemini_response(prompt)
-
-                # Deepseek
-                ## response = get_deepseek_response(prompt)
-                
-                # Claude
-                ## response = get_claude_response(prompt)
-
-                end = time.time()
-                print(f"Response time: {end - start:.2f} seconds")
-
-                # Update the conversation history
                 list_file = os.listdir(PROMPT_DIR)
                 last_file = list_file[-1]
-                update_prompt_history(last_file, response, who="assistant")
 
-                # Calcul de BERTScore
-                self.bert_score = compute_BERTScore(response)
-                
-                # Calcul de ROUGE-L
-                self.rouge_l_score = compute_ROUGE_L(response)
+                if self.response_policy.use_template(self.intent_classifier.last_source):
+                    # Plain listing: no LLM round-trip
+                    response = render_recommendations(top, self.intent)
+                    self._on_first_response(last_file, start, response, source="template")
+                else:
+                    # Model selected with LLM_MODEL in .env (history and scores are updated once the response is complete)
+                    response = self._generate(prompt, partial(self._on_first_response, last_file, start))
 
                 self.state = State.WAIT_USER_RESPONSE
 
@@ -228,26 +523,12 @@ class DialogueManager:
                     # load prompt
                     list_file = os.listdir(PROMPT_DIR)
                     last_file = list_file[-1]
-                    prompt = load_prompt(last_file)
+                    prompt = self.context.build(last_file)
 
                     # Get the response from the LLM
-                    # GPT4
-                    response = get_response(prompt)
-
-                    # Llama
-                    ## response = get_llama_response(prompt)
-
-                    # Gemini
-                    ## response = get_gemini_response(prompt)
-
-                    # Deepseek
-                    ## response = get_deepseek_response(prompt)
-                
-                    # Claude
-                    ## response = get_claude_response(prompt)
-
-                    # Update the conversation history
-                    update_prompt_history(last_file, response, who="assistant")
+                    # Model selected with LLM_MODEL in .env (the conversation history is updated once the response is complete)
+                    # Multi-turn history prompts are never answered from the cache
+                    response = self._generate(prompt, partial(self._on_follow_up, last_file), use_cache=False)
 
                     if any(phrase in self.response_user for phrase in ["first", "option one", "number one", "let's go", "let's start", "let's do it"]):
                         self.end_time = time.time()
@@ -303,33 +584,24 @@ class DialogueManager:
 
                     # Create a prompt for the LLM
                     prompt = build_prompt(self.user_query, top, self.intent)
-
-                    # Get the response from the LLM
-                    # GPT4
-                    response = get_response(prompt)
-
-                    # Llama
-                    ## response = get_llama_response(prompt)
-
-                    # Gemini
-                    ## response = get_gemini_response(prompt)
-
-                    # Deepseek
-                    ## response = get_deepseek_response(prompt)
-                    
-                    # Claude
-                    ## response = get_claude_response(prompt)
-
-                    # Update the conversation history
                     list_file = os.listdir(PROMPT_DIR)
                     last_file = list_file[-1]
-                    update_prompt_history(last_file, response, who="assistant")
+
+                    start = time.time()
+                    if self.response_policy.use_template(self.intent_classifier.last_source):
+                        response = render_recommendations(top, self.intent)
+                        self._on_next_proposal(last_file, start, response, source="template")
+                    else:
+                        # Get the response from the LLM
+                        # Model selected with LLM_MODEL in .env (the conversation history is updated once the response is complete)
+                        response = self._generate(prompt, partial(self._on_next_proposal, last_file, start))
 
                     self.state = State.WAIT_USER_RESPONSE
             
             return response
     
         elif self.state == State.WAIT_USER_RESPONSE:
+            self._wait_for_playback()
             audio_file = record_audio(duration=3)
             
             # Log the raw query
@@ -340,6 +612,8 @@ class DialogueManager:
             if not self.response_user:
                 self.state == State.WAIT_USER_RESPONSE
                 return "Sorry, I couldn't record your audio. Please try again."
+
+            self.turn_budget = TurnBudget()
             
             # Update the conversation history
             list_file = os.listdir(PROMPT_DIR)
@@ -356,6 +630,7 @@ class DialogueManager:
         elif self.state == State.SAVE_FEEDBACK:
             print("\nLet's evaluate your experience.")
             feedback = collect_user_feedback(self.selected_recommendation)
+            self._wait_for_scores()
             result = evaluate_recommendations(
                 recommended=[self.selected_recommendation["name"]],
                 feedback=feedback, 
@@ -369,6 +644,7 @@ class DialogueManager:
         
         elif self.state == State.PROPOSE_NEXT:
             self.ind += 3
+            self.recommendations.extend(next(self.recommendation_pages, []))
             if self.ind >= len(self.recommendations):
                 self.state = State.END
                 return "No more recommendations to suggest."
@@ -378,6 +654,7 @@ class DialogueManager:
         elif self.state == State.END:
             mssg = input("Is there anything else I can help with?")
             if mssg.lower() in ["yes", "y", "sure", "go ahead"]:
+                self.speculation.cancel()
                 self.state = State.ASK_QUESTION
                 self.beginning = True
                 self.next_proposal = False
@@ -388,6 +665,7 @@ class DialogueManager:
                 self.feedback = None
                 self.selected_recommendation = None
                 self.recommendations = []
+                self.recommendation_pages = iter(())
                 self.start_time = 0
                 self.end_time = 0
                 self.ind = 0
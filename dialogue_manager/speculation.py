@@ -0,0 +1,121 @@
+######################################################################
+# speculation.py
+
+# Runs a task (e.g. POI retrieval) in the background before we know for
+# sure that its result will be needed. The task is identified by a key
+# (e.g. intent + keywords); when the real key is known the result is
+# either committed (same key) or discarded (misprediction). A discarded
+# task is asked to stop through the `should_stop` callable it receives.
+######################################################################
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Hashable, Optional
+
+
+class SpeculativeTask:
+    def __init__(self, name: str = "speculation", max_workers: int = 2):
+        """
+        Initialize an empty speculative slot.
+
+        Args:
+            name (str): prefix of the worker thread names (for debugging)
+            max_workers (int): worker threads; more than one so that a new task does
+                not wait behind a discarded one that is still finishing its current step
+        """
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self.future = None
+        self.key = None
+        # Stop flag and {"started_at", "finished_at"} of the current task: each task
+        # has its own, so a discarded task cannot overwrite those of the current one
+        self.stop_event = None
+        self.timing = None
+        # (started_at, finished_at) of the last committed task
+        self.last_timing = None
+
+        self.hits = 0
+        self.misses = 0
+
+    def start(self, key: Hashable, fn: Callable[..., Any], *args, **kwargs):
+        """
+        Start `fn(*args, should_stop=..., **kwargs)` in the background for the given key.
+
+        If a task with the same key is already running, nothing happens.
+        A task with a different key is discarded first.
+
+        Args:
+            key (Hashable): identifies what the task computes
+            fn (Callable): the function to run speculatively; it receives a
+                `should_stop` callable that becomes true once the task is discarded
+        """
+        if self.future is not None and self.key == key:
+            return
+
+        self.cancel()
+        print(f"[INFO] Starting speculative task for {key}")
+        self.key = key
+        self.stop_event = threading.Event()
+        self.timing = {"started_at": time.time(), "finished_at": None}
+        self.future = self.executor.submit(self._run, self.timing, fn, *args,
+                                           should_stop=self.stop_event.is_set, **kwargs)
+
+    @staticmethod
+    def _run(timing: dict, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            timing["finished_at"] = time.time()
+
+    def commit(self, key: Hashable, timeout: Optional[float] = None) -> Optional[Any]:
+        """
+        Return the result of the speculative task if it was started for `key`.
+
+        Args:
+            key (Hashable): the key that turned out to be the right one
+            timeout (Optional[float]): maximum time to wait for the task
+
+        Returns:
+            Optional[Any]: the task result, or None if there was no matching
+                task or it failed (the caller then runs the work itself)
+        """
+        if self.future is None:
+            return None
+
+        if self.key != key:
+            print(f"[INFO] Discarding speculative task for {self.key} (expected {key})")
+            self.misses += 1
+            self.cancel()
+            return None
+
+        future, timing = self.future, self.timing
+        self.future = None
+        self.key = None
+        self.stop_event = None
+        self.timing = None
+
+        try:
+            result = future.result(timeout=timeout)
+        except Exception as e:
+            print(f"[WARNING] Speculative task failed: {e}")
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.last_timing = (timing["started_at"], timing["finished_at"])
+        return result
+
+    def cancel(self):
+        """
+        Discard the current speculative task, if any.
+
+        A task that has not started yet is cancelled; a running one is asked to
+        stop (its `should_stop` becomes true) and its result is ignored.
+        """
+        if self.future is not None:
+            self.future.cancel()
+            self.stop_event.set()
+        self.future = None
+        self.key = None
+        self.stop_event = None
+        self.timing = None
@@ -8,15 +8,21 @@
 ## Uses OpenChargeMap, TomTom, and Google Places APIs and returns
 ## the data preprocessed in a format compatible with the
 ## recommendation engine.
+##
+## The retrieval functions accept a `should_stop` callable, polled before
+## each API request, so that a retrieval started speculatively can be
+## abandoned when its result is no longer needed.
 ############################################################
 
 # --- IMPORTS ---
 import requests
 from geopy.geocoders import Nominatim
 from geopy.distance import geodesic
-from typing import List, Tuple, Optional
+from typing import Callable, List, Tuple, Optional
 import unicodedata
 
+from preferences_database.preference_profile import PreferenceProfile, compile_preferences
+
 
 
 # --- API KEYS ---
@@ -43,7 +49,8 @@ def geocode_address(address: str) -> Optional[Tuple[float, float]]:
 
 # --- ELECTRIC STATIONS (OpenChargeMap) ---
 
-def get_electric_stations(user_preferences: dict, lat: float, lon: float, radius_km: int = 10) -> List[dict]:
+def get_electric_stations(user_preferences: dict, lat: float, lon: float, radius_km: int = 10,
+                          profile: Optional[PreferenceProfile] = None) -> List[dict]:
     params = {
         "output": "json",
         "latitude": lat,
@@ -58,18 +65,18 @@ def get_electric_stations(user_preferences: dict, lat: float, lon: float, radius
         if response.status_code != 200:
             print(f"[ERROR] OpenChargeMap error: {response.status_code} - {response.text}")
             return []
-        return preprocess_ocm(user_preferences, response.json())
+        return preprocess_ocm(user_preferences, response.json(), profile)
     except requests.RequestException as e:
         print(f"[ERROR] OCM request failed: {e}")
         return []
 
 
-def preprocess_ocm(user_preferences: dict, raw_data: List[dict]) -> List[dict]:
+def preprocess_ocm(user_preferences: dict, raw_data: List[dict], profile: Optional[PreferenceProfile] = None) -> List[dict]:
     stations = []
-    prefs = user_preferences.get("stations", {})
-    preferred_providers = prefs.get("preferred_providers", [])
-    max_detour_km = prefs.get("max_detour_km", 0)
-    charging_power_min_kw = prefs.get("charging_power_min_kw", 0)
+    rules = (profile or compile_preferences(user_preferences)).stations
+    preferred_providers = rules.preferred_providers
+    max_detour_km = rules.max_detour_km
+    charging_power_min_kw = rules.charging_power_min_kw
     for entry in raw_data:
         try:
             name = entry.get("AddressInfo", {}).get("Title", "Unknown Station")
@@ -105,7 +112,8 @@ def preprocess_ocm(user_preferences: dict, raw_data: List[dict]) -> List[dict]:
 
 # --- PETROL STATIONS (HERE API) ---
 
-def get_petrol_stations_tomtom(user_preferences: dict, lat: float, lon: float, radius_m: int = 10000, api_key: str = TOMTOM_API_KEY) -> list:
+def get_petrol_stations_tomtom(user_preferences: dict, lat: float, lon: float, radius_m: int = 10000, api_key: str = TOMTOM_API_KEY,
+                               profile: Optional[PreferenceProfile] = None) -> list:
     """
     Get nearby petrol stations using TomTom Search API.
 
@@ -114,6 +122,7 @@ def get_petrol_stations_tomtom(user_preferences: dict, lat: float, lon: float, r
         lon (float): longitude
         radius_m (int): radius in meters
         api_key (str): TomTom API key
+        profile (Optional[PreferenceProfile]): the preferences compiled beforehand
 
     Returns:
         List[dict]: formatted list of stations
@@ -136,9 +145,9 @@ def get_petrol_stations_tomtom(user_preferences: dict, lat: float, lon: float, r
         data = response.json()
 
         stations = []
-        prefs = user_preferences.get("stations", {})
-        preferred_providers = prefs.get("preferred_providers", [])
-        max_detour_km = prefs.get("max_detour_km", 0)
+        rules = (profile or compile_preferences(user_preferences)).stations
+        preferred_providers = rules.preferred_providers
+        max_detour_km = rules.max_detour_km
 
         for result in data.get("results", []):
             poi = result.get("poi", {})
@@ -170,7 +179,9 @@ def get_petrol_stations_tomtom(user_preferences: dict, lat: float, lon: float, r
 
 ###### Case 1: Retrieve Stations #######
 
-def retrieve_stations(user_preferences: dict, location_input: str = "", latlon: Optional[Tuple[float, float]] = None) -> List[dict]:
+def retrieve_stations(user_preferences: dict, location_input: str = "", latlon: Optional[Tuple[float, float]] = None,
+                      profile: Optional[PreferenceProfile] = None,
+                      should_stop: Callable[[], bool] = lambda: False) -> List[dict]:
     """
     Main function to retrieve stations (electric or petrol) based on preferences and location.
 
@@ -178,6 +189,8 @@ def retrieve_stations(user_preferences: dict, location_input: str = "", latlon:
         user_preferences (dict): must contain 'fuel_type'
         location_input (str): user address (optional)
         latlon (Tuple[float, float]): GPS coordinates (optional)
+        profile (Optional[PreferenceProfile]): the preferences compiled beforehand
+        should_stop (Callable[[], bool]): polled before the API request, to abandon the retrieval
 
     Returns:
         List[dict]: preprocessed list of stations
@@ -195,12 +208,15 @@ def retrieve_stations(user_preferences: dict, location_input: str = "", latlon:
 
     prefs = user_preferences.get("stations", {})
     fuel_type = prefs.get("fuel_type", "electric")
+    if should_stop():
+        print("[INFO] Station retrieval cancelled")
+        return []
     print(f"[INFO] Searching for '{fuel_type}' stations near lat={lat}, lon={lon}")
 
     if fuel_type == "electric":
-        return get_electric_stations(user_preferences, lat, lon)
+        return get_electric_stations(user_preferences, lat, lon, profile=profile)
     elif fuel_type == "petrol":
-        return get_petrol_stations_tomtom(user_preferences, lat, lon)
+        return get_petrol_stations_tomtom(user_preferences, lat, lon, profile=profile)
     else:
         print(f"[ERROR] Unsupported fuel type: {fuel_type}")
         return []
@@ -258,7 +274,8 @@ def fetch_place_details(place_id: str, api_key: str = GOOGLE_PLACES_API_KEY) ->
 
 
 def retrieve_restaurants(user_preferences: dict, keywords: Optional[List[str]] = None, location_input: str = "", latlon: Optional[Tuple[float, float]] = None, radius_m: int = 10000,
-    api_key: str = GOOGLE_PLACES_API_KEY) -> List[dict]:
+    api_key: str = GOOGLE_PLACES_API_KEY, profile: Optional[PreferenceProfile] = None,
+    should_stop: Callable[[], bool] = lambda: False) -> List[dict]:
     """
     Retrieve a list of nearby restaurants using Google Places API based on user preferences and location.
 
@@ -269,6 +286,8 @@ def retrieve_restaurants(user_preferences: dict, keywords: Optional[List[str]] =
         latlon (Tuple[float, float]): Optional (latitude, longitude) tuple.
         radius_m (int): radius in meters
         api_key (str): Google Places API key.
+        profile (Optional[PreferenceProfile]): the preferences compiled beforehand
+        should_stop (Callable[[], bool]): polled before each API request, to abandon the retrieval
 
     Returns:
         List[dict]: A list of recommended restaurants matching preferences.
@@ -290,9 +309,8 @@ def retrieve_restaurants(user_preferences: dict, keywords: Optional[List[str]] =
         preferred_cuisines = prefs["preferred_cuisine_types"]
         special_needs = prefs["special_needs"]
         ambiance = prefs["desired_ambiance"]  # No default
-        budget = prefs["average_budget"]  # e.g., 'cheap', 'moderate', 'expensive'
-        min_rating = prefs["min_rating"]
-        blacklist = prefs["blacklisted_restaurants"]
+        rules = (profile or compile_preferences(user_preferences)).restaurants
+        min_rating = rules.min_rating
         requires_reservation = prefs["reservation_preference"]  # 'yes' or 'no'
 
     except KeyError as e:
@@ -326,13 +344,16 @@ def retrieve_restaurants(user_preferences: dict, keywords: Optional[List[str]] =
             search_keywords = preferred_cuisines
 
     url = "https://maps.googleapis.com/maps/api/place/nearbysearch/json"
-    price_map = {'inexpensive': 0, 'cheap': 1, 'moderate': 2, 'expensive': 3, 'very_expensive': 4}
-    max_price = price_map.get(budget.lower(), 2)  # Default to 'moderate'
+    max_price = rules.search_max_price  # budget as a Google price level, 'moderate' by default
 
     seen_place_ids = set()
     results = []
     
     for cuisine in search_keywords:
+        if should_stop():
+            print("[INFO] Restaurant retrieval cancelled")
+            return results
+
         params = {
             "key": api_key,
             "location": f"{lat},{lon}",
@@ -360,7 +381,7 @@ def retrieve_restaurants(user_preferences: dict, keywords: Optional[List[str]] =
                 if rating < min_rating:
                     continue
 
-                if any(bad_name.lower() in name.lower() for bad_name in blacklist):
+                if rules.is_blacklisted(name):
                     continue
 
                 place_lat = place["geometry"]["location"]["lat"]
@@ -370,6 +391,9 @@ def retrieve_restaurants(user_preferences: dict, keywords: Optional[List[str]] =
                 if distance_keyword and distance_km > distance_keyword:
                     continue
 
+                if should_stop():
+                    print("[INFO] Restaurant retrieval cancelled")
+                    return results
                 details = fetch_place_details(place_id, api_key)
 
                 website = details.get("website", None)
@@ -399,6 +423,26 @@ def retrieve_restaurants(user_preferences: dict, keywords: Optional[List[str]] =
 
 #### Case 3: Retrieve hobbies #####
 
+# Activity synonyms (FR/EN) → (Google place type, extra keyword)
+ACTIVITY_SYNONYMS = {
+    ("cinema", "cine", "film", "movies", "movie", "cinemas", "Cinema"): ("movie_theater", ""),
+    ("musee", "museum"): ("museum", ""),
+    ("galerie", "galerie d art", "art gallery"): ("art_gallery", ""),
+    ("aquarium",): ("aquarium", ""),
+    ("zoo",): ("zoo", ""),
+    ("bibliotheque", "library", "mediatheque"): ("library", ""),
+    ("amusement park", "parc d attractions", "parc d attraction", "luna park"): ("amusement_park", ""),
+    ("bowling",): ("bowling_alley", ""),
+    ("gym", "fitness", "salle de sport"): ("gym", ""),
+    ("spa", "hammam"): ("spa", ""),
+    ("stade", "stadium"): ("stadium", ""),
+    ("camping", "campground"): ("campground", ""),
+    ("parc", "park", "jardin", "jardins"): ("park", ""),
+    ("librairie", "bookstore", "book shop", "bookshop"): ("book_store", ""),
+    ("nightclub", "discotheque", "disco", "boite de nuit", "boite"): ("night_club", ""),
+    ("piscine", "swimming", "swimming pool", "piscine municipale"): ("swimming_pool", ""),
+}
+
 def activity_to_place_type(activity: str) -> Tuple[str, str]:
     """
     Retourne (place_type, keyword_supplementaire) pour Google Places.
@@ -410,25 +454,7 @@ def activity_to_place_type(activity: str) -> Tuple[str, str]:
     norm = unicodedata.normalize("NFKD", activity).encode("ascii", "ignore").decode("ascii")
     norm = norm.lower().strip()
 
-    SYNS = {
-        ("cinema", "cine", "film", "movies", "movie", "cinemas", "Cinema"): ("movie_theater", ""),
-        ("musee", "museum"): ("museum", ""),
-        ("galerie", "galerie d art", "art gallery"): ("art_gallery", ""),
-        ("aquarium",): ("aquarium", ""),
-        ("zoo",): ("zoo", ""),
-        ("bibliotheque", "library", "mediatheque"): ("library", ""),
-        ("amusement park", "parc d attractions", "parc d attraction", "luna park"): ("amusement_park", ""),
-        ("bowling",): ("bowling_alley", ""),
-        ("gym", "fitness", "salle de sport"): ("gym", ""),
-        ("spa", "hammam"): ("spa", ""),
-        ("stade", "stadium"): ("stadium", ""),
-        ("camping", "campground"): ("campground", ""),
-        ("parc", "park", "jardin", "jardins"): ("park", ""),
-        ("librairie", "bookstore", "book shop", "bookshop"): ("book_store", ""),
-        ("nightclub", "discotheque", "disco", "boite de nuit", "boite"): ("night_club", ""),
-        ("piscine", "swimming", "swimming pool", "piscine municipale"): ("swimming_pool", ""),
-    }
-    for syns, out in SYNS.items():
+    for syns, out in ACTIVITY_SYNONYMS.items():
         if norm in syns:
             return out
 
@@ -454,7 +480,8 @@ def activity_to_place_type(activity: str) -> Tuple[str, str]:
 
 
 def retrieve_hobby_activity(user_preferences: dict, keywords: Optional[List[str]] = None, location_input: str = "", latlon: Optional[Tuple[float, float]] = None, radius_m: int = 10000, 
-                            api_key: str = GOOGLE_PLACES_API_KEY) -> List[dict]:
+                            api_key: str = GOOGLE_PLACES_API_KEY, profile: Optional[PreferenceProfile] = None,
+                            should_stop: Callable[[], bool] = lambda: False) -> List[dict]:
     """
     Retrieve hobby-related places (e.g. cinema, museum) based on preferences and optional activity keyword.
 
@@ -465,6 +492,8 @@ def retrieve_hobby_activity(user_preferences: dict, keywords: Optional[List[str]
         latlon (Tuple[float, float]): Optional lat/lon GPS coordinates.
         radius_m (int): Search radius (in meters).
         api_key (str): Google Places API key.
+        profile (Optional[PreferenceProfile]): the preferences compiled beforehand
+        should_stop (Callable[[], bool]): polled before each API request, to abandon the retrieval
 
     Returns:
         List[dict]: List of matching hobby activities nearby.
@@ -486,7 +515,8 @@ def retrieve_hobby_activity(user_preferences: dict, keywords: Optional[List[str]
         indoor_or_outdoor = prefs.get("indoor_or_outdoor", "both")
         max_budget = prefs.get("max_budget_per_activity", 'moderate')
         easy_parking = prefs.get("easy_access_or_parking", "no") == "yes"
-        min_rating = prefs.get("min_rating", 4.0)
+        rules = (profile or compile_preferences(user_preferences)).hobbies
+        min_rating = rules.min_rating
         require_availability = prefs.get("availability", "yes") == "yes"
     except KeyError as e:
         print(f"[ERROR] Missing hobby preference field: {e}")
@@ -530,10 +560,13 @@ def retrieve_hobby_activity(user_preferences: dict, keywords: Optional[List[str]
     results = []
     seen_place_ids = set()  # ← Ajout pour filtrer les doublons
 
-    price_map = {'inexpensive': 0, 'cheap': 1, 'moderate': 2, 'expensive': 3, 'very_expensive': 4}
-    max_budget_ = price_map.get(max_budget.lower(), 2)
+    max_budget_ = rules.search_max_price
 
     for activity in search_keywords:
+        if should_stop():
+            print("[INFO] Hobby retrieval cancelled")
+            return results
+
         # ✅ on déduit le type spécialisé + éventuel mot-clé complémentaire
         place_type, kw_extra = activity_to_place_type(activity)
         full_keyword = f"{activity} parking" if easy_parking else activity
@@ -569,7 +602,7 @@ def retrieve_hobby_activity(user_preferences: dict, keywords: Optional[List[str]
 
                 rating = float(place.get("rating", 0) or 0)   # ✅ cast sûr
 
-                if rating < float(min_rating):
+                if rating < min_rating:
                     continue
 
                 seen_place_ids.add(place_id)
@@ -577,6 +610,9 @@ def retrieve_hobby_activity(user_preferences: dict, keywords: Optional[List[str]
                 place_lat = place["geometry"]["location"]["lat"]
                 place_lon = place["geometry"]["location"]["lng"]
 
+                if should_stop():
+                    print("[INFO] Hobby retrieval cancelled")
+                    return results
                 details = fetch_place_details(place_id, api_key)
 
                 website = details.get("website", None)
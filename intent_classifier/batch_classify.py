@@ -0,0 +1,151 @@
+######################################################################
+# batch_classify.py
+
+# Bulk intent classification of the logged user queries
+# (user/logs/user_queries.txt), for analysis or retraining.
+#
+# The log is streamed in chunks of lines: each chunk is vectorized in one
+# sparse TF-IDF matrix and classified in one call, and its predictions
+# are appended to a Parquet file as one row group. Only one chunk is in
+# memory at a time, so millions of lines are handled in bounded memory.
+#
+# Output columns: line (1-based line number in the log), query, intent,
+# confidence.
+#
+# Usage:
+#   python -m intent_classifier.batch_classify
+#   python -m intent_classifier.batch_classify --input user/logs/user_queries.txt \
+#       --output user/logs/user_queries_intents.parquet --chunk-size 50000
+#
+# Functions:
+### - iter_chunks
+### - classify_texts
+### - classify_log
+######################################################################
+
+import argparse
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from intent_classifier.compact_model import load_intent_model
+from intent_classifier.early_intent import normalize_intent
+
+QUERY_LOG = Path("user/logs/user_queries.txt")
+OUTPUT_PATH = Path("user/logs/user_queries_intents.parquet")
+CHUNK_SIZE = 10000
+
+
+def iter_chunks(path: Path, chunk_size: int = CHUNK_SIZE) -> Iterator[Tuple[List[int], List[str]]]:
+    """
+    Read a query log lazily, chunk by chunk (empty lines are skipped).
+
+    Args:
+        path (Path): one query per line
+        chunk_size (int): number of queries per chunk
+
+    Yields:
+        Tuple[List[int], List[str]]: line numbers and queries of a chunk
+    """
+    lines, queries = [], []
+    with path.open("r", encoding="utf-8", errors="replace") as f:
+        for number, line in enumerate(f, start=1):
+            query = line.strip()
+            if not query:
+                continue
+            lines.append(number)
+            queries.append(query)
+            if len(queries) >= chunk_size:
+                yield lines, queries
+                lines, queries = [], []
+    if queries:
+        yield lines, queries
+
+
+def classify_texts(model, texts: List[str]) -> Tuple[List[str], np.ndarray]:
+    """
+    Classify a batch of queries with a single vectorization.
+
+    Args:
+        model: intent model exposing predict_proba() and classes_
+        texts (List[str]): queries
+
+    Returns:
+        Tuple[List[str], np.ndarray]: intents ("stations", "restaurants", "hobbies")
+            and their probabilities
+    """
+    probas = model.predict_proba(texts)
+    best = probas.argmax(axis=1)
+    intents = [normalize_intent(label) for label in model.classes_]
+    return [intents[i] for i in best], probas[np.arange(len(texts)), best]
+
+
+def classify_log(input_path: Path = QUERY_LOG, output_path: Path = OUTPUT_PATH, model=None,
+                 chunk_size: int = CHUNK_SIZE) -> Counter:
+    """
+    Classify every query of a log and write the predictions to Parquet.
+
+    Args:
+        input_path (Path): query log, one query per line
+        output_path (Path): Parquet file to (over)write
+        model: intent model (default: load_intent_model())
+        chunk_size (int): queries vectorized and written at once
+
+    Returns:
+        Counter: number of queries per intent
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    model = model or load_intent_model()
+    schema = pa.schema([
+        ("line", pa.int64()),
+        ("query", pa.string()),
+        ("intent", pa.dictionary(pa.int8(), pa.string())),
+        ("confidence", pa.float32()),
+    ])
+
+    counts = Counter()
+    total = 0
+    start = time.perf_counter()
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with pq.ParquetWriter(output_path, schema, compression="zstd") as writer:
+        for lines, queries in iter_chunks(input_path, chunk_size):
+            intents, confidences = classify_texts(model, queries)
+            writer.write_table(pa.table({
+                "line": pa.array(lines, pa.int64()),
+                "query": pa.array(queries, pa.string()),
+                "intent": pa.array(intents, pa.string()).dictionary_encode().cast(schema.field("intent").type),
+                "confidence": pa.array(confidences, pa.float32()),
+            }, schema=schema))
+
+            counts.update(intents)
+            total += len(queries)
+            print(f"[INFO] {total} queries classified ({total / (time.perf_counter() - start):.0f}/s)", end="\r")
+
+    print(f"\n[INFO] Predictions saved to {output_path}")
+    return counts
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Classify the logged user queries in bulk")
+    parser.add_argument("--input", type=Path, default=QUERY_LOG)
+    parser.add_argument("--output", type=Path, default=OUTPUT_PATH)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    if not args.input.exists():
+        print(f"[ERROR] {args.input} not found")
+        return
+
+    counts = classify_log(args.input, args.output, chunk_size=args.chunk_size)
+    total = sum(counts.values())
+    for intent, count in counts.most_common():
+        print(f"{intent:<12} {count:>10} ({count / total:.1%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,103 +1,170 @@
-import json
-import pandas as pd
-import random
-import os
-import joblib  # for saving the model
-import matplotlib.pyplot as plt
-
-from sklearn.model_selection import train_test_split
-from sklearn.pipeline import Pipeline
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.linear_model import LogisticRegression
-from sklearn.metrics import classification_report, confusion_matrix, ConfusionMatrixDisplay
-
-
+######################################################################
+# classifier.py
+
+# Trains the local intent classifier (TF-IDF + LogisticRegression) on
+# the hobby / restaurant / station datasets:
+# - hyperparameter search with cross-validation, run in parallel
+# - classification report and confusion matrix on a held-out split
+# - plots saved to intent_classifier/Visualisation/
+# - the best pipeline saved as a joblib pickle and exported as a compact
+#   NumPy artifact (see compact_model.py) for fast loading
+#
+# Usage:
+#   python -m intent_classifier.classifier --n-jobs -1
+#   python -m intent_classifier.classifier --no-search --show
+#
+# Functions:
+### - build_pipeline
+### - train
+### - save_plots
+######################################################################
+
+import argparse
+import time
 from pathlib import Path
+from typing import List
+
+import joblib  # for saving the model
 
-# === Paths to dataset files ===
-HOBBY_PATH = Path("intent_classifier/Dataset/hobby.json")
-RESTAURANT_PATH = Path("intent_classifier/Dataset/Restaurant.json")
-STATION_PATH = Path("intent_classifier/Dataset/Station.json")
-
-
-# === Load all three intent-specific datasets ===
-with open(HOBBY_PATH, "r") as f1:
-    hobby_data = json.load(f1)
-
-with open(RESTAURANT_PATH, "r") as f2:
-    restaurant_data = json.load(f2)
-
-with open(STATION_PATH, "r") as f3:
-    station_data = json.load(f3)
-
-# === Combine and shuffle all data ===
-all_data = hobby_data + restaurant_data + station_data
-random.shuffle(all_data)  # ensure the dataset is well mixed
-
-# === Plot the distribution of intents ===
-plt.figure(figsize=(10, 6))
-intent_counts = pd.Series([item['intent'] for item in all_data]).value_counts()
-intent_counts.plot(kind='bar', title='Intent Distribution')
-plt.xlabel('Intent')
-plt.ylabel('Count')
-plt.xticks(rotation=45)  # ou 30, 60, etc.
-plt.tight_layout() # adjust layout to prevent clipping of tick-labels
-
-# === Save to file
-plt.savefig("C:/Jean Eudes Folder/Jean_Eudes/EMSE&Cranfield/Cranfield/Individual Research Project - Thesis/Thesis/Code/AI_IRP_LLM/intent_classifier/Visualisation/intent_distribution.png")
-print("Graph saved as 'intent_distribution.png'")
-
-# === Show the plot
-plt.show()
-
-# === Convert into a pandas DataFrame ===
-df = pd.DataFrame(all_data)
-## print(df.head(10))
-
-# === Separate features (text) and labels (intent) ===
-X = df["text"]
-y = df["intent"]
-
-# === Split the data into training and testing sets (80% / 20%)
-# stratify=y ensures class balance is preserved in both sets
-X_train, X_test, y_train, y_test = train_test_split(
-    X, y, test_size=0.2, stratify=y, random_state=42
-)
-
-# === Define a simple classification pipeline:
-# 1. Convert text to TF-IDF features (with unigrams and bigrams)
-# 2. Train a Logistic Regression model
-pipeline = Pipeline([
-    ('tfidf', TfidfVectorizer(ngram_range=(1, 2))),
-    ('clf', LogisticRegression(max_iter=1000))
-])
-
-# === Train the model on the training set
-pipeline.fit(X_train, y_train)
-
-# === Evaluate the model on the test set
-y_pred = pipeline.predict(X_test)
-print("Classification Report:")
-print(classification_report(y_test, y_pred))
-
-print("Confusion Matrix:")
-print(confusion_matrix(y_test, y_pred))
-
-# === Visualize the confusion matrix
-cm = confusion_matrix(y_test, y_pred, labels=pipeline.classes_)
-disp = ConfusionMatrixDisplay(confusion_matrix=cm, display_labels=pipeline.classes_)
-disp.title = "Confusion Matrix"
-disp.plot()
-
-# Save to file
-plt.savefig("C:/Jean Eudes Folder/Jean_Eudes/EMSE&Cranfield/Cranfield/Individual Research Project - Thesis/Thesis/Code/AI_IRP_LLM/intent_classifier/Visualisation/confusion_matrix.png")
-print("Graph saved as 'confusion_matrix.png'")
-
-# Show the confusion matrix plot
-plt.show()
-
-# === Save the trained model to disk for future use
-output_model_path = "intent_classifier.pkl"
-joblib.dump(pipeline, output_model_path)
-
-print(f"\n Model saved as '{output_model_path}'")
+from intent_classifier.compact_model import COMPACT_PATH, PICKLE_PATH, export_compact_model
+from intent_classifier.datasets import load_dataset
+
+VISUALISATION_DIR = Path("intent_classifier/Visualisation")
+
+# === Hyperparameters explored by the search ===
+PARAM_GRID = {
+    "tfidf__ngram_range": [(1, 1), (1, 2)],
+    "tfidf__sublinear_tf": [False, True],
+    "tfidf__min_df": [1, 2],
+    "clf__C": [1.0, 10.0, 100.0],
+}
+
+
+def build_pipeline():
+    """
+    Define the classification pipeline:
+    1. Convert text to TF-IDF features
+    2. Train a Logistic Regression model
+    """
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.pipeline import Pipeline
+
+    return Pipeline([
+        ('tfidf', TfidfVectorizer(ngram_range=(1, 2))),
+        ('clf', LogisticRegression(max_iter=1000))
+    ])
+
+
+def train(X_train: List[str], y_train: List[str], search: bool = True, n_jobs: int = -1, cv: int = 5):
+    """
+    Fit the pipeline, optionally with a cross-validated grid search.
+
+    Args:
+        X_train (List[str]): training texts
+        y_train (List[str]): training intents
+        search (bool): search the hyperparameters of PARAM_GRID
+        n_jobs (int): parallel jobs of the search (-1 = all cores)
+        cv (int): number of cross-validation folds
+
+    Returns:
+        the fitted (best) pipeline
+    """
+    pipeline = build_pipeline()
+    if not search:
+        return pipeline.fit(X_train, y_train)
+
+    from sklearn.model_selection import GridSearchCV
+
+    grid = GridSearchCV(pipeline, PARAM_GRID, cv=cv, n_jobs=n_jobs, scoring="f1_macro")
+    grid.fit(X_train, y_train)
+    print(f"[INFO] Best parameters: {grid.best_params_} (macro F1 {grid.best_score_:.3f})")
+    return grid.best_estimator_
+
+
+def save_plots(y: List[str], y_test: List[str], y_pred: List[str], classes: List[str], show: bool = False):
+    """
+    Save the intent distribution and the confusion matrix to VISUALISATION_DIR.
+    """
+    import matplotlib
+    if not show:
+        matplotlib.use("Agg")  # no window
+    import matplotlib.pyplot as plt
+    import pandas as pd
+    from sklearn.metrics import ConfusionMatrixDisplay, confusion_matrix
+
+    VISUALISATION_DIR.mkdir(parents=True, exist_ok=True)
+
+    # === Plot the distribution of intents ===
+    plt.figure(figsize=(10, 6))
+    intent_counts = pd.Series(y).value_counts()
+    intent_counts.plot(kind='bar', title='Intent Distribution')
+    plt.xlabel('Intent')
+    plt.ylabel('Count')
+    plt.xticks(rotation=45)
+    plt.tight_layout()  # adjust layout to prevent clipping of tick-labels
+    plt.savefig(VISUALISATION_DIR / "intent_distribution.png")
+    print(f"Graph saved as '{VISUALISATION_DIR / 'intent_distribution.png'}'")
+
+    # === Visualize the confusion matrix
+    cm = confusion_matrix(y_test, y_pred, labels=classes)
+    disp = ConfusionMatrixDisplay(confusion_matrix=cm, display_labels=classes)
+    disp.plot()
+    plt.savefig(VISUALISATION_DIR / "confusion_matrix.png")
+    print(f"Graph saved as '{VISUALISATION_DIR / 'confusion_matrix.png'}'")
+
+    if show:
+        plt.show()
+    plt.close("all")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train the local intent classifier")
+    parser.add_argument("--no-search", action="store_true", help="train with the default hyperparameters")
+    parser.add_argument("--n-jobs", type=int, default=-1, help="parallel jobs of the hyperparameter search")
+    parser.add_argument("--cv", type=int, default=5, help="cross-validation folds")
+    parser.add_argument("--test-size", type=float, default=0.2)
+    parser.add_argument("--no-plots", action="store_true", help="do not save the plots")
+    parser.add_argument("--show", action="store_true", help="also display the plots")
+    parser.add_argument("--pickle", type=Path, default=PICKLE_PATH, help="joblib output")
+    parser.add_argument("--compact", type=Path, default=COMPACT_PATH, help="compact NumPy output")
+    args = parser.parse_args(argv)
+
+    from sklearn.metrics import classification_report, confusion_matrix
+    from sklearn.model_selection import train_test_split
+
+    X, y = load_dataset()
+
+    # === Split the data into training and testing sets
+    # stratify=y ensures class balance is preserved in both sets
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=args.test_size, stratify=y, random_state=42
+    )
+
+    start = time.perf_counter()
+    pipeline = train(X_train, y_train, search=not args.no_search, n_jobs=args.n_jobs, cv=args.cv)
+    print(f"[INFO] Trained in {time.perf_counter() - start:.1f}s")
+
+    # === Evaluate the model on the test set
+    y_pred = pipeline.predict(X_test)
+    print("Classification Report:")
+    print(classification_report(y_test, y_pred))
+
+    print("Confusion Matrix:")
+    print(confusion_matrix(y_test, y_pred))
+
+    if not args.no_plots:
+        save_plots(y, y_test, y_pred, list(pipeline.classes_), show=args.show)
+
+    # === Save the trained model to disk for future use
+    args.pickle.parent.mkdir(parents=True, exist_ok=True)
+    joblib.dump(pipeline, args.pickle)
+    print(f"\n Model saved as '{args.pickle}'")
+
+    # === Export the compact artifact, checked against the pipeline on the test set
+    export_compact_model(pipeline, args.compact, check_texts=X_test)
+    print(f" Compact model saved as '{args.compact}' ({args.compact.stat().st_size / 1024:.0f} KB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,11 @@
-from language_model.gpt4_driver_assistant import get_response
+import os
+from typing import Optional
+
+from language_model.async_client import chat_with_deadline
+
+# Model of the intent LLM, independent of LLM_MODEL: an A/B test of the
+# response models must not change the intent classification
+INTENT_MODEL = os.getenv("INTENT_MODEL", "gpt4")
 
 def create_prompt(user_query: str) -> str:
     """Create a prompt for the user query.
@@ -23,17 +30,20 @@ def create_prompt(user_query: str) -> str:
     return prompt
 
 
-def get_intent(user_query: str) -> list:
+def get_intent(user_query: str, deadline: Optional[float] = None) -> list:
     """Get the user's intent from the query.
 
     Args:
         user_query (str): The user's query.
+        deadline (Optional[float]): absolute time.monotonic() deadline of the LLM call
+            (default: a full turn budget from now).
+            The call uses INTENT_MODEL (default: gpt4).
 
     Returns:
         str: The user's intent.
     """
     prompt = create_prompt(user_query)
-    response = get_response(prompt)
+    response = chat_with_deadline(prompt, model=INTENT_MODEL, deadline=deadline)
     response = parse_intent(response)
     return response
 
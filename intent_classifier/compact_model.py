@@ -0,0 +1,219 @@
+######################################################################
+# compact_model.py
+
+# NumPy-only inference for the TF-IDF + LogisticRegression intent model.
+#
+# Unpickling the joblib pipeline imports sklearn and scipy at startup.
+# classifier.py also exports the fitted model as a plain .npz archive
+# (vocabulary, idf weights, coefficients, intercepts, classes), and
+# CompactIntentModel reproduces the pipeline's predict_proba from it
+# with the same tokenization, so the model loads in milliseconds.
+#
+# Functions:
+### - export_compact_model
+### - load_intent_model
+######################################################################
+
+import re
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+MODEL_DIR = Path("intent_classifier/Models")
+PICKLE_PATH = MODEL_DIR / "intent_classifier.pkl"
+COMPACT_PATH = MODEL_DIR / "intent_classifier.npz"
+
+# Probability link of the logistic regression
+PROBA_SOFTMAX = "softmax"   # multinomial
+PROBA_OVR = "ovr"           # one-vs-rest sigmoids, normalized
+PROBA_BINARY = "binary"     # two classes, one coefficient row
+
+
+def export_compact_model(pipeline, path: Path = COMPACT_PATH, check_texts: Iterable[str] = ()) -> Path:
+    """
+    Export a fitted Pipeline([("tfidf", TfidfVectorizer), ("clf", LogisticRegression)]).
+
+    Args:
+        pipeline: fitted sklearn pipeline
+        path (Path): destination .npz file
+        check_texts (Iterable[str]): texts on which the exported model must give
+            the same probabilities as the pipeline
+
+    Returns:
+        Path: the written file
+
+    Raises:
+        ValueError: if the vectorizer uses options the compact model does not
+            reproduce, or if the check texts give different probabilities
+    """
+    tfidf = pipeline.named_steps["tfidf"]
+    clf = pipeline.named_steps["clf"]
+
+    if (tfidf.analyzer != "word" or tfidf.preprocessor or tfidf.tokenizer or tfidf.stop_words
+            or tfidf.strip_accents or tfidf.binary or tfidf.norm != "l2" or not tfidf.use_idf):
+        raise ValueError("Only word n-gram TF-IDF vectorizers with l2 norm and idf can be exported")
+
+    if len(clf.classes_) == 2:
+        proba = PROBA_BINARY
+    elif getattr(clf, "multi_class", "auto") == "ovr" or clf.solver == "liblinear":
+        proba = PROBA_OVR
+    else:
+        proba = PROBA_SOFTMAX
+
+    # Feature index → term
+    terms = np.empty(len(tfidf.vocabulary_), dtype=object)
+    for term, index in tfidf.vocabulary_.items():
+        terms[index] = term
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Uncompressed: np.load then reads each array straight from the file
+    np.savez(
+        path,
+        terms=np.array(terms.tolist(), dtype=str),
+        idf=tfidf.idf_.astype(np.float64),
+        coef=clf.coef_.astype(np.float64),
+        intercept=clf.intercept_.astype(np.float64),
+        classes=np.array([str(c) for c in clf.classes_], dtype=str),
+        ngram_range=np.array(tfidf.ngram_range),
+        lowercase=np.array(tfidf.lowercase),
+        sublinear_tf=np.array(tfidf.sublinear_tf),
+        token_pattern=np.array(tfidf.token_pattern),
+        proba=np.array(proba),
+    )
+
+    check_texts = list(check_texts)
+    if check_texts:
+        expected = pipeline.predict_proba(check_texts)
+        actual = CompactIntentModel(path).predict_proba(check_texts)
+        if not np.allclose(expected, actual, atol=1e-6):
+            raise ValueError(f"Compact model differs from the pipeline (max error {np.abs(expected - actual).max():.2e})")
+
+    return path
+
+
+class CompactIntentModel:
+    def __init__(self, path: Path = COMPACT_PATH):
+        """
+        Load an exported model.
+
+        Args:
+            path (Path): .npz file written by export_compact_model()
+        """
+        with np.load(path, allow_pickle=False) as data:
+            terms = data["terms"]
+            self.idf = data["idf"]
+            self.coef = data["coef"]
+            self.intercept = data["intercept"]
+            self.classes_ = data["classes"]
+            self.ngram_range = tuple(int(n) for n in data["ngram_range"])
+            self.lowercase = bool(data["lowercase"])
+            self.sublinear_tf = bool(data["sublinear_tf"])
+            self.token_pattern = re.compile(str(data["token_pattern"]))
+            self.proba = str(data["proba"])
+
+        self.vocabulary: Dict[str, int] = {term: i for i, term in enumerate(terms.tolist())}
+
+    def _ngrams(self, text: str) -> List[str]:
+        # Same analyzer as TfidfVectorizer(analyzer="word")
+        if self.lowercase:
+            text = text.lower()
+        tokens = self.token_pattern.findall(text)
+
+        min_n, max_n = self.ngram_range
+        ngrams = list(tokens) if min_n == 1 else []
+        for n in range(max(min_n, 2), max_n + 1):
+            ngrams.extend(" ".join(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+        return ngrams
+
+    def transform(self, texts: Iterable[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        TF-IDF matrix of the texts in CSR form (one row per text, l2-normalized).
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray]: indptr, feature indices and weights
+        """
+        indptr = [0]
+        indices = []
+        tfs = []
+        for text in texts:
+            counts: Dict[int, int] = {}
+            for gram in self._ngrams(text):
+                index = self.vocabulary.get(gram)
+                if index is not None:
+                    counts[index] = counts.get(index, 0) + 1
+            indices.extend(counts.keys())
+            tfs.extend(counts.values())
+            indptr.append(len(indices))
+
+        indptr = np.array(indptr, dtype=np.int64)
+        indices = np.array(indices, dtype=np.int64)
+        tf = np.array(tfs, dtype=np.float64)
+        if self.sublinear_tf:
+            tf = np.log(tf) + 1
+        weights = tf * self.idf[indices]
+
+        # Row-wise l2 normalization
+        rows = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+        norms = np.zeros(len(indptr) - 1)
+        np.add.at(norms, rows, weights ** 2)
+        norms = np.sqrt(norms)
+        norms[norms == 0] = 1
+        return indptr, indices, weights / norms[rows]
+
+    def decision_function(self, texts: Iterable[str]) -> np.ndarray:
+        indptr, indices, weights = self.transform(texts)
+        rows = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+
+        # Sparse (texts × features) @ dense (features × classes)
+        scores = np.zeros((len(indptr) - 1, self.coef.shape[0]))
+        np.add.at(scores, rows, weights[:, None] * self.coef.T[indices])
+        return scores + self.intercept
+
+    def predict_proba(self, texts: Iterable[str]) -> np.ndarray:
+        """
+        Class probabilities of the texts, columns ordered as classes_.
+        """
+        scores = self.decision_function(texts)
+
+        if self.proba == PROBA_BINARY:
+            positive = 1 / (1 + np.exp(-scores[:, 0]))
+            return np.column_stack([1 - positive, positive])
+
+        if self.proba == PROBA_OVR:
+            proba = 1 / (1 + np.exp(-scores))
+            return proba / proba.sum(axis=1, keepdims=True)
+
+        scores -= scores.max(axis=1, keepdims=True)
+        proba = np.exp(scores)
+        return proba / proba.sum(axis=1, keepdims=True)
+
+    def predict(self, texts: Iterable[str]) -> np.ndarray:
+        return self.classes_[self.predict_proba(texts).argmax(axis=1)]
+
+
+def load_intent_model(compact_path: Path = COMPACT_PATH, pickle_path: Path = PICKLE_PATH):
+    """
+    Load the intent model: the compact artifact if it exists, else the joblib pipeline.
+
+    Returns:
+        a model exposing predict_proba() and classes_
+    """
+    start = time.perf_counter()
+    if compact_path.exists():
+        model = CompactIntentModel(compact_path)
+    else:
+        print(f"[WARNING] {compact_path} not found, loading the sklearn pipeline "
+              f"(run python -m intent_classifier.classifier to export it)")
+        from joblib import load
+        model = load(pickle_path)
+    print(f"[INFO] Intent model loaded in {(time.perf_counter() - start) * 1000:.1f} ms")
+    return model
+
+
+if __name__ == "__main__":
+    model = load_intent_model()
+    for query in ["Where can I charge my car?", "Find me a seafood restaurant within 5km"]:
+        probas = model.predict_proba([query])[0]
+        print(f"{query} → {model.classes_[probas.argmax()]} ({probas.max():.2f})")
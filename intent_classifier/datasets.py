@@ -0,0 +1,39 @@
+######################################################################
+# datasets.py
+
+# Paths and loader of the intent datasets (hobby / restaurant / station),
+# shared by the training CLI, the embedding matcher and the slot
+# extractor without importing the training dependencies.
+#
+# Functions:
+### - load_dataset
+######################################################################
+
+import json
+import random
+from pathlib import Path
+from typing import List, Tuple
+
+# === Paths to dataset files ===
+DATASET_DIR = Path("intent_classifier/Dataset")
+HOBBY_PATH = DATASET_DIR / "hobby.json"
+RESTAURANT_PATH = DATASET_DIR / "Restaurant.json"
+STATION_PATH = DATASET_DIR / "Station.json"
+DATASET_PATHS = (HOBBY_PATH, RESTAURANT_PATH, STATION_PATH)
+
+
+def load_dataset(paths: Tuple[Path, ...] = DATASET_PATHS, seed: int = 42) -> Tuple[List[str], List[str]]:
+    """
+    Load and shuffle the intent-specific datasets.
+
+    Returns:
+        Tuple[List[str], List[str]]: texts and their intents
+    """
+    all_data = []
+    for path in paths:
+        with open(path, "r") as f:
+            all_data += json.load(f)
+
+    # Ensure the dataset is well mixed
+    random.Random(seed).shuffle(all_data)
+    return [item["text"] for item in all_data], [item["intent"] for item in all_data]
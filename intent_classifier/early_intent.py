@@ -0,0 +1,117 @@
+######################################################################
+# early_intent.py
+
+# Fast intent pass over partial ASR hypotheses.
+#
+# The local TF-IDF + LogisticRegression model (see classifier.py) is run
+# on every partial transcript emitted while the driver is still talking.
+# Once the same intent has been predicted with enough confidence for a
+# few consecutive partials, it is considered stable and can be used to
+# start work speculatively (e.g. POI retrieval).
+######################################################################
+
+from typing import Optional, Tuple
+
+# Dataset labels → intents used by the dialogue manager
+INTENT_ALIASES = {
+    "station": "stations",
+    "restaurant": "restaurants",
+    "hobby": "hobbies",
+}
+
+SUPPORTED_INTENTS = ("stations", "restaurants", "hobbies")
+
+
+def normalize_intent(label: str) -> str:
+    """
+    Map a classifier label onto the intent names used by the dialogue manager.
+
+    Args:
+        label (str): raw label predicted by the model
+
+    Returns:
+        str: one of "stations", "restaurants", "hobbies" (or the label unchanged)
+    """
+    label = str(label).strip().lower()
+    return INTENT_ALIASES.get(label, label)
+
+
+def predict_intent(model, text: str) -> Tuple[str, float]:
+    """
+    Predict the intent of a transcript with the local model.
+
+    Args:
+        model: fitted classifier exposing predict_proba() and classes_
+        text (str): transcript to classify
+
+    Returns:
+        Tuple[str, float]: predicted intent and its probability
+    """
+    probas = model.predict_proba([text])[0]
+    best = max(range(len(probas)), key=lambda i: probas[i])
+    return normalize_intent(model.classes_[best]), float(probas[best])
+
+
+class EarlyIntentPredictor:
+    def __init__(self, model, min_confidence: float = 0.6, stable_count: int = 2):
+        """
+        Initialize the predictor.
+
+        Args:
+            model: fitted classifier exposing predict_proba() and classes_
+            min_confidence (float): minimum probability for a partial prediction to count
+            stable_count (int): number of consecutive agreeing partials before the
+                intent is considered stable
+        """
+        self.model = model
+        self.min_confidence = min_confidence
+        self.stable_count = stable_count
+        self.reset()
+
+    def reset(self):
+        """
+        Forget the partial predictions of the previous utterance.
+        """
+        self.last_intent = None
+        self.streak = 0
+        self.stable_intent = None
+
+    def predict(self, text: str) -> Tuple[str, float]:
+        """
+        Predict the intent of a (partial) transcript.
+
+        Args:
+            text (str): transcript to classify
+
+        Returns:
+            Tuple[str, float]: predicted intent and its probability
+        """
+        return predict_intent(self.model, text)
+
+    def update(self, partial: str) -> Optional[str]:
+        """
+        Feed a new partial hypothesis and return the intent once it is stable.
+
+        Args:
+            partial (str): latest partial transcript
+
+        Returns:
+            Optional[str]: the stable intent, or None while it is not stable yet
+        """
+        intent, confidence = self.predict(partial)
+
+        if confidence < self.min_confidence or intent not in SUPPORTED_INTENTS:
+            self.streak = 0
+            self.last_intent = None
+            return self.stable_intent
+
+        if intent == self.last_intent:
+            self.streak += 1
+        else:
+            self.last_intent = intent
+            self.streak = 1
+
+        if self.streak >= self.stable_count:
+            self.stable_intent = intent
+
+        return self.stable_intent
@@ -0,0 +1,288 @@
+######################################################################
+# embedding_matcher.py
+
+# Semantic nearest-neighbour intent matcher.
+#
+# Every utterance of the intent datasets is embedded once with a
+# sentence-transformers model and the unit-normalized vectors are stored
+# as a float32 .npy matrix, opened memory-mapped at query time. A query
+# is embedded and compared to the whole index with one matrix product
+# (cosine similarity); its k nearest utterances vote for their intent,
+# weighted by similarity. Paraphrases the TF-IDF model misses ("top up
+# the battery") land close to the right examples without an LLM call.
+#
+# The matcher exposes predict_proba() and classes_, like the TF-IDF
+# model, and nearest() returns the matched utterances themselves. Once
+# the index is built, the hybrid classifier consults it when the TF-IDF
+# model is unsure, before falling back to the LLM (INTENT_EMBEDDINGS=0
+# disables it).
+#
+# Usage:
+#   python -m intent_classifier.embedding_matcher build
+#   python -m intent_classifier.embedding_matcher query "top up the battery"
+#   python -m intent_classifier.embedding_matcher benchmark --queries 200
+#
+# Functions:
+### - build_index
+### - load_matcher
+### - benchmark
+######################################################################
+
+import argparse
+import importlib.util
+import json
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from intent_classifier.datasets import DATASET_PATHS, load_dataset
+from language_model.metrics import format_metric, percentile
+
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+INDEX_DIR = Path("intent_classifier/Models/embedding_index")
+EMBEDDINGS_FILE = "embeddings.npy"
+LABELS_FILE = "labels.npy"
+META_FILE = "meta.json"
+TOP_K = 5
+EMBEDDINGS_ENABLED = os.getenv("INTENT_EMBEDDINGS", "1") != "0"
+# Minimum vote share to accept the matcher's intent without the LLM
+EMBEDDING_THRESHOLD = 0.8
+
+
+def _load_encoder(model_name: str):
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(model_name)
+
+
+def _encode(encoder, texts: List[str], batch_size: int = 64) -> np.ndarray:
+    # Unit vectors, so that cosine similarity is a dot product
+    return np.asarray(encoder.encode(texts, batch_size=batch_size, normalize_embeddings=True,
+                                     convert_to_numpy=True), dtype=np.float32)
+
+
+def build_index(paths: Tuple[Path, ...] = DATASET_PATHS, index_dir: Path = INDEX_DIR,
+                model_name: str = EMBEDDING_MODEL, encoder=None, batch_size: int = 256) -> Path:
+    """
+    Embed every dataset utterance and write the index.
+
+    The matrix is written batch by batch into a memory-mapped .npy file,
+    so only one batch of embeddings is held in memory.
+
+    Args:
+        paths (Tuple[Path, ...]): JSON datasets of {"text": ..., "intent": ...} items
+        index_dir (Path): output directory
+        model_name (str): sentence-transformers model
+        encoder: already loaded model (default: loaded from model_name)
+        batch_size (int): utterances encoded at once
+
+    Returns:
+        Path: the index directory
+    """
+    start = time.perf_counter()
+    texts, intents = load_dataset(paths)
+    encoder = encoder or _load_encoder(model_name)
+
+    classes = sorted(set(intents))
+    codes = {label: i for i, label in enumerate(classes)}
+
+    index_dir.mkdir(parents=True, exist_ok=True)
+    dim = _encode(encoder, texts[:1]).shape[1]
+    matrix = np.lib.format.open_memmap(index_dir / EMBEDDINGS_FILE, mode="w+", dtype=np.float32,
+                                       shape=(len(texts), dim))
+    for i in range(0, len(texts), batch_size):
+        matrix[i:i + batch_size] = _encode(encoder, texts[i:i + batch_size], batch_size)
+    matrix.flush()
+    del matrix
+
+    np.save(index_dir / LABELS_FILE, np.array([codes[label] for label in intents], dtype=np.int16))
+    with (index_dir / META_FILE).open("w", encoding="utf-8") as f:
+        json.dump({
+            "model": model_name,
+            "dim": int(dim),
+            "size": len(texts),
+            "classes": classes,
+            "texts": texts,
+            "built_at": datetime.utcnow().isoformat() + "Z",
+        }, f, ensure_ascii=False)
+
+    print(f"[INFO] Indexed {len(texts)} utterances ({dim} dims) in {time.perf_counter() - start:.1f}s → {index_dir}")
+    return index_dir
+
+
+class EmbeddingIntentMatcher:
+    def __init__(self, index_dir: Path = INDEX_DIR, k: int = TOP_K, encoder=None):
+        """
+        Open an index written by build_index().
+
+        Args:
+            index_dir (Path): index directory
+            k (int): number of neighbours that vote
+            encoder: sentence-transformers model (default: the index's model, loaded
+                on the first query)
+        """
+        with (index_dir / META_FILE).open("r", encoding="utf-8") as f:
+            meta = json.load(f)
+
+        self.model_name = meta["model"]
+        self.texts: List[str] = meta["texts"]
+        self.classes_ = np.array(meta["classes"])
+        self.embeddings = np.load(index_dir / EMBEDDINGS_FILE, mmap_mode="r")
+        self.labels = np.load(index_dir / LABELS_FILE)
+        self.k = min(k, len(self.labels))
+        self._encoder = encoder
+        # Identifies the index and its vote, for the intent cache
+        self.fingerprint = f"{meta['model']}:{meta['size']}:{meta['built_at']}:{self.k}"
+
+    @property
+    def encoder(self):
+        if self._encoder is None:
+            self._encoder = _load_encoder(self.model_name)
+        return self._encoder
+
+    def _top_k(self, texts: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        queries = _encode(self.encoder, list(texts))
+        sims = queries @ self.embeddings.T  # (queries × index) cosine similarities
+
+        # Unordered top k per row in O(n), then sorted by decreasing similarity
+        top = np.argpartition(-sims, self.k - 1, axis=1)[:, :self.k]
+        top_sims = np.take_along_axis(sims, top, axis=1)
+        order = np.argsort(-top_sims, axis=1, kind="stable")
+        return np.take_along_axis(top, order, axis=1), np.take_along_axis(top_sims, order, axis=1)
+
+    def predict_proba(self, texts: List[str]) -> np.ndarray:
+        """
+        Similarity-weighted vote of the k nearest utterances, columns ordered as classes_.
+        """
+        top, sims = self._top_k(texts)
+        weights = np.clip(sims, 0, None)
+
+        votes = np.zeros((len(top), len(self.classes_)))
+        np.add.at(votes, (np.repeat(np.arange(len(top)), self.k), self.labels[top].ravel()), weights.ravel())
+        totals = votes.sum(axis=1, keepdims=True)
+        # No positive similarity: uniform
+        votes[totals[:, 0] == 0] = 1
+        return votes / votes.sum(axis=1, keepdims=True)
+
+    def predict(self, texts: List[str]) -> np.ndarray:
+        return self.classes_[self.predict_proba(texts).argmax(axis=1)]
+
+    def nearest(self, text: str) -> List[Tuple[str, str, float]]:
+        """
+        Nearest dataset utterances of a query.
+
+        Returns:
+            List[Tuple[str, str, float]]: (utterance, intent, cosine similarity), most similar first
+        """
+        top, sims = self._top_k([text])
+        return [(self.texts[i], str(self.classes_[self.labels[i]]), float(s)) for i, s in zip(top[0], sims[0])]
+
+
+def load_matcher(index_dir: Path = INDEX_DIR) -> Optional[EmbeddingIntentMatcher]:
+    """
+    Open the index for the hybrid classifier, if it can be used.
+
+    Returns:
+        Optional[EmbeddingIntentMatcher]: None when disabled (INTENT_EMBEDDINGS=0), when
+            the index was not built or when sentence-transformers is not installed
+    """
+    if not EMBEDDINGS_ENABLED or not (index_dir / META_FILE).exists():
+        return None
+    if importlib.util.find_spec("sentence_transformers") is None:
+        print("[WARNING] Embedding index found but sentence-transformers is not installed, matcher disabled")
+        return None
+    return EmbeddingIntentMatcher(index_dir)
+
+
+def benchmark(matcher: EmbeddingIntentMatcher, queries: List[str], batch_size: int = 64) -> dict:
+    """
+    Measure the latency of single queries and the throughput of batches.
+
+    Returns:
+        dict: p50 / p95 latency of one query (encoding and search separately) and
+            queries per second in batches
+    """
+    encode_times, search_times = [], []
+    for query in queries:
+        start = time.perf_counter()
+        vector = _encode(matcher.encoder, [query])
+        encoded = time.perf_counter()
+        sims = vector @ matcher.embeddings.T
+        np.argpartition(-sims, matcher.k - 1, axis=1)
+        encode_times.append(encoded - start)
+        search_times.append(time.perf_counter() - encoded)
+
+    start = time.perf_counter()
+    for i in range(0, len(queries), batch_size):
+        matcher.predict_proba(queries[i:i + batch_size])
+    batch_time = time.perf_counter() - start
+
+    return {
+        "queries": len(queries),
+        "index_size": len(matcher.labels),
+        "encode_p50_s": percentile(encode_times, 50),
+        "encode_p95_s": percentile(encode_times, 95),
+        "search_p50_s": percentile(search_times, 50),
+        "search_p95_s": percentile(search_times, 95),
+        "batch_qps": len(queries) / batch_time if batch_time > 0 else None,
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Embedding nearest-neighbour intent matcher")
+    parser.add_argument("--index", type=Path, default=INDEX_DIR)
+    parser.add_argument("-k", type=int, default=TOP_K, help="neighbours that vote")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    build = sub.add_parser("build", help="embed the datasets and write the index")
+    build.add_argument("--model", default=EMBEDDING_MODEL)
+    build.add_argument("--batch-size", type=int, default=256)
+
+    query = sub.add_parser("query", help="classify queries and show their neighbours")
+    query.add_argument("texts", nargs="+")
+
+    bench = sub.add_parser("benchmark", help="index build and query latency")
+    bench.add_argument("--queries", type=int, default=200, help="dataset utterances used as queries")
+    bench.add_argument("--batch-size", type=int, default=64)
+    bench.add_argument("--rebuild", action="store_true", help="also time a rebuild of the index")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        build_index(index_dir=args.index, model_name=args.model, batch_size=args.batch_size)
+        return
+
+    if args.command == "benchmark" and args.rebuild:
+        start = time.perf_counter()
+        build_index(index_dir=args.index)
+        print(f"[INFO] Build time: {time.perf_counter() - start:.2f}s")
+
+    if not (args.index / META_FILE).exists():
+        print(f"[ERROR] No index in {args.index} (run: python -m intent_classifier.embedding_matcher build)")
+        return
+
+    start = time.perf_counter()
+    matcher = EmbeddingIntentMatcher(args.index, k=args.k)
+    print(f"[INFO] Index opened in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    if args.command == "query":
+        probas = matcher.predict_proba(args.texts)
+        for text, row in zip(args.texts, probas):
+            print(f"{text} → {matcher.classes_[row.argmax()]} ({row.max():.2f})")
+            for utterance, intent, sim in matcher.nearest(text):
+                print(f"    {sim:.3f}  [{intent}] {utterance}")
+        return
+
+    queries = matcher.texts[:args.queries]
+    matcher.predict_proba(queries[:1])  # load the encoder before timing
+    result = benchmark(matcher, queries, args.batch_size)
+    print(f"\nIndex: {result['index_size']} utterances, {result['queries']} queries, k={matcher.k}")
+    print(f"Encode  p50 {result['encode_p50_s'] * 1000:.2f} ms  p95 {result['encode_p95_s'] * 1000:.2f} ms")
+    print(f"Search  p50 {result['search_p50_s'] * 1000:.2f} ms  p95 {result['search_p95_s'] * 1000:.2f} ms")
+    print(f"Batches {format_metric(result['batch_qps'])} queries/s")
+
+
+if __name__ == "__main__":
+    main()
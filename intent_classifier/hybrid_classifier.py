@@ -0,0 +1,166 @@
+######################################################################
+# hybrid_classifier.py
+
+# Local fast path for intent classification with an LLM fallback.
+#
+# The TF-IDF + LogisticRegression model (classifier.py) answers in
+# microseconds; the LLM (classifier2.get_intent) needs a full network
+# round-trip. The local label is accepted when its probability reaches
+# the confidence threshold and the slots (name, distance, rating) can be
+# extracted locally without ambiguity. When the model is unsure, the
+# embedding matcher (embedding_matcher.py, if its index was built) gets the
+# same chance with its own threshold; otherwise the query goes to the LLM.
+# Utterances already classified are answered from the intent cache
+# (intent_cache.py) without running either. Every decision is appended
+# to intent_classifier/logs/ for analysis.
+######################################################################
+
+import json
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, List, Optional
+
+from intent_classifier.classifier2 import get_intent
+from intent_classifier.early_intent import SUPPORTED_INTENTS, predict_intent
+from intent_classifier.embedding_matcher import EMBEDDING_THRESHOLD, EmbeddingIntentMatcher, load_matcher
+from intent_classifier.intent_cache import CACHE_ENABLED, IntentCache, classifier_version
+from intent_classifier.slot_extractor import SlotExtractor
+
+DECISION_LOG = Path("intent_classifier/logs/intent_decisions.jsonl")
+DEFAULT_THRESHOLD = 0.85
+
+
+class HybridIntentClassifier:
+    def __init__(self, model, threshold: float = DEFAULT_THRESHOLD, llm_classifier: Callable[[str], List[str]] = get_intent,
+                 slot_extractor: Optional[SlotExtractor] = None, cache: Optional[IntentCache] = None,
+                 embedding_matcher: Optional[EmbeddingIntentMatcher] = None,
+                 embedding_threshold: float = EMBEDDING_THRESHOLD):
+        """
+        Initialize the classifier.
+
+        Args:
+            model: fitted local classifier exposing predict_proba() and classes_
+            threshold (float): minimum probability to accept the local label
+            llm_classifier (Callable): fallback returning the keyword list of a query
+            slot_extractor (SlotExtractor): local extraction of names and conditions
+            cache (IntentCache): cache of classified utterances (default: the shared cache
+                file, unless INTENT_CACHE=0)
+            embedding_matcher (EmbeddingIntentMatcher): second local classifier tried before
+                the LLM (default: the built index, see load_matcher())
+            embedding_threshold (float): minimum vote share to accept the matcher's label
+        """
+        self.model = model
+        self.threshold = threshold
+        self.llm_classifier = llm_classifier
+        self.slot_extractor = slot_extractor or SlotExtractor()
+        self.embedding_matcher = embedding_matcher or load_matcher()
+        self.embedding_threshold = embedding_threshold
+        if cache is None and CACHE_ENABLED:
+            cache = IntentCache(classifier_version(threshold, self.slot_extractor, self.embedding_matcher,
+                                                   embedding_threshold))
+        self.cache = cache
+        # "local", "embedding" or "llm": how the last query was classified
+        self.last_source = None
+
+    def classify(self, query: str, on_fallback: Optional[Callable[[str, float], None]] = None) -> List[str]:
+        """
+        Classify a query, calling the LLM only when the local model is unsure.
+
+        Args:
+            query (str): the user's transcribed query
+            on_fallback (Callable[[str, float], None]): called with the local intent and
+                its confidence right before the LLM call, e.g. to start work speculatively
+
+        Returns:
+            List[str]: keywords, the intent first (e.g. ["restaurants", "seafood", "5km"])
+        """
+        start = time.perf_counter()
+        cached = self.cache.get(query) if self.cache else None
+        if cached is not None:
+            # Same source as the first time, so that the response policy does not change
+            self.last_source = cached["source"]
+            print(f"[INFO] Intent from cache ({cached['source']}) in {time.perf_counter() - start:.3f}s")
+            self.log_decision({
+                "timestamp": datetime.utcnow().isoformat() + "Z",
+                "query": query,
+                "source": cached["source"],
+                "cache_hit": True,
+                "keywords": cached["keywords"],
+                "total_time_s": round(time.perf_counter() - start, 5),
+            })
+            return list(cached["keywords"])
+
+        local_intent, confidence = predict_intent(self.model, query)
+        local_time = time.perf_counter() - start
+
+        source = None
+        ambiguous_slots = None
+        embedding_intent, embedding_confidence = None, None
+        if confidence >= self.threshold and local_intent in SUPPORTED_INTENTS:
+            keywords, ambiguous_slots = self.slot_extractor.extract(query, local_intent)
+            if ambiguous_slots is False:
+                source = "local"
+        elif self.embedding_matcher is not None:
+            # The intent is the uncertain part: a paraphrase may be close to known examples
+            embedding_intent, embedding_confidence = self._embedding_intent(query)
+            if embedding_confidence >= self.embedding_threshold and embedding_intent in SUPPORTED_INTENTS:
+                keywords, ambiguous_slots = self.slot_extractor.extract(query, embedding_intent)
+                if ambiguous_slots is False:
+                    source = "embedding"
+
+        if source is None:
+            source = "llm"
+            if on_fallback:
+                on_fallback(local_intent, confidence)
+            keywords = self.llm_classifier(query)
+
+        self.last_source = source
+        # Failed or unsupported answers are not cached, they are retried next time
+        if self.cache and keywords and keywords[0] in SUPPORTED_INTENTS:
+            self.cache.put(query, keywords, source)
+        total_time = time.perf_counter() - start
+        print(f"[INFO] Intent from {source} (local: {local_intent}, p={confidence:.2f}) in {total_time:.3f}s")
+
+        self.log_decision({
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "query": query,
+            "local_intent": local_intent,
+            "local_confidence": round(confidence, 4),
+            "threshold": self.threshold,
+            "embedding_intent": embedding_intent,
+            "embedding_confidence": round(embedding_confidence, 4) if embedding_confidence is not None else None,
+            "ambiguous_slots": ambiguous_slots,
+            "source": source,
+            "cache_hit": False,
+            "keywords": keywords,
+            "local_time_s": round(local_time, 5),
+            "total_time_s": round(total_time, 4),
+        })
+        return keywords
+
+    def _embedding_intent(self, query: str):
+        try:
+            return predict_intent(self.embedding_matcher, query)
+        except Exception as e:
+            # e.g. the encoder cannot be loaded: do not retry on every query
+            print(f"[WARNING] Embedding matcher failed, disabled: {e}")
+            self.embedding_matcher = None
+            return None, 0.0
+
+    @staticmethod
+    def log_decision(entry: dict):
+        """
+        Append one classification decision to the decision log.
+        """
+        DECISION_LOG.parent.mkdir(parents=True, exist_ok=True)
+        with DECISION_LOG.open("a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+
+
+if __name__ == "__main__":
+    from intent_classifier.compact_model import load_intent_model
+
+    classifier = HybridIntentClassifier(load_intent_model())
+    for query in ["Where can I charge my car?", "Find me a seafood restaurant within 5km"]:
+        print(classifier.classify(query))
@@ -0,0 +1,175 @@
+######################################################################
+# intent_cache.py
+
+# Disk-persisted cache of classified utterances.
+#
+# Drivers repeat themselves, so the keyword list returned by the hybrid
+# classifier (e.g. ["restaurants", "seafood", "5km"]) is stored under the
+# normalized utterance: lowercased, accents and punctuation folded,
+# number words and decimal commas canonicalized ("Find a charger near
+# me!" and "find a charger  near me" share an entry, as do "five km" and
+# "5 km"). The least recently used entries are evicted beyond a maximum
+# size, and the whole cache is dropped when the classifier version (model
+# artifact, intent LLM and prompt, thresholds, slot extraction rules and gazetteer,
+# embedding index) changes. The hit/miss counters are persisted with the entries, so the
+# hit rate is measured across runs. Persistence (journal of new entries,
+# compaction, counters) is shared with the LLM response cache.
+#
+# Usage:
+#   python -m intent_classifier.intent_cache          (show cache statistics)
+#   python -m intent_classifier.intent_cache --clear
+#
+# Functions:
+### - normalize_utterance
+### - classifier_version
+######################################################################
+
+import hashlib
+import os
+import re
+import unicodedata
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from intent_classifier.compact_model import COMPACT_PATH, PICKLE_PATH
+from language_model.cache import PersistedLRUCache
+
+CACHE_FILE = Path("intent_classifier/cache/intent_cache.json")
+CACHE_MAX_ENTRIES = 5000
+CACHE_ENABLED = os.getenv("INTENT_CACHE", "1") != "0"
+# Bump when the normalization or the format of the entries changes
+CACHE_FORMAT = 1
+
+NUMBER_WORDS = {
+    "zero": "0", "one": "1", "two": "2", "three": "3", "four": "4", "five": "5", "six": "6", "seven": "7",
+    "eight": "8", "nine": "9", "ten": "10", "eleven": "11", "twelve": "12", "fifteen": "15", "twenty": "20",
+    "thirty": "30", "fifty": "50", "hundred": "100",
+}
+
+DECIMAL_COMMA_RE = re.compile(r"(\d),(\d)")
+DECIMAL_RE = re.compile(r"\d+\.\d+")
+# Anything but letters, digits, whitespace and the decimal point of a number
+PUNCTUATION_RE = re.compile(r"[^\w\s.]|_|(?<!\d)\.|\.(?!\d)")
+# "5km" → "5 km", "4.5stars" → "4.5 stars"
+NUMBER_UNIT_RE = re.compile(r"(\d)([a-z])")
+NUMBER_WORD_RE = re.compile(r"\b(" + "|".join(NUMBER_WORDS) + r")\b")
+
+
+def normalize_utterance(text: str) -> str:
+    """
+    Fold the surface differences of an utterance that do not change its meaning.
+
+    Args:
+        text (str): transcribed utterance
+
+    Returns:
+        str: normalized utterance, e.g. "Find me 2 restaurants within 5,0 KM!" →
+            "find me 2 restaurants within 5 km"
+    """
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+
+    text = DECIMAL_COMMA_RE.sub(r"\1.\2", text)
+    text = PUNCTUATION_RE.sub(" ", text)
+    text = NUMBER_WORD_RE.sub(lambda m: NUMBER_WORDS[m.group(1)], text)
+    # "4.50" → "4.5", "5.0" → "5"
+    text = DECIMAL_RE.sub(lambda m: m.group(0).rstrip("0").rstrip("."), text)
+    text = NUMBER_UNIT_RE.sub(r"\1 \2", text)
+    return " ".join(text.split())
+
+
+def classifier_version(threshold: float, slot_extractor=None, embedding_matcher=None,
+                       embedding_threshold: Optional[float] = None, model_paths=(COMPACT_PATH, PICKLE_PATH)) -> str:
+    """
+    Fingerprint of everything that determines the keywords of an utterance.
+
+    Args:
+        threshold (float): confidence threshold of the local model
+        slot_extractor (SlotExtractor): extractor whose rules and gazetteer are hashed
+            (default: a SlotExtractor built from the datasets)
+        embedding_matcher (EmbeddingIntentMatcher): embedding index consulted before the
+            LLM, if any
+        embedding_threshold (Optional[float]): minimum vote share of the matcher
+        model_paths: intent model artifacts, the first existing one is hashed
+
+    Returns:
+        str: short hash that changes when the model, the LLM and its prompt, the thresholds,
+            the slot extraction rules or gazetteer, the embedding index or the cache
+            format changes
+    """
+    from intent_classifier.classifier2 import INTENT_MODEL, create_prompt
+    from intent_classifier.slot_extractor import SlotExtractor
+
+    slot_extractor = slot_extractor or SlotExtractor()
+    embedding = f"{embedding_matcher.fingerprint}:{embedding_threshold}" if embedding_matcher else "none"
+    digest = hashlib.sha256(
+        f"{CACHE_FORMAT}\n{threshold}\n{slot_extractor.fingerprint}\n{embedding}\n{INTENT_MODEL}\n{create_prompt('')}"
+        .encode("utf-8"))
+    for path in model_paths:
+        if path.exists():
+            with path.open("rb") as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(block)
+            break
+    return digest.hexdigest()[:16]
+
+
+class IntentCache(PersistedLRUCache):
+    description = "intent cache"
+
+    def __init__(self, version: str, path: Path = CACHE_FILE, max_entries: Optional[int] = CACHE_MAX_ENTRIES):
+        """
+        Initialize the cache (the file is loaded on first access).
+
+        Args:
+            version (str): classifier version, entries of another version are discarded
+            path (Path): JSON file where the entries are persisted
+            max_entries (Optional[int]): LRU bound, None for unbounded
+        """
+        super().__init__(path, max_entries)
+        self.version = version
+
+    def _header(self) -> Dict:
+        return {"version": self.version}
+
+    def _compatible(self, data: Dict) -> bool:
+        # Written by another version of the classifier
+        return data.get("version") == self.version
+
+    def get(self, utterance: str) -> Optional[Dict]:
+        """
+        Return the cached entry of an utterance ({"keywords": [...], "source": ...}), or None.
+        """
+        return self._lookup(normalize_utterance(utterance))
+
+    def put(self, utterance: str, keywords: List[str], source: str):
+        """
+        Store the keywords of an utterance and append them to the journal.
+
+        Args:
+            utterance (str): transcribed utterance
+            keywords (List[str]): keyword list, the intent first
+            source (str): "local", "embedding" or "llm", how the keywords were obtained
+        """
+        key = normalize_utterance(utterance)
+        if key:
+            self._store(key, {"keywords": list(keywords), "source": source})
+
+
+if __name__ == "__main__":
+    import sys
+
+    from intent_classifier.embedding_matcher import EMBEDDING_THRESHOLD, load_matcher
+    from intent_classifier.hybrid_classifier import DEFAULT_THRESHOLD
+
+    # Same version as the default HybridIntentClassifier
+    cache = IntentCache(classifier_version(DEFAULT_THRESHOLD, embedding_matcher=load_matcher(),
+                                           embedding_threshold=EMBEDDING_THRESHOLD))
+    if "--clear" in sys.argv:
+        cache.clear()
+        print(f"[INFO] Intent cache cleared: {CACHE_FILE}")
+    else:
+        stats = cache.stats()
+        print(f"[INFO] {stats['entries']} cached utterances in {CACHE_FILE} (version {cache.version})")
+        for name, value in stats.items():
+            print(f"{name:<16} {value}")
@@ -0,0 +1,221 @@
+######################################################################
+# slot_extractor.py
+
+# Rule-based extraction of the keyword list that classifier2.get_intent
+# asks the LLM for, e.g. ["restaurants", "seafood", "5km", "4.4"]:
+# - distance and rating conditions with precompiled regexes
+# - point of interest names (cuisines, activities) with a gazetteer
+#   built from the hobby taxonomy of the retriever, a list of common
+#   cuisines and the "<name> restaurant/food" phrases of the datasets
+#
+# The result is flagged as ambiguous when it cannot be expressed
+# reliably (several names, conditions without a name, numbers we could
+# not interpret, a "<name> restaurant" or "place for <name>" whose name
+# is not in the gazetteer); the caller then falls back to the LLM.
+######################################################################
+
+import hashlib
+import json
+import re
+from collections import Counter
+from pathlib import Path
+from typing import Iterable, List, Optional, Set, Tuple
+
+from information_retriever.retriever import ACTIVITY_SYNONYMS
+from intent_classifier.datasets import HOBBY_PATH, RESTAURANT_PATH
+
+# Bump when the extraction rules change (the intent cache depends on them)
+SLOT_RULES_VERSION = 2
+
+CUISINES = {
+    "african", "american", "asian", "british", "chinese", "european", "french", "greek", "indian",
+    "italian", "japanese", "korean", "lebanese", "mexican", "moroccan", "spanish", "thai", "turkish",
+    "vietnamese", "seafood", "sea food", "fish", "fish and chips", "sushi", "pizza", "pizzeria", "pasta",
+    "burger", "burgers", "steak", "steakhouse", "bbq", "barbecue", "grill", "vegan", "vegetarian",
+    "halal", "kebab", "tapas", "ramen", "noodles", "curry", "bakery", "bakeries", "cafe", "café",
+    "coffee", "brunch", "breakfast", "fast food", "dessert", "desserts", "ice cream", "creperie",
+    "crepes", "bistro", "brasserie", "pub", "salad", "sandwich", "sandwiches",
+}
+
+ACTIVITIES = {
+    "basketball", "football", "soccer", "futsal", "climbing", "escalade", "ice skating", "patinoire",
+    "theatre", "theater", "escape game", "escape room", "concert", "music", "biking", "cycling",
+    "hiking", "golf", "mini golf", "tennis", "karaoke", "paintball", "karting", "laser tag",
+} | {syn.lower() for syns in ACTIVITY_SYNONYMS for syn in syns}
+
+# Words that are never a point of interest name
+STOPWORDS = {
+    "a", "an", "the", "some", "any", "good", "nice", "best", "cheap", "nearby", "near", "close",
+    "local", "open", "great", "new", "me", "my", "find", "recommend", "suggest", "place", "restaurant",
+    "restaurants", "food", "cuisine", "places", "where", "what", "which", "to", "for", "of",
+    "quick", "fancy", "family", "friendly", "decent", "popular", "top", "affordable", "nearest",
+    "closest", "other", "another", "different", "fun", "here", "there", "around",
+}
+
+# --- Precompiled patterns ---
+NUMBER = r"(\d+(?:[.,]\d+)?)"
+DISTANCE_RE = re.compile(NUMBER + r"\s*(km|kms|kilomet(?:er|re)s?|mi|miles?)\b", re.IGNORECASE)
+RATING_RE = re.compile(
+    NUMBER + r"\s*\+?\s*stars?\b"
+    r"|rat(?:ing|ed)\s+(?:of\s+|above\s+|over\s+|at\s+least\s+|of\s+at\s+least\s+|>=?\s*)?" + NUMBER,
+    re.IGNORECASE,
+)
+ANY_NUMBER_RE = re.compile(r"\d+(?:[.,]\d+)?")
+DATASET_NAME_RE = re.compile(r"\b([a-z]+(?: [a-z]+)?) (?:restaurants?|food|cuisine)\b")
+# Phrases naming a point of interest, whether or not the name is in the gazetteer
+NAME_PHRASE_RES = {
+    "restaurants": DATASET_NAME_RE,
+    "hobbies": re.compile(r"\b(?:places?|spots?|somewhere) (?:for|to go|to do) ([a-z]+(?: [a-z]+)?)\b"),
+}
+
+
+def _gazetteer_regex(terms: Iterable[str]) -> re.Pattern:
+    # Longest terms first so that "swimming pool" wins over "swimming"
+    ordered = sorted({t.lower() for t in terms if t}, key=len, reverse=True)
+    return re.compile(r"\b(" + "|".join(re.escape(t) for t in ordered) + r")\b", re.IGNORECASE)
+
+
+def mine_dataset_names(path: Path, min_count: int = 2) -> Set[str]:
+    """
+    Collect the words used as "<name> restaurant/food/cuisine" in a dataset.
+
+    Args:
+        path (Path): JSON dataset of {"text": ..., "intent": ...} items
+        min_count (int): minimum number of occurrences to keep a name
+
+    Returns:
+        Set[str]: mined names (empty if the dataset is missing)
+    """
+    if not path.exists():
+        return set()
+
+    with path.open("r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    counts = Counter()
+    for item in data:
+        for match in DATASET_NAME_RE.finditer(item.get("text", "").lower()):
+            words = [w for w in match.group(1).split() if w not in STOPWORDS]
+            if words:
+                counts[" ".join(words)] += 1
+    return {name for name, count in counts.items() if count >= min_count}
+
+
+class SlotExtractor:
+    def __init__(self, cuisines: Optional[Set[str]] = None, activities: Optional[Set[str]] = None):
+        """
+        Build the gazetteers and compile their patterns once.
+
+        Args:
+            cuisines (Optional[Set[str]]): restaurant names (default: CUISINES + Restaurant.json)
+            activities (Optional[Set[str]]): hobby names (default: ACTIVITIES + hobby.json)
+        """
+        if cuisines is None:
+            cuisines = CUISINES | mine_dataset_names(RESTAURANT_PATH)
+        if activities is None:
+            activities = ACTIVITIES | mine_dataset_names(HOBBY_PATH)
+
+        self.name_patterns = {
+            "restaurants": _gazetteer_regex(cuisines),
+            "hobbies": _gazetteer_regex(activities),
+        }
+        self.fingerprint = self._fingerprint(cuisines, activities)
+
+    @staticmethod
+    def _fingerprint(cuisines: Set[str], activities: Set[str]) -> str:
+        # Rules version and gazetteer contents: what the keywords of a query depend on
+        gazetteer = {"restaurants": sorted({t.lower() for t in cuisines if t}),
+                     "hobbies": sorted({t.lower() for t in activities if t})}
+        raw = json.dumps([SLOT_RULES_VERSION, gazetteer], ensure_ascii=False)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+    @staticmethod
+    def _format_number(value: str) -> str:
+        value = value.replace(",", ".")
+        number = float(value)
+        return str(int(number)) if number.is_integer() and "." not in value else str(number)
+
+    @staticmethod
+    def _has_unknown_name(text: str, intent: str, names: List[str]) -> bool:
+        # A word in a name phrase that is neither a stopword nor part of a gazetteer match
+        phrase_re = NAME_PHRASE_RES.get(intent)
+        if phrase_re is None:
+            return False
+        known = {word for name in names for word in name.split()}
+        return any(word not in STOPWORDS and word not in known
+                   for match in phrase_re.finditer(text) for word in match.group(1).split())
+
+    def extract(self, query: str, intent: str) -> Tuple[List[str], bool]:
+        """
+        Extract the keyword list of a query for a known intent.
+
+        Args:
+            query (str): the user's transcribed query
+            intent (str): "stations", "restaurants" or "hobbies"
+
+        Returns:
+            Tuple[List[str], bool]: keywords in the get_intent() format
+                (intent, name, conditions) and whether the result is ambiguous
+        """
+        # Station retrieval only depends on the user's preferences
+        if intent == "stations":
+            return [intent], False
+
+        text = query.lower()
+        conditions = []
+        consumed = []
+
+        for match in DISTANCE_RE.finditer(text):
+            value = float(match.group(1).replace(",", "."))
+            if match.group(2).startswith("mi"):
+                value = round(value * 1.609, 1)
+                conditions.append(f"{value}km")
+            else:
+                conditions.append(f"{self._format_number(match.group(1))}km")
+            consumed.append(match.span())
+
+        for match in RATING_RE.finditer(text):
+            value = match.group(1) or match.group(2)
+            if float(value.replace(",", ".")) > 5:
+                return [intent], True
+            conditions.append(str(float(value.replace(",", "."))))
+            consumed.append(match.span())
+
+        # Numbers we could not interpret (e.g. "in 10 minutes")
+        for match in ANY_NUMBER_RE.finditer(text):
+            if not any(start <= match.start() < end for start, end in consumed):
+                return [intent], True
+
+        pattern = self.name_patterns.get(intent)
+        names = list(dict.fromkeys(m.group(1).lower() for m in pattern.finditer(text))) if pattern else []
+
+        if self._has_unknown_name(text, intent, names):
+            # e.g. "a Peruvian restaurant": the name would be lost without the LLM
+            return [intent], True
+        if len(names) > 1 or len(conditions) > 2:
+            return [intent], True
+        if conditions and not names:
+            # The keyword list is positional: conditions need a name first
+            return [intent], True
+
+        return [intent] + names + conditions, False
+
+
+if __name__ == "__main__":
+    import time
+
+    extractor = SlotExtractor()
+    queries = [
+        ("Recommend me a seafood restaurant in 5km with a minimum rating of 4.4 stars.", "restaurants"),
+        ("Find some bakeries with a minimum rating of 4.5 stars near me", "restaurants"),
+        ("Find me a place for biking near here.", "hobbies"),
+        ("Suggest me a place where can I have fun?", "hobbies"),
+        ("Find an Italian or a Japanese restaurant", "restaurants"),
+        ("Find me a Peruvian restaurant", "restaurants"),
+        ("Find me a place for horse riding", "hobbies"),
+    ]
+    for query, intent in queries:
+        start = time.perf_counter()
+        keywords, ambiguous = extractor.extract(query, intent)
+        elapsed = (time.perf_counter() - start) * 1e6
+        print(f"{keywords} ambiguous={ambiguous} ({elapsed:.0f} µs)")
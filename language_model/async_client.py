@@ -0,0 +1,371 @@
+######################################################################
+# async_client.py
+
+# Asynchronous access to the language models, bounded by the latency
+# budget of the dialogue turn.
+#
+# - TurnBudget: the time the assistant may spend on one turn
+#   (LLM_TURN_BUDGET in .env, seconds); every LLM call gets an absolute
+#   deadline derived from it instead of a fixed per-request timeout
+# - achat / achat_stream: AsyncOpenAI calls that retry transient errors
+#   (timeouts, connection errors, 429, 5xx) with jittered exponential
+#   backoff, but only while enough of the budget remains
+# - cancelling the caller (or closing the stream early, e.g. on
+#   barge-in) cancels the HTTP request instead of letting it run
+#
+# The dialogue manager is synchronous: chat_with_deadline and
+# stream_with_deadline run the coroutines on one background event loop
+# and propagate the cancellation both ways.
+#
+# Functions:
+### - get_async_client
+### - achat
+### - achat_stream
+### - chat_with_deadline
+### - stream_with_deadline
+######################################################################
+
+import asyncio
+import os
+import random
+import threading
+import time
+from typing import AsyncIterator, Iterator, Optional
+
+from language_model import client
+from language_model.cache import response_cache
+from language_model.client import FALLBACK_RESPONSE, OPENROUTER_URL, build_messages, resolve_model
+from language_model.metrics import current_dialogue_state, record_llm_call, record_stream_metrics
+
+TURN_BUDGET_S = float(os.getenv("LLM_TURN_BUDGET", "10"))
+# No attempt is started with less time than this left
+MIN_ATTEMPT_S = 0.5
+MAX_ATTEMPTS = 3
+BACKOFF_BASE_S = 0.2
+BACKOFF_CAP_S = 2.0
+
+_async_client = None
+_loop = None
+_loop_lock = threading.Lock()
+
+
+class TurnBudget:
+    def __init__(self, budget_s: float = TURN_BUDGET_S):
+        """
+        Start the latency budget of a dialogue turn.
+
+        Args:
+            budget_s (float): time allowed for the whole turn in seconds
+        """
+        self.budget_s = budget_s
+        self.started = time.monotonic()
+
+    def remaining(self) -> float:
+        """
+        Seconds left before the end of the turn budget (negative once exceeded).
+        """
+        return self.started + self.budget_s - time.monotonic()
+
+    def deadline(self, reserve: float = 0.0) -> float:
+        """
+        Absolute deadline (time.monotonic()) of an LLM call in this turn.
+
+        Args:
+            reserve (float): time kept for the stages after the call
+
+        Returns:
+            float: the deadline, never less than MIN_ATTEMPT_S from now so that
+                a late turn still gets one attempt
+        """
+        return max(self.started + self.budget_s - reserve, time.monotonic() + MIN_ATTEMPT_S)
+
+
+def get_async_client():
+    """
+    Return the AsyncOpenAI client of the background event loop, creating it on first use.
+
+    Retries are disabled in the SDK: they are done here, within the deadline.
+
+    Raises:
+        ValueError: If OPENROUTER_API_KEY is not set.
+    """
+    global _async_client
+
+    if _async_client is None:
+        import httpx
+        from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+        api_key = os.getenv("OPENROUTER_API_KEY")
+        if not api_key:
+            raise ValueError("OPENROUTER_API_KEY not found in .env")
+
+        _async_client = AsyncOpenAI(
+            api_key=api_key,
+            base_url=os.getenv("LLM_BASE_URL", OPENROUTER_URL),
+            max_retries=0,
+            http_client=DefaultAsyncHttpxClient(
+                limits=httpx.Limits(max_connections=client.MAX_CONNECTIONS,
+                                    max_keepalive_connections=client.MAX_KEEPALIVE_CONNECTIONS)
+            ),
+        )
+    return _async_client
+
+
+def _retryable(error: Exception) -> bool:
+    import openai
+
+    if isinstance(error, (asyncio.TimeoutError, openai.APIConnectionError, openai.RateLimitError,
+                          openai.InternalServerError)):
+        return True
+    return isinstance(error, openai.APIStatusError) and error.status_code >= 500
+
+
+def _backoff(attempt: int) -> float:
+    # Full jitter: spreads the retries of concurrent calls
+    return random.uniform(0, min(BACKOFF_CAP_S, BACKOFF_BASE_S * 2 ** attempt))
+
+
+async def _wait_before_retry(model_id: str, attempt: int, error: Exception, deadline: float) -> bool:
+    if not _retryable(error):
+        print(f"[ERROR] {model_id} via OpenRouter failed: {error}")
+        return False
+
+    delay = _backoff(attempt)
+    if attempt + 1 >= MAX_ATTEMPTS or deadline - time.monotonic() - delay < MIN_ATTEMPT_S:
+        print(f"[ERROR] {model_id} via OpenRouter failed, no time left to retry: {error!r}")
+        return False
+
+    print(f"[WARNING] {model_id} attempt {attempt + 1} failed ({error!r}), retrying in {delay:.2f}s")
+    await asyncio.sleep(delay)
+    return True
+
+
+async def achat(prompt: str, model: Optional[str] = None, deadline: Optional[float] = None,
+                temperature: float = 0.6, max_tokens: int = 150, use_cache: bool = True,
+                state: Optional[str] = None) -> str:
+    """
+    Get a response from a language model before a deadline.
+
+    Args:
+        prompt (str): the user's request
+        model (Optional[str]): registry name or model ID (default: LLM_MODEL)
+        deadline (Optional[float]): absolute time.monotonic() deadline
+            (default: a full turn budget from now)
+        temperature (float): sampling temperature
+        max_tokens (int): maximum length of the response
+        use_cache (bool): reuse the response of an identical earlier request
+        state (Optional[str]): dialogue state recorded with the call (default: the current one)
+
+    Returns:
+        str: response from the assistant, or a fallback sentence on error or timeout
+    """
+    model_id = resolve_model(model)
+    deadline = deadline or time.monotonic() + TURN_BUDGET_S
+    use_cache = use_cache and client.CACHE_ENABLED
+    state = state or current_dialogue_state()
+    start = time.perf_counter()
+
+    if use_cache:
+        cached = response_cache.get(model_id, prompt, temperature, max_tokens)
+        if cached is not None:
+            await asyncio.to_thread(record_llm_call, model_id, "async_chat", time.perf_counter() - start,
+                                    cache_hit=True, state=state)
+            return cached
+
+    error = "turn budget exhausted"
+    for attempt in range(MAX_ATTEMPTS):
+        remaining = deadline - time.monotonic()
+        if remaining < MIN_ATTEMPT_S:
+            print(f"[WARNING] {model_id}: turn budget exhausted")
+            break
+        try:
+            completion = await asyncio.wait_for(get_async_client().chat.completions.create(
+                model=model_id,
+                messages=build_messages(prompt),
+                temperature=temperature,
+                max_tokens=max_tokens
+            ), timeout=remaining)
+            response = completion.choices[0].message.content.strip()
+            usage = completion.usage
+            # The logs and the cache are written off the event loop shared by all the sessions
+            await asyncio.to_thread(record_llm_call, model_id, "async_chat", time.perf_counter() - start,
+                                    prompt_tokens=usage.prompt_tokens if usage else None,
+                                    completion_tokens=usage.completion_tokens if usage else None, state=state)
+            if use_cache:
+                await asyncio.to_thread(response_cache.put, model_id, prompt, temperature, max_tokens, response)
+            return response
+        except Exception as e:
+            error = repr(e)
+            if not await _wait_before_retry(model_id, attempt, e, deadline):
+                break
+
+    await asyncio.to_thread(record_llm_call, model_id, "async_chat", time.perf_counter() - start,
+                            error=error, state=state)
+    return FALLBACK_RESPONSE
+
+
+async def achat_stream(prompt: str, model: Optional[str] = None, deadline: Optional[float] = None,
+                       temperature: float = 0.6, max_tokens: int = 150, use_cache: bool = True,
+                       state: Optional[str] = None) -> AsyncIterator[str]:
+    """
+    Stream a response from a language model before a deadline, delta by delta.
+
+    An attempt is only retried if it failed before its first delta. If the
+    deadline is reached mid-response, the stream stops with what was
+    produced so far.
+
+    Args:
+        prompt (str): the user's request
+        model (Optional[str]): registry name or model ID (default: LLM_MODEL)
+        deadline (Optional[float]): absolute time.monotonic() deadline
+            (default: a full turn budget from now)
+        temperature (float): sampling temperature
+        max_tokens (int): maximum length of the response
+        use_cache (bool): reuse the response of an identical earlier request
+        state (Optional[str]): dialogue state recorded with the call (pass it
+            explicitly: the stream may be consumed after the state has changed)
+
+    Yields:
+        str: the successive text deltas of the response
+    """
+    model_id = resolve_model(model)
+    deadline = deadline or time.monotonic() + TURN_BUDGET_S
+    use_cache = use_cache and client.CACHE_ENABLED
+    state = state or current_dialogue_state()
+    call_start = time.perf_counter()
+
+    if use_cache:
+        cached = response_cache.get(model_id, prompt, temperature, max_tokens)
+        if cached is not None:
+            await asyncio.to_thread(record_llm_call, model_id, "async_stream", time.perf_counter() - call_start,
+                                    cache_hit=True, state=state)
+            yield cached
+            return
+
+    deltas = []
+    error = "turn budget exhausted"
+    for attempt in range(MAX_ATTEMPTS):
+        remaining = deadline - time.monotonic()
+        if remaining < MIN_ATTEMPT_S:
+            print(f"[WARNING] {model_id}: turn budget exhausted")
+            break
+
+        start = time.perf_counter()
+        ttft = None
+        chunks = 0
+        prompt_tokens = None
+        completion_tokens = None
+        stream = None
+        try:
+            stream = await asyncio.wait_for(get_async_client().chat.completions.create(
+                model=model_id,
+                messages=build_messages(prompt),
+                temperature=temperature,
+                max_tokens=max_tokens,
+                stream=True,
+                stream_options={"include_usage": True}
+            ), timeout=remaining)
+
+            chunk_iterator = stream.__aiter__()
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(chunk_iterator.__anext__(),
+                                                   timeout=max(deadline - time.monotonic(), 0))
+                except StopAsyncIteration:
+                    break
+                if getattr(chunk, "usage", None):
+                    prompt_tokens = chunk.usage.prompt_tokens
+                    completion_tokens = chunk.usage.completion_tokens
+                if chunk.choices and chunk.choices[0].delta.content:
+                    if ttft is None:
+                        ttft = time.perf_counter() - start
+                    chunks += 1
+                    deltas.append(chunk.choices[0].delta.content)
+                    yield chunk.choices[0].delta.content
+
+            # Latency and TTFT of the call include the failed attempts
+            # (the logs and the cache are written off the event loop shared by all the sessions)
+            end = time.perf_counter()
+            await asyncio.to_thread(record_llm_call, model_id, "async_stream", end - call_start,
+                                    ttft=ttft + start - call_start if ttft is not None else None,
+                                    prompt_tokens=prompt_tokens, completion_tokens=completion_tokens or chunks,
+                                    state=state)
+            if ttft is not None:
+                await asyncio.to_thread(record_stream_metrics, model_id, ttft, end - start, completion_tokens or chunks)
+                if use_cache:
+                    await asyncio.to_thread(response_cache.put, model_id, prompt, temperature, max_tokens,
+                                            "".join(deltas).strip())
+            return
+        except Exception as e:
+            error = repr(e)
+            if deltas:
+                # Part of the answer has already been spoken: keep it
+                print(f"[WARNING] {model_id} stream interrupted after {len(deltas)} deltas: {e!r}")
+                await asyncio.to_thread(record_llm_call, model_id, "async_stream", time.perf_counter() - call_start,
+                                        ttft=ttft + start - call_start, completion_tokens=chunks, error=error,
+                                        state=state)
+                return
+            if not await _wait_before_retry(model_id, attempt, e, deadline):
+                break
+        finally:
+            # Also runs on cancellation or when the consumer stops early
+            if stream is not None:
+                await stream.close()
+
+    await asyncio.to_thread(record_llm_call, model_id, "async_stream", time.perf_counter() - call_start,
+                            error=error, state=state)
+    yield FALLBACK_RESPONSE
+
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    # One event loop in a daemon thread for the synchronous callers
+    global _loop
+
+    if _loop is None:
+        with _loop_lock:
+            if _loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="llm-event-loop", daemon=True).start()
+                _loop = loop
+    return _loop
+
+
+def _run(coro):
+    future = asyncio.run_coroutine_threadsafe(coro, _get_loop())
+    try:
+        return future.result()
+    except BaseException:
+        # e.g. KeyboardInterrupt: cancel the coroutine and its HTTP request
+        future.cancel()
+        raise
+
+
+def chat_with_deadline(prompt: str, deadline: Optional[float] = None, **kwargs) -> str:
+    """
+    Synchronous achat(): block until the response or the deadline.
+    """
+    return _run(achat(prompt, deadline=deadline, **kwargs))
+
+
+def stream_with_deadline(prompt: str, deadline: Optional[float] = None, **kwargs) -> Iterator[str]:
+    """
+    Synchronous achat_stream(). Closing the iterator before the end
+    (e.g. on barge-in) cancels the request.
+    """
+    stream = achat_stream(prompt, deadline=deadline, **kwargs)
+    try:
+        while True:
+            try:
+                yield _run(stream.__anext__())
+            except StopAsyncIteration:
+                return
+    finally:
+        _run(stream.aclose())
+
+
+if __name__ == "__main__":
+    budget = TurnBudget(budget_s=5)
+    prompt = "Where can I find the nearest charging station?"
+    for delta in stream_with_deadline(prompt, deadline=budget.deadline()):
+        print(delta, end="", flush=True)
+    print(f"\n[INFO] {budget.remaining():.2f}s of the turn budget left")
@@ -0,0 +1,294 @@
+######################################################################
+# cache.py
+
+# Disk-persisted cache of LLM responses.
+#
+# Identical prompts come back constantly (intent prompts for common
+# phrasings, recommendation prompts for the same top-3 POIs). A response
+# is reused when the model, the normalized prompt, the temperature and
+# the max_tokens are exactly the same. Entries expire after a TTL and
+# the least recently used ones are evicted beyond a maximum size. The
+# hit/miss counters are persisted with the entries, so the hit rate is
+# measured across runs.
+#
+# New responses are appended to a journal next to the cache file instead
+# of rewriting the whole cache on every call; the journal is folded into
+# the cache file (compacted) when the cache is loaded, when it has grown
+# as large as the cache, and on exit. PersistedLRUCache holds this logic
+# and is shared with the intent cache.
+#
+# Usage:
+#   python -m language_model.cache          (show cache statistics)
+#   python -m language_model.cache --clear
+######################################################################
+
+import atexit
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional
+
+CACHE_FILE = Path("language_model/cache/response_cache.json")
+CACHE_MAX_ENTRIES = 1000
+CACHE_TTL_S = 7 * 24 * 3600  # one week
+
+
+def normalize_prompt(prompt: str) -> str:
+    """
+    Normalize a prompt so that whitespace-only differences hit the same entry.
+    """
+    return "\n".join(" ".join(line.split()) for line in prompt.strip().splitlines())
+
+
+def cache_key(model: str, prompt: str, temperature: float, max_tokens: int) -> str:
+    """
+    Build the exact-match key of a request.
+    """
+    raw = json.dumps([model, normalize_prompt(prompt), round(temperature, 3), max_tokens])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class PersistedLRUCache:
+    """
+    LRU mapping persisted to a JSON file, with hit/miss counters kept across
+    runs. New entries are appended to a journal and folded into the file
+    when the cache is loaded, when the journal is as long as the cache can
+    be, and on exit.
+
+    Subclasses build the keys and entries, and may add fields to the file
+    (`_header`), reject a file or a journal line (`_compatible`) and expire
+    entries (`_expired`).
+    """
+    description = "cache"
+
+    def __init__(self, path: Path, max_entries: Optional[int]):
+        """
+        Initialize the cache (the file is loaded on first access).
+
+        Args:
+            path (Path): JSON file where the entries are persisted
+            max_entries (Optional[int]): LRU bound, None for unbounded
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.entries = None
+        self.lock = threading.Lock()
+
+        # Lookups of this process, and of the previous runs (read from the file)
+        self.hits = 0
+        self.misses = 0
+        self.past_hits = 0
+        self.past_misses = 0
+        self.saved_lookups = 0
+        # Entries appended to the journal since the last save
+        self.journaled = 0
+        # Lookups and new entries are not persisted one by one: flush them on exit
+        atexit.register(self.flush)
+
+    @property
+    def journal_path(self) -> Path:
+        return self.path.with_suffix(".journal.jsonl")
+
+    def _header(self) -> Dict:
+        return {}
+
+    def _compatible(self, data: Dict) -> bool:
+        return True
+
+    def _expired(self, entry: Dict) -> bool:
+        return False
+
+    def _load(self):
+        if self.entries is not None:
+            return
+        self.entries = OrderedDict()
+        if self.path.exists() and self.path.stat().st_size > 0:
+            try:
+                with self.path.open("r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except json.JSONDecodeError:
+                print(f"[WARNING] Corrupted {self.description} {self.path}, starting from scratch")
+                data = {"entries": {}}
+
+            if "entries" not in data:
+                # Files written before the counters were persisted
+                data = {"entries": data}
+            if self._compatible(data):
+                self.entries = OrderedDict(data["entries"])
+                self.past_hits = data.get("hits", 0)
+                self.past_misses = data.get("misses", 0)
+            else:
+                print(f"[INFO] {self.description.capitalize()} out of date, {len(data['entries'])} entries dropped")
+
+        # Fold in the entries journaled since the last save (e.g. by a run that crashed)
+        if self._replay_journal():
+            self._save()
+
+    def _replay_journal(self) -> int:
+        if not self.journal_path.exists():
+            return 0
+        replayed = 0
+        with self.journal_path.open("r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # Torn last line of a run that crashed mid-write
+                    continue
+                if not self._compatible(record):
+                    continue
+                self.entries[record["key"]] = record["entry"]
+                self.entries.move_to_end(record["key"])
+                replayed += 1
+        self._evict()
+        return replayed
+
+    def _evict(self):
+        if self.max_entries is not None:
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def _save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with tmp_path.open("w", encoding="utf-8") as f:
+            json.dump({
+                **self._header(),
+                "hits": self.past_hits + self.hits,
+                "misses": self.past_misses + self.misses,
+                "entries": self.entries,
+            }, f)
+        # Atomic replace: a crash never leaves a half-written cache
+        os.replace(tmp_path, self.path)
+        # Everything journaled is in the cache file now (replaying it again would be harmless)
+        if self.journal_path.exists():
+            self.journal_path.unlink()
+        self.saved_lookups = self.hits + self.misses
+        self.journaled = 0
+
+    def _append(self, key: str, entry: Dict):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.journal_path.open("a", encoding="utf-8") as f:
+            f.write(json.dumps({**self._header(), "key": key, "entry": entry}) + "\n")
+        self.journaled += 1
+
+        # Compact once the journal is as long as the cache can be
+        if self.max_entries is not None and self.journaled >= self.max_entries:
+            self._save()
+
+    def _lookup(self, key: str) -> Optional[Dict]:
+        """
+        Return the entry stored under a key (and count the hit or miss), or None.
+        """
+        with self.lock:
+            self._load()
+            entry = self.entries.get(key)
+            if entry is None or self._expired(entry):
+                if entry is not None:
+                    del self.entries[key]
+                self.misses += 1
+                return None
+
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def _store(self, key: str, entry: Dict):
+        """
+        Store an entry and append it to the journal.
+        """
+        with self.lock:
+            self._load()
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            self._evict()
+            self._append(key, entry)
+
+    def flush(self):
+        """
+        Persist the hit/miss counters and compact the journal if anything
+        changed since the last save.
+        """
+        with self.lock:
+            if self.entries is not None and (self.journaled or self.hits + self.misses > self.saved_lookups):
+                self._save()
+
+    def clear(self):
+        with self.lock:
+            self.entries = OrderedDict()
+            self.hits = self.misses = self.past_hits = self.past_misses = 0
+            self._save()
+
+    def stats(self) -> Dict:
+        """
+        Return the cache size and the hit/miss counters, of this process and
+        overall (since the cache was created, cleared or dropped).
+        """
+        with self.lock:
+            self._load()
+            lookups = self.hits + self.misses
+            total_hits = self.past_hits + self.hits
+            total_lookups = total_hits + self.past_misses + self.misses
+            return {
+                "entries": len(self.entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+                "total_hits": total_hits,
+                "total_misses": self.past_misses + self.misses,
+                "total_hit_rate": round(total_hits / total_lookups, 3) if total_lookups else None,
+            }
+
+
+class ResponseCache(PersistedLRUCache):
+    description = "LLM cache"
+
+    def __init__(self, path: Path = CACHE_FILE, max_entries: Optional[int] = CACHE_MAX_ENTRIES, ttl: Optional[float] = CACHE_TTL_S):
+        """
+        Initialize the cache (the file is loaded on first access).
+
+        Args:
+            path (Path): JSON file where the entries are persisted
+            max_entries (Optional[int]): LRU bound, None for unbounded
+            ttl (Optional[float]): lifetime of an entry in seconds, None for no expiry
+        """
+        super().__init__(path, max_entries)
+        self.ttl = ttl
+
+    def _expired(self, entry: Dict) -> bool:
+        return self.ttl is not None and time.time() - entry["created"] > self.ttl
+
+    def get(self, model: str, prompt: str, temperature: float, max_tokens: int) -> Optional[str]:
+        """
+        Return the cached response of a request, or None.
+        """
+        entry = self._lookup(cache_key(model, prompt, temperature, max_tokens))
+        return entry["response"] if entry is not None else None
+
+    def put(self, model: str, prompt: str, temperature: float, max_tokens: int, response: str):
+        """
+        Store a response and append it to the journal.
+        """
+        self._store(cache_key(model, prompt, temperature, max_tokens),
+                    {"model": model, "response": response, "created": time.time()})
+
+
+# Cache shared by all the LLM calls
+response_cache = ResponseCache()
+
+
+if __name__ == "__main__":
+    import sys
+
+    if "--clear" in sys.argv:
+        response_cache.clear()
+        print(f"[INFO] Cache cleared: {CACHE_FILE}")
+    else:
+        stats = response_cache.stats()
+        print(f"[INFO] {stats['entries']} cached responses in {CACHE_FILE}")
+        for name, value in stats.items():
+            print(f"{name:<16} {value}")
@@ -0,0 +1,257 @@
+######################################################################
+# client.py
+
+# Model-agnostic access to the language models served by OpenRouter.
+#
+# - one OpenAI-compatible client, created on first use and shared by
+#   every call (pooled keep-alive connections)
+# - a registry of the models we use, selected with LLM_MODEL in .env:
+#     LLM_MODEL=gemini                  → always Gemini
+#     LLM_MODEL=gpt4,llama              → A/B test, one model per session
+#     LLM_MODEL=mistralai/mistral-7b    → any other OpenRouter model ID
+# - LLM_BASE_URL overrides the endpoint (e.g. a local server)
+# - responses are cached on disk (see cache.py), LLM_CACHE=0 disables it
+# - every call is recorded in language_model/logs/ (see metrics.py)
+#
+# Functions:
+### - resolve_model
+### - get_client
+### - chat
+### - chat_stream
+######################################################################
+
+import os
+import random
+import threading
+import time
+from typing import Iterator, Optional
+
+from dotenv import load_dotenv
+
+from language_model.cache import response_cache
+from language_model.metrics import current_dialogue_state, record_llm_call, record_stream_metrics
+
+OPENROUTER_URL = "https://openrouter.ai/api/v1"
+SYSTEM_PROMPT = "You are an in-car voice assistant. Be concise, natural, and helpful."
+FALLBACK_RESPONSE = "Sorry, I couldn't generate a response right now."
+
+# Short name → model ID on OpenRouter
+MODEL_REGISTRY = {
+    "gpt4": "openai/gpt-4-1106-preview",
+    "llama": "meta-llama/llama-3-8b-instruct",
+    "gemini": "google/gemini-2.0-flash-001",
+    "deepseek": "deepseek/deepseek-chat-v3-0324:free",
+    "claude": "anthropic/claude-sonnet-4",
+}
+DEFAULT_MODEL = "gpt4"
+
+# Connection pool shared by all the calls
+MAX_CONNECTIONS = 10
+MAX_KEEPALIVE_CONNECTIONS = 5
+
+load_dotenv()
+
+CACHE_ENABLED = os.getenv("LLM_CACHE", "1") != "0"
+
+_client = None
+_client_lock = threading.Lock()
+_session_model = None
+
+
+def resolve_model(model: Optional[str] = None) -> str:
+    """
+    Turn a model name into an OpenRouter model ID.
+
+    Args:
+        model (Optional[str]): registry name (e.g. "gemini"), full model ID,
+            or None to use the model configured with LLM_MODEL
+
+    Returns:
+        str: OpenRouter model ID
+    """
+    global _session_model
+
+    if model is None:
+        if _session_model is None:
+            # Several comma-separated models → A/B test: pick one for this session
+            candidates = [m.strip() for m in os.getenv("LLM_MODEL", DEFAULT_MODEL).split(",") if m.strip()]
+            _session_model = random.choice(candidates or [DEFAULT_MODEL])
+            print(f"[INFO] LLM model for this session: {_session_model}")
+        model = _session_model
+
+    return MODEL_REGISTRY.get(model, model)
+
+
+def get_client():
+    """
+    Return the shared OpenAI-compatible client, creating it on first use.
+
+    Raises:
+        ValueError: If OPENROUTER_API_KEY is not set.
+    """
+    global _client
+
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                # Imported here so that importing this module stays cheap
+                import httpx
+                from openai import OpenAI, DefaultHttpxClient
+
+                api_key = os.getenv("OPENROUTER_API_KEY")
+                if not api_key:
+                    raise ValueError("OPENROUTER_API_KEY not found in .env")
+
+                _client = OpenAI(
+                    api_key=api_key,
+                    base_url=os.getenv("LLM_BASE_URL", OPENROUTER_URL),
+                    http_client=DefaultHttpxClient(
+                        limits=httpx.Limits(max_connections=MAX_CONNECTIONS,
+                                            max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS)
+                    ),
+                )
+    return _client
+
+
+def build_messages(prompt: str, system: str = SYSTEM_PROMPT) -> list:
+    return [
+        {"role": "system", "content": system},
+        {"role": "user", "content": prompt}
+    ]
+
+
+def chat(prompt: str, model: Optional[str] = None, temperature: float = 0.6, max_tokens: int = 150, use_cache: bool = True,
+         state: Optional[str] = None) -> str:
+    """
+    Get a response from a language model via OpenRouter.
+
+    Args:
+        prompt (str): the user's request
+        model (Optional[str]): registry name or model ID (default: LLM_MODEL)
+        temperature (float): sampling temperature
+        max_tokens (int): maximum length of the response (150 ≈ 1-2 short sentences)
+        use_cache (bool): reuse the response of an identical earlier request
+            (disable for prompts carrying a conversation history)
+        state (Optional[str]): dialogue state recorded with the call (default: the current one)
+
+    Returns:
+        str: response from the assistant, or a fallback sentence on error
+    """
+    model_id = resolve_model(model)
+    use_cache = use_cache and CACHE_ENABLED
+    start = time.perf_counter()
+
+    if use_cache:
+        cached = response_cache.get(model_id, prompt, temperature, max_tokens)
+        if cached is not None:
+            record_llm_call(model_id, "chat", time.perf_counter() - start, cache_hit=True, state=state)
+            return cached
+
+    try:
+        chat_completion = get_client().chat.completions.create(
+            model=model_id,
+            messages=build_messages(prompt),
+            temperature=temperature,
+            max_tokens=max_tokens
+        )
+        response = chat_completion.choices[0].message.content.strip()
+        usage = chat_completion.usage
+        record_llm_call(model_id, "chat", time.perf_counter() - start,
+                        prompt_tokens=usage.prompt_tokens if usage else None,
+                        completion_tokens=usage.completion_tokens if usage else None, state=state)
+        if use_cache:
+            response_cache.put(model_id, prompt, temperature, max_tokens, response)
+        return response
+    except Exception as e:
+        print(f"[ERROR] {model_id} via OpenRouter failed: {e}")
+        record_llm_call(model_id, "chat", time.perf_counter() - start, error=str(e), state=state)
+        return FALLBACK_RESPONSE
+
+
+def chat_stream(prompt: str, model: Optional[str] = None, temperature: float = 0.6, max_tokens: int = 150, use_cache: bool = True,
+                state: Optional[str] = None) -> Iterator[str]:
+    """
+    Stream a response from a language model via OpenRouter, delta by delta.
+
+    The time to first token, total latency and tokens/sec of every completed
+    stream are recorded per model (see language_model/metrics.py).
+
+    Args:
+        prompt (str): the user's request
+        model (Optional[str]): registry name or model ID (default: LLM_MODEL)
+        temperature (float): sampling temperature
+        max_tokens (int): maximum length of the response
+        use_cache (bool): reuse the response of an identical earlier request
+            (a cached response is yielded as a single delta)
+        state (Optional[str]): dialogue state recorded with the call (pass it
+            explicitly: the stream may be consumed after the state has changed)
+
+    Yields:
+        str: the successive text deltas of the response
+    """
+    model_id = resolve_model(model)
+    use_cache = use_cache and CACHE_ENABLED
+    state = state or current_dialogue_state()
+    start = time.perf_counter()
+
+    if use_cache:
+        cached = response_cache.get(model_id, prompt, temperature, max_tokens)
+        if cached is not None:
+            record_llm_call(model_id, "stream", time.perf_counter() - start, cache_hit=True, state=state)
+            yield cached
+            return
+
+    produced = False
+    deltas = []
+    ttft = None
+    chunks = 0
+    prompt_tokens = None
+    completion_tokens = None
+    try:
+        stream = get_client().chat.completions.create(
+            model=model_id,
+            messages=build_messages(prompt),
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=True,
+            # The last chunk then carries the token usage
+            stream_options={"include_usage": True}
+        )
+        for chunk in stream:
+            if getattr(chunk, "usage", None):
+                prompt_tokens = chunk.usage.prompt_tokens
+                completion_tokens = chunk.usage.completion_tokens
+            if chunk.choices and chunk.choices[0].delta.content:
+                if ttft is None:
+                    ttft = time.perf_counter() - start
+                chunks += 1
+                produced = True
+                deltas.append(chunk.choices[0].delta.content)
+                yield chunk.choices[0].delta.content
+
+        total = time.perf_counter() - start
+        record_llm_call(model_id, "stream", total, ttft=ttft, prompt_tokens=prompt_tokens,
+                        completion_tokens=completion_tokens or chunks, state=state)
+        if ttft is not None:
+            # Without usage information, one chunk ≈ one token
+            record_stream_metrics(model_id, ttft, total, completion_tokens or chunks)
+            if use_cache:
+                response_cache.put(model_id, prompt, temperature, max_tokens, "".join(deltas).strip())
+    except Exception as e:
+        print(f"[ERROR] {model_id} streaming via OpenRouter failed: {e}")
+        record_llm_call(model_id, "stream", time.perf_counter() - start, ttft=ttft,
+                        completion_tokens=chunks or None, error=str(e), state=state)
+        if not produced:
+            yield FALLBACK_RESPONSE
+
+
+if __name__ == "__main__":
+    prompt = "Where can I find the nearest charging station?"
+    print(f"Response: {chat(prompt)}")
+
+    # Compare the time to first token of the registered models
+    for name in MODEL_REGISTRY:
+        print(f"{name}: ", end="", flush=True)
+        for delta in chat_stream(prompt, model=name):
+            print(delta, end="", flush=True)
+        print()
@@ -1,19 +1,6 @@
-import os
-from openai import OpenAI
-from dotenv import load_dotenv
+from typing import Iterator
+from language_model.client import chat, chat_stream
 
-# Load API key from .env
-load_dotenv(dotenv_path=".env")
-api_key = os.getenv("OPENROUTER_API_KEY")
-
-if not api_key:
-    raise ValueError("OPENROUTER_API_KEY not found in .env")
-
-# Initialize OpenAI client with OpenRouter base URL
-client = OpenAI(
-    api_key=api_key,
-    base_url="https://openrouter.ai/api/v1"
-)
 
 def get_response(prompt: str, model: str = "openai/gpt-4-1106-preview") -> str:
     """
@@ -29,21 +16,22 @@ def get_response(prompt: str, model: str = "openai/gpt-4-1106-preview") -> str:
     Returns:
         str: The model's response.
     """
-    try:
-        chat_completion = client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": "You are an in-car voice assistant. Be concise, natural, and helpful."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.6,
-            # Controls the length of the response (≈ 1-2 short sentences max)
-            max_tokens=150
-        )
-        return chat_completion.choices[0].message.content.strip()
-    except Exception as e:
-        print(f"[ERROR] OpenRouter call failed: {e}")
-        return "Sorry, I couldn't generate a response right now."
+    return chat(prompt, model=model)
+
+
+def get_response_stream(prompt: str, model: str = "openai/gpt-4-1106-preview") -> Iterator[str]:
+    """
+    Stream a response from an OpenRouter-compatible model, token delta by token delta.
+    Same request as get_response() but with stream=True, so the caller can display
+    and speak the answer before the whole completion has been generated.
+
+    Args:
+        prompt (str): The input prompt for the model.
+        model (str): The model to use. Defaults to "openai/gpt-4-1106-preview".
+    Yields:
+        str: The successive text deltas of the model's response.
+    """
+    yield from chat_stream(prompt, model=model)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,210 @@
+######################################################################
+# llm_benchmark.py
+
+# Load test of the language model calls: drives the driver functions
+# (get_response and friends), the streaming call, the model race and the
+# deadline-bounded calls used by the dialogue manager (chat_with_deadline,
+# stream_with_deadline) at several concurrency levels and reports, for
+# each of them:
+# - throughput (requests per second)
+# - p50 / p95 / p99 latency of the full response
+# - p50 / p95 time to first token (streaming functions)
+# - number of failed requests: fallback sentence returned once the
+#   retries are exhausted, or response cut off after its first token
+#   (read from the errors recorded in the calls log)
+#
+# With --mock, a local stand-in server (mock_server.py) is started and
+# the client is pointed to it, so the pipeline can be benchmarked
+# offline; otherwise LLM_BASE_URL / OpenRouter is used. The response
+# cache is disabled unless --cache is given.
+#
+# Usage:
+#   python -m language_model.llm_benchmark --mock --ttft-ms 300 \
+#       --functions gpt4 gemini stream race stream_deadline --concurrency 1 4 16 --requests 50
+######################################################################
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from language_model import client, metrics
+from language_model.metrics import format_metric, percentile
+from language_model.mock_server import DISTRIBUTIONS, start_server
+
+DEFAULT_PROMPT = "Where can I find the nearest charging station?"
+# Keep the metrics, calls and races of the benchmark out of the production logs
+BENCHMARK_METRICS_LOG = Path("language_model/logs/benchmark_stream_metrics.jsonl")
+BENCHMARK_RACE_LOG = Path("language_model/logs/benchmark_race_results.jsonl")
+BENCHMARK_CALLS_LOG = Path("language_model/logs/benchmark_llm_calls.jsonl")
+
+
+def _drivers() -> Dict[str, Tuple[Callable, bool]]:
+    # Imported here so that --mock can set LLM_BASE_URL first
+    from language_model.async_client import chat_with_deadline, stream_with_deadline
+    from language_model.claude_driver_assistant import get_claude_response
+    from language_model.deepseek_driver_assistant import get_deepseek_response
+    from language_model.gemini_driver_assistant import get_gemini_response
+    from language_model.gpt4_driver_assistant import get_response, get_response_stream
+    from language_model.llama_driver_assistant import get_llama_response
+    from language_model.racing import race_stream
+
+    # name → (function, streams its response)
+    return {
+        "gpt4": (get_response, False),
+        "llama": (get_llama_response, False),
+        "gemini": (get_gemini_response, False),
+        "deepseek": (get_deepseek_response, False),
+        "claude": (get_claude_response, False),
+        "stream": (get_response_stream, True),
+        "race": (race_stream, True),
+        "deadline": (chat_with_deadline, False),
+        "stream_deadline": (stream_with_deadline, True),
+    }
+
+
+def _calls_since(offset: int) -> List[Dict]:
+    """
+    Return the entries appended to the calls log after a byte offset.
+    """
+    if not metrics.CALLS_LOG.exists():
+        return []
+    with metrics.CALLS_LOG.open("r", encoding="utf-8") as f:
+        f.seek(offset)
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def timed_call(fn: Callable, streaming: bool, prompt: str) -> Tuple[float, Optional[float], bool]:
+    """
+    Call one function and time it.
+
+    Returns:
+        Tuple[float, Optional[float], bool]: total latency, time to first
+            token (streaming only) and whether the call returned a response
+            (a response cut off midway is only visible in the calls log)
+    """
+    start = time.perf_counter()
+    ttft = None
+    if streaming:
+        deltas = []
+        for delta in fn(prompt):
+            if ttft is None:
+                ttft = time.perf_counter() - start
+            deltas.append(delta)
+        response = "".join(deltas)
+    else:
+        response = fn(prompt)
+    return time.perf_counter() - start, ttft, response.strip() != client.FALLBACK_RESPONSE
+
+
+def benchmark_function(name: str, fn: Callable, streaming: bool, concurrency: int, requests: int, prompt: str) -> Dict:
+    """
+    Send `requests` calls with at most `concurrency` of them in flight.
+
+    Returns:
+        Dict: throughput, latency and TTFT percentiles, number of errors
+    """
+    offset = metrics.CALLS_LOG.stat().st_size if metrics.CALLS_LOG.exists() else 0
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(lambda _: timed_call(fn, streaming, prompt), range(requests)))
+    wall_time = time.perf_counter() - start
+
+    # A stream that failed after its first token still returned text: only
+    # the error recorded with its TTFT tells it was cut off (the other
+    # models of a race fail before their first token, if at all)
+    truncated = sum(call["error"] is not None and call["ttft_s"] is not None for call in _calls_since(offset))
+
+    latencies = [latency for latency, _, _ in results]
+    ttfts = [ttft for _, ttft, _ in results if ttft is not None]
+    return {
+        "function": name,
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": sum(not ok for _, _, ok in results) + truncated,
+        "truncated": truncated,
+        "throughput_rps": requests / wall_time if wall_time > 0 else None,
+        "latency_p50_s": percentile(latencies, 50),
+        "latency_p95_s": percentile(latencies, 95),
+        "latency_p99_s": percentile(latencies, 99),
+        "ttft_p50_s": percentile(ttfts, 50),
+        "ttft_p95_s": percentile(ttfts, 95),
+    }
+
+
+def print_report(rows: List[Dict]):
+    print(f"\n{'function':<16} {'conc':>5} {'reqs':>5} {'err':>4} {'cut':>4} {'req/s':>7} {'p50':>7} {'p95':>7} {'p99':>7} "
+          f"{'TTFT p50':>9} {'TTFT p95':>9}")
+    for r in rows:
+        print(f"{r['function']:<16} {r['concurrency']:>5} {r['requests']:>5} {r['errors']:>4} {r['truncated']:>4} "
+              f"{format_metric(r['throughput_rps']):>7} {format_metric(r['latency_p50_s']):>7} {format_metric(r['latency_p95_s']):>7} "
+              f"{format_metric(r['latency_p99_s']):>7} {format_metric(r['ttft_p50_s']):>9} {format_metric(r['ttft_p95_s']):>9}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Throughput and latency benchmark of the LLM calls")
+    parser.add_argument("--functions", nargs="+", default=["gpt4", "stream"],
+                        help="gpt4, llama, gemini, deepseek, claude, stream, race, deadline, stream_deadline")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--requests", type=int, default=20, help="requests per function and concurrency level")
+    parser.add_argument("--prompt", default=DEFAULT_PROMPT)
+    parser.add_argument("--cache", action="store_true", help="keep the response cache enabled")
+
+    mock = parser.add_argument_group("local mock server")
+    mock.add_argument("--mock", action="store_true", help="benchmark against a local mock server")
+    mock.add_argument("--port", type=int, default=8001)
+    mock.add_argument("--distribution", choices=DISTRIBUTIONS, default="lognormal")
+    mock.add_argument("--ttft-ms", type=float, default=400)
+    mock.add_argument("--ttft-std-ms", type=float, default=150)
+    mock.add_argument("--tokens-per-s", type=float, default=50)
+    mock.add_argument("--response-tokens", type=int, default=40)
+    mock.add_argument("--error-rate", type=float, default=0.0)
+    mock.add_argument("--drop-rate", type=float, default=0.0)
+    mock.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    server = None
+    if args.mock:
+        server = start_server(argparse.Namespace(
+            host="127.0.0.1", port=args.port, distribution=args.distribution, ttft_ms=args.ttft_ms,
+            ttft_std_ms=args.ttft_std_ms, model_ttft=None, tokens_per_s=args.tokens_per_s,
+            response_tokens=args.response_tokens, error_rate=args.error_rate, error_status=500,
+            drop_rate=args.drop_rate, seed=args.seed, verbose=False,
+        ))
+        # Read by get_client() when the shared client is created
+        os.environ["LLM_BASE_URL"] = f"http://127.0.0.1:{args.port}/v1"
+        os.environ.setdefault("OPENROUTER_API_KEY", "mock")
+        print(f"[INFO] Mock LLM server on {os.environ['LLM_BASE_URL']}")
+
+    drivers = _drivers()
+    from language_model import racing
+
+    saved = (client.CACHE_ENABLED, metrics.METRICS_LOG, metrics.CALLS_LOG, racing.RACE_LOG)
+    client.CACHE_ENABLED = args.cache
+    metrics.METRICS_LOG = BENCHMARK_METRICS_LOG
+    metrics.CALLS_LOG = BENCHMARK_CALLS_LOG
+    racing.RACE_LOG = BENCHMARK_RACE_LOG
+    rows = []
+    try:
+        for name in args.functions:
+            if name not in drivers:
+                print(f"[ERROR] Unknown function '{name}' (choose from {', '.join(drivers)})")
+                continue
+            fn, streaming = drivers[name]
+            for concurrency in args.concurrency:
+                print(f"[INFO] {name}: {args.requests} requests, concurrency {concurrency}")
+                rows.append(benchmark_function(name, fn, streaming, concurrency, args.requests, args.prompt))
+    finally:
+        client.CACHE_ENABLED, metrics.METRICS_LOG, metrics.CALLS_LOG, racing.RACE_LOG = saved
+        if server is not None:
+            server.shutdown()
+
+    print_report(rows)
+    return rows
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+######################################################################
+# metrics.py
+
+# Records the latency of the streamed LLM responses so the models can
+# be compared under real load:
+# - TTFT: time to first token (request sent → first text delta)
+# - total latency of the response
+# - tokens/sec: generation speed once the first token has arrived
+#
+# Every LLM call (streamed or not, cached or not) is also recorded with
+# its model, prompt/completion tokens, TTFT, latency, cache hit/miss and
+# the dialogue state it was made in.
+#
+# Each call is appended as one JSON line to language_model/logs/.
+#
+# Usage:
+#   python -m language_model.metrics                (streams, per model)
+#   python -m language_model.metrics --calls        (all calls, per model and per state)
+######################################################################
+
+import argparse
+import json
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+METRICS_LOG = Path("language_model/logs/stream_metrics.jsonl")
+CALLS_LOG = Path("language_model/logs/llm_calls.jsonl")
+
+_write_lock = threading.Lock()
+# Dialogue state the calls are attributed to (set by the dialogue manager)
+_dialogue_state = None
+
+
+def record_stream_metrics(model: str, ttft: float, total_time: float, completion_tokens: int):
+    """
+    Append the metrics of one streamed response to the metrics log.
+
+    Args:
+        model (str): model ID
+        ttft (float): time to first token in seconds
+        total_time (float): time until the last token in seconds
+        completion_tokens (int): number of generated tokens
+    """
+    generation_time = total_time - ttft
+    entry = {
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "model": model,
+        "ttft_s": round(ttft, 4),
+        "total_s": round(total_time, 4),
+        "completion_tokens": completion_tokens,
+        "tokens_per_s": round(completion_tokens / generation_time, 2) if generation_time > 0 else None,
+    }
+
+    with _write_lock:
+        METRICS_LOG.parent.mkdir(parents=True, exist_ok=True)
+        with METRICS_LOG.open("a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+
+
+def set_dialogue_state(state: Optional[str]):
+    """
+    Set the dialogue state the next LLM calls are attributed to.
+    """
+    global _dialogue_state
+    _dialogue_state = state
+
+
+def current_dialogue_state() -> Optional[str]:
+    return _dialogue_state
+
+
+def record_llm_call(model: str, kind: str, latency: float, ttft: Optional[float] = None,
+                    prompt_tokens: Optional[int] = None, completion_tokens: Optional[int] = None,
+                    cache_hit: bool = False, error: Optional[str] = None, state: Optional[str] = None):
+    """
+    Append one LLM call to the call log.
+
+    Args:
+        model (str): model ID
+        kind (str): "chat", "stream", "async_chat", "async_stream" or "race"
+        latency (float): time until the full response in seconds
+        ttft (Optional[float]): time to first token in seconds (streams)
+        prompt_tokens (Optional[int]): tokens of the prompt (from the API usage)
+        completion_tokens (Optional[int]): generated tokens
+        cache_hit (bool): whether the response came from the response cache
+        error (Optional[str]): error message if the call failed
+        state (Optional[str]): dialogue state (default: the current one)
+    """
+    entry = {
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "model": model,
+        "kind": kind,
+        "state": state or _dialogue_state,
+        "cache_hit": cache_hit,
+        "latency_s": round(latency, 4),
+        "ttft_s": round(ttft, 4) if ttft is not None else None,
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "error": error,
+    }
+
+    with _write_lock:
+        CALLS_LOG.parent.mkdir(parents=True, exist_ok=True)
+        with CALLS_LOG.open("a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+
+
+def load_metrics(path: Path = METRICS_LOG) -> List[Dict]:
+    """
+    Load all the recorded entries.
+    """
+    if not path.exists():
+        return []
+    with path.open("r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    """
+    Linearly interpolated percentile of a list of values (q in [0, 100]).
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    pos = (len(ordered) - 1) * q / 100
+    low = int(pos)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (pos - low)
+
+
+def summarize_streams(entries: List[Dict]) -> Dict[str, Dict]:
+    """
+    Aggregate TTFT, latency and generation speed per model.
+
+    Returns:
+        Dict[str, Dict]: model → {calls, ttft p50/p95, total p50/p95, mean tokens/s}
+    """
+    by_model = {}
+    for entry in entries:
+        by_model.setdefault(entry["model"], []).append(entry)
+
+    summary = {}
+    for model, calls in by_model.items():
+        ttfts = [c["ttft_s"] for c in calls]
+        totals = [c["total_s"] for c in calls]
+        speeds = [c["tokens_per_s"] for c in calls if c.get("tokens_per_s")]
+        summary[model] = {
+            "calls": len(calls),
+            "ttft_p50_s": percentile(ttfts, 50),
+            "ttft_p95_s": percentile(ttfts, 95),
+            "total_p50_s": percentile(totals, 50),
+            "total_p95_s": percentile(totals, 95),
+            "tokens_per_s": sum(speeds) / len(speeds) if speeds else None,
+        }
+    return summary
+
+
+def summarize_calls(entries: List[Dict], by: str = "model") -> Dict[str, Dict]:
+    """
+    Aggregate the LLM calls per model or per dialogue state.
+
+    Args:
+        entries (List[Dict]): entries of the call log
+        by (str): "model" or "state"
+
+    Returns:
+        Dict[str, Dict]: group → {calls, cache hit rate, errors, latency and
+            TTFT p50/p95 of the calls that reached the API, mean tokens}
+    """
+    groups = {}
+    for entry in entries:
+        groups.setdefault(entry.get(by) or "(none)", []).append(entry)
+
+    summary = {}
+    for group, calls in groups.items():
+        # Cache hits would hide the latency of the API
+        api_calls = [c for c in calls if not c["cache_hit"] and not c.get("error")]
+        latencies = [c["latency_s"] for c in api_calls]
+        ttfts = [c["ttft_s"] for c in api_calls if c.get("ttft_s") is not None]
+        prompt_tokens = [c["prompt_tokens"] for c in api_calls if c.get("prompt_tokens") is not None]
+        completion_tokens = [c["completion_tokens"] for c in api_calls if c.get("completion_tokens") is not None]
+        summary[group] = {
+            "calls": len(calls),
+            "cache_hit_rate": sum(c["cache_hit"] for c in calls) / len(calls),
+            "errors": sum(bool(c.get("error")) for c in calls),
+            "latency_p50_s": percentile(latencies, 50),
+            "latency_p95_s": percentile(latencies, 95),
+            "ttft_p50_s": percentile(ttfts, 50),
+            "ttft_p95_s": percentile(ttfts, 95),
+            "prompt_tokens": sum(prompt_tokens) / len(prompt_tokens) if prompt_tokens else None,
+            "completion_tokens": sum(completion_tokens) / len(completion_tokens) if completion_tokens else None,
+        }
+    return summary
+
+
+def format_metric(value: Optional[float]) -> str:
+    """
+    Format a latency, rate or score for the summary tables ("n/a" when missing).
+    """
+    return f"{value:.3f}" if value is not None else "n/a"
+
+
+def print_call_summary(entries: List[Dict], by: str):
+    print(f"\n{by:<40} {'calls':>6} {'hit %':>6} {'err':>4} {'p50':>7} {'p95':>7} {'TTFT p50':>9} {'TTFT p95':>9} "
+          f"{'prompt':>7} {'compl.':>7}")
+    for group, s in sorted(summarize_calls(entries, by).items()):
+        print(f"{group:<40} {s['calls']:>6} {s['cache_hit_rate']:>6.1%} {s['errors']:>4} "
+              f"{format_metric(s['latency_p50_s']):>7} {format_metric(s['latency_p95_s']):>7} {format_metric(s['ttft_p50_s']):>9} "
+              f"{format_metric(s['ttft_p95_s']):>9} {format_metric(s['prompt_tokens']):>7} {format_metric(s['completion_tokens']):>7}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Latency summary of the LLM calls")
+    parser.add_argument("--calls", action="store_true", help="summarize every call instead of the streams only")
+    parser.add_argument("--by", nargs="+", choices=["model", "state"], default=["model", "state"],
+                        help="grouping of the call summary")
+    args = parser.parse_args()
+
+    if args.calls:
+        entries = load_metrics(CALLS_LOG)
+        if not entries:
+            print(f"[INFO] No calls recorded yet in {CALLS_LOG}")
+        for by in args.by:
+            print_call_summary(entries, by)
+    else:
+        summary = summarize_streams(load_metrics())
+        if not summary:
+            print(f"[INFO] No metrics recorded yet in {METRICS_LOG}")
+
+        print(f"{'model':<40} {'calls':>6} {'TTFT p50':>9} {'TTFT p95':>9} {'total p50':>10} {'total p95':>10} {'tok/s':>7}")
+        for model, s in sorted(summary.items()):
+            print(f"{model:<40} {s['calls']:>6} {format_metric(s['ttft_p50_s']):>9} {format_metric(s['ttft_p95_s']):>9} "
+                  f"{format_metric(s['total_p50_s']):>10} {format_metric(s['total_p95_s']):>10} {format_metric(s['tokens_per_s']):>7}")
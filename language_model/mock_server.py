@@ -0,0 +1,228 @@
+######################################################################
+# mock_server.py
+
+# Local stand-in for the OpenRouter /chat/completions endpoint, to load
+# test and benchmark the dialogue pipeline offline.
+#
+# - streaming (server-sent events) and non-streaming responses in the
+#   OpenAI format, with token usage
+# - time to first token drawn from a configurable distribution
+#   (constant, uniform, normal, lognormal), optionally per model
+# - generation at a configurable number of tokens per second
+# - error injection: HTTP errors and streams dropped halfway
+#
+# Point the client to it with LLM_BASE_URL (any OPENROUTER_API_KEY works):
+#   python -m language_model.mock_server --port 8001 --ttft-ms 300 --tokens-per-s 60
+#   LLM_BASE_URL=http://127.0.0.1:8001/v1 python main.py
+#
+# Functions:
+### - sample_latency
+### - make_handler
+### - start_server
+######################################################################
+
+import argparse
+import json
+import math
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+DEFAULT_PORT = 8001
+CANNED_RESPONSE = (
+    "The closest option is Cranfield University, 1.4 km away, followed by Martell House at 1.6 km "
+    "and Marston Vale Forest Centre at 5 km. Which one would you like?"
+)
+DISTRIBUTIONS = ("constant", "uniform", "normal", "lognormal")
+
+
+def sample_latency(rng: random.Random, distribution: str, mean: float, std: float) -> float:
+    """
+    Draw a latency in seconds.
+
+    Args:
+        rng (random.Random): random generator of the server
+        distribution (str): "constant", "uniform", "normal" or "lognormal"
+        mean (float): mean latency in seconds
+        std (float): standard deviation in seconds (half-width for "uniform")
+
+    Returns:
+        float: a non-negative latency
+    """
+    if distribution == "uniform":
+        value = rng.uniform(mean - std, mean + std)
+    elif distribution == "normal":
+        value = rng.gauss(mean, std)
+    elif distribution == "lognormal" and mean > 0:
+        # Parameters of the underlying normal giving this mean and std (long right tail)
+        sigma2 = math.log(1 + (std / mean) ** 2)
+        value = rng.lognormvariate(math.log(mean) - sigma2 / 2, sigma2 ** 0.5)
+    else:
+        value = mean
+    return max(0.0, value)
+
+
+def make_handler(config: argparse.Namespace):
+    """
+    Build the request handler class bound to a server configuration.
+    """
+    rng = random.Random(config.seed)
+    rng_lock = threading.Lock()
+    model_ttft = dict(config.model_ttft or [])
+
+    def draw(fn, *args):
+        with rng_lock:
+            return fn(*args)
+
+    class MockCompletionsHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            if config.verbose:
+                super().log_message(format, *args)
+
+        def _send_json(self, status: int, body: Dict):
+            payload = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def _send_event(self, body) -> None:
+            data = body if isinstance(body, str) else json.dumps(body)
+            chunk = f"data: {data}\n\n".encode("utf-8")
+            # Chunked transfer encoding: size, data
+            self.wfile.write(f"{len(chunk):x}\r\n".encode("ascii") + chunk + b"\r\n")
+            self.wfile.flush()
+
+        def do_GET(self):
+            if self.path.rstrip("/").endswith("/models"):
+                self._send_json(200, {"object": "list", "data": [{"id": m, "object": "model"} for m in model_ttft]})
+            else:
+                self._send_json(404, {"error": {"message": "Not found"}})
+
+        def do_POST(self):
+            if not self.path.rstrip("/").endswith("/chat/completions"):
+                self._send_json(404, {"error": {"message": "Not found"}})
+                return
+
+            length = int(self.headers.get("Content-Length", 0))
+            try:
+                request = json.loads(self.rfile.read(length) or b"{}")
+            except json.JSONDecodeError:
+                self._send_json(400, {"error": {"message": "Invalid JSON body"}})
+                return
+
+            model = request.get("model", "mock-model")
+            ttft_mean = model_ttft.get(model, config.ttft_ms) / 1000
+            ttft = draw(sample_latency, rng, config.distribution, ttft_mean, config.ttft_std_ms / 1000)
+
+            if draw(rng.random) < config.error_rate:
+                time.sleep(ttft)
+                self._send_json(config.error_status, {"error": {"message": "Injected error", "code": config.error_status}})
+                return
+
+            max_tokens = request.get("max_tokens") or config.response_tokens
+            words = (CANNED_RESPONSE.split() * (config.response_tokens // len(CANNED_RESPONSE.split()) + 1))
+            tokens = [w + " " for w in words[:min(max_tokens, config.response_tokens)]]
+            prompt_tokens = sum(len(str(m.get("content", "")).split()) for m in request.get("messages", []))
+            usage = {"prompt_tokens": prompt_tokens, "completion_tokens": len(tokens),
+                     "total_tokens": prompt_tokens + len(tokens)}
+            completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+            created = int(time.time())
+            token_delay = 1 / config.tokens_per_s if config.tokens_per_s > 0 else 0.0
+
+            time.sleep(ttft)
+
+            if not request.get("stream"):
+                time.sleep(token_delay * len(tokens))
+                self._send_json(200, {
+                    "id": completion_id, "object": "chat.completion", "created": created, "model": model,
+                    "choices": [{"index": 0, "finish_reason": "stop",
+                                 "message": {"role": "assistant", "content": "".join(tokens).strip()}}],
+                    "usage": usage,
+                })
+                return
+
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+
+            def chunk(delta: Dict, finish_reason: Optional[str] = None) -> Dict:
+                return {"id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]}
+
+            drop_at = len(tokens) // 2 if draw(rng.random) < config.drop_rate else None
+            try:
+                self._send_event(chunk({"role": "assistant", "content": ""}))
+                for i, token in enumerate(tokens):
+                    if i == drop_at:
+                        # Injected failure: the connection is closed halfway
+                        self.close_connection = True
+                        return
+                    if i:
+                        time.sleep(token_delay)
+                    self._send_event(chunk({"content": token}))
+                self._send_event(chunk({}, finish_reason="stop"))
+                if (request.get("stream_options") or {}).get("include_usage"):
+                    self._send_event({"id": completion_id, "object": "chat.completion.chunk", "created": created,
+                                      "model": model, "choices": [], "usage": usage})
+                self._send_event("[DONE]")
+                self.wfile.write(b"0\r\n\r\n")
+            except (BrokenPipeError, ConnectionResetError):
+                # The client closed the stream (e.g. lost a race)
+                self.close_connection = True
+
+    return MockCompletionsHandler
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Local OpenAI-compatible /chat/completions server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--distribution", choices=DISTRIBUTIONS, default="lognormal",
+                        help="distribution of the time to first token")
+    parser.add_argument("--ttft-ms", type=float, default=400, help="mean time to first token")
+    parser.add_argument("--ttft-std-ms", type=float, default=150, help="standard deviation of the time to first token")
+    parser.add_argument("--model-ttft", type=lambda s: (s.split("=")[0], float(s.split("=")[1])), nargs="*",
+                        metavar="MODEL=MS", help="per-model mean time to first token")
+    parser.add_argument("--tokens-per-s", type=float, default=50, help="generation speed (0 = instantaneous)")
+    parser.add_argument("--response-tokens", type=int, default=40, help="length of the responses")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with an error")
+    parser.add_argument("--error-status", type=int, default=500, help="HTTP status of the injected errors")
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="fraction of streams dropped halfway")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--verbose", action="store_true", help="log every request")
+    return parser.parse_args(argv)
+
+
+def start_server(config: argparse.Namespace) -> ThreadingHTTPServer:
+    """
+    Start the server in a background thread (e.g. from a benchmark).
+
+    Returns:
+        ThreadingHTTPServer: the running server (call shutdown() to stop it)
+    """
+    server = ThreadingHTTPServer((config.host, config.port), make_handler(config))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="mock-llm-server", daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    config = parse_args()
+    server = ThreadingHTTPServer((config.host, config.port), make_handler(config))
+    server.daemon_threads = True
+    print(f"[INFO] Mock LLM server on http://{config.host}:{config.port}/v1 "
+          f"(TTFT {config.distribution} {config.ttft_ms:.0f}±{config.ttft_std_ms:.0f} ms, "
+          f"{config.tokens_per_s:g} tokens/s, errors {config.error_rate:.0%}, drops {config.drop_rate:.0%})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n[INFO] Stopped")
@@ -0,0 +1,367 @@
+######################################################################
+# racing.py
+
+# Races several models on the same prompt to cut the tail latency of a
+# slow OpenRouter route:
+# - every contestant streams its response in its own thread
+# - with a hedge delay, contestant i is only launched after i × delay
+#   if nobody has answered yet (cheaper than a full race)
+# - the first model to stream text wins; the other streams are closed
+#   and their output is dropped
+# - a model that fails before answering is out of the race, the
+#   fallback sentence is only returned when every contestant failed
+# - the race is bounded by a deadline (the turn budget): past it, every
+#   stream is closed and the race stops with what was produced so far
+# - a cached response of one of the models is returned without racing
+#
+# Configured in .env:
+#   LLM_RACE_MODELS=gemini,llama     (empty → racing disabled)
+#   LLM_HEDGE_DELAY=0.5              (seconds, 0 → all models at once)
+#
+# Each race is appended as one JSON line to language_model/logs/.
+#
+# Usage:
+#   python -m language_model.racing         (wins and latency per model)
+#
+# Functions:
+### - race_stream
+### - race
+### - record_race
+### - summarize_races
+######################################################################
+
+import json
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from language_model import client
+from language_model.async_client import MIN_ATTEMPT_S, TURN_BUDGET_S
+from language_model.cache import response_cache
+from language_model.client import FALLBACK_RESPONSE, build_messages, get_client, resolve_model
+from language_model.metrics import current_dialogue_state, format_metric, percentile, record_llm_call, record_stream_metrics
+
+RACE_LOG = Path("language_model/logs/race_results.jsonl")
+
+DEFAULT_RACE_MODELS = "gemini,llama"
+
+RACE_MODELS = [m.strip() for m in os.getenv("LLM_RACE_MODELS", "").split(",") if m.strip()]
+RACING_ENABLED = bool(RACE_MODELS)
+HEDGE_DELAY_S = float(os.getenv("LLM_HEDGE_DELAY", "0"))
+
+_write_lock = threading.Lock()
+
+
+class _Race:
+    def __init__(self, model_ids: List[str]):
+        self.model_ids = model_ids
+        self.events = queue.Queue()
+        self.lock = threading.Lock()
+        self.decided = threading.Event()
+        self.winner = None
+        # Set once the deadline is reached
+        self.aborted = False
+        self.streams = {}
+        self.outcomes = {model_id: "not launched" for model_id in model_ids}
+
+    def claim(self, model_id: str) -> bool:
+        # The first contestant to produce text wins, the others are closed
+        with self.lock:
+            if self.winner is None:
+                self.winner = model_id
+                self.decided.set()
+            elif self.winner != model_id:
+                return False
+            losers = [s for m, s in self.streams.items() if m != model_id]
+
+        for stream in losers:
+            try:
+                stream.close()
+            except Exception:
+                pass
+        return True
+
+    def register(self, model_id: str, stream) -> bool:
+        with self.lock:
+            if self.winner is not None or self.aborted:
+                return False
+            self.streams[model_id] = stream
+            return True
+
+    def abort(self):
+        # Deadline reached: close every stream, the winner's included
+        with self.lock:
+            self.aborted = True
+            self.decided.set()
+            streams = list(self.streams.values())
+            for model_id, outcome in self.outcomes.items():
+                if outcome == "launched":
+                    self.outcomes[model_id] = "timed out"
+
+        for stream in streams:
+            try:
+                stream.close()
+            except Exception:
+                pass
+
+
+def _contest(race: _Race, index: int, model_id: str, prompt: str, temperature: float, max_tokens: int,
+             hedge_delay: float, start: float, deadline: float, state: Optional[str]):
+    # Hedging: wait for our turn, give up if somebody answered meanwhile
+    if hedge_delay > 0 and index > 0 and race.decided.wait(timeout=index * hedge_delay):
+        return
+    if race.decided.is_set() or deadline - time.monotonic() < MIN_ATTEMPT_S:
+        return
+
+    race.outcomes[model_id] = "launched"
+    ttft = None
+    # True once the stream ended normally (not cut off by an error or the deadline)
+    finished = False
+    chunks = 0
+    prompt_tokens = None
+    completion_tokens = None
+    try:
+        stream = get_client().chat.completions.create(
+            model=model_id,
+            messages=build_messages(prompt),
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=True,
+            stream_options={"include_usage": True},
+            timeout=max(deadline - time.monotonic(), MIN_ATTEMPT_S)
+        )
+        if not race.register(model_id, stream):
+            stream.close()
+            race.outcomes[model_id] = "cancelled"
+            return
+
+        for chunk in stream:
+            if getattr(chunk, "usage", None):
+                prompt_tokens = chunk.usage.prompt_tokens
+                completion_tokens = chunk.usage.completion_tokens
+            if not (chunk.choices and chunk.choices[0].delta.content):
+                continue
+
+            if ttft is None:
+                if not race.claim(model_id):
+                    stream.close()
+                    race.outcomes[model_id] = "cancelled"
+                    return
+                ttft = time.perf_counter() - start
+                race.outcomes[model_id] = "won"
+            chunks += 1
+            race.events.put(("delta", model_id, chunk.choices[0].delta.content))
+
+        finished = True
+        if ttft is not None:
+            total = time.perf_counter() - start
+            record_stream_metrics(model_id, ttft, total, completion_tokens or chunks)
+            record_llm_call(model_id, "race", total, ttft=ttft, prompt_tokens=prompt_tokens,
+                            completion_tokens=completion_tokens or chunks, state=state)
+    except Exception as e:
+        if race.aborted:
+            # Stream closed at the deadline
+            record_llm_call(model_id, "race", time.perf_counter() - start, ttft=ttft,
+                            completion_tokens=chunks or None, error="turn budget exhausted", state=state)
+            race.outcomes[model_id] = "timed out" if ttft is None else "truncated"
+            return
+        if race.winner is not None and race.winner != model_id:
+            # Our stream was closed by the winner
+            race.outcomes[model_id] = "cancelled"
+            return
+        print(f"[ERROR] {model_id} failed during the race: {e}")
+        record_llm_call(model_id, "race", time.perf_counter() - start, ttft=ttft,
+                        completion_tokens=chunks or None, error=str(e), state=state)
+        race.outcomes[model_id] = "failed" if ttft is None else "truncated"
+    finally:
+        race.events.put(("end", model_id, (ttft, finished)))
+
+
+def race_stream(prompt: str, models: Optional[List[str]] = None, hedge_delay: Optional[float] = None,
+                temperature: float = 0.6, max_tokens: int = 150, state: Optional[str] = None,
+                deadline: Optional[float] = None, use_cache: bool = True) -> Iterator[str]:
+    """
+    Stream the response of the fastest of several models.
+
+    Args:
+        prompt (str): the user's request
+        models (Optional[List[str]]): registry names or model IDs, in launch order
+            (default: LLM_RACE_MODELS, or gemini and llama)
+        hedge_delay (Optional[float]): delay between two launches in seconds,
+            0 to launch every model at once (default: LLM_HEDGE_DELAY)
+        temperature (float): sampling temperature
+        max_tokens (int): maximum length of the response
+        state (Optional[str]): dialogue state recorded with the calls
+        deadline (Optional[float]): absolute time.monotonic() deadline
+            (default: a full turn budget from now)
+        use_cache (bool): return the cached response of one of the models if there is
+            one, and cache the winning response
+
+    Yields:
+        str: the successive text deltas of the winning response
+    """
+    models = models or RACE_MODELS or DEFAULT_RACE_MODELS.split(",")
+    hedge_delay = HEDGE_DELAY_S if hedge_delay is None else hedge_delay
+    model_ids = list(dict.fromkeys(resolve_model(m) for m in models))
+    state = state or current_dialogue_state()
+    deadline = deadline or time.monotonic() + TURN_BUDGET_S
+    use_cache = use_cache and client.CACHE_ENABLED
+    start = time.perf_counter()
+
+    if use_cache:
+        for model_id in model_ids:
+            cached = response_cache.get(model_id, prompt, temperature, max_tokens)
+            if cached is not None:
+                record_llm_call(model_id, "race", time.perf_counter() - start, cache_hit=True, state=state)
+                yield cached
+                return
+
+    race = _Race(model_ids)
+    for index, model_id in enumerate(model_ids):
+        threading.Thread(
+            target=_contest,
+            args=(race, index, model_id, prompt, temperature, max_tokens, hedge_delay, start, deadline, state),
+            name=f"race-{model_id}",
+            daemon=True,
+        ).start()
+
+    deltas = []
+    ended = 0
+    winner_ttft = None
+    # Whether the winner's stream ended normally
+    complete = False
+    try:
+        while ended < len(model_ids):
+            try:
+                kind, model_id, payload = race.events.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                print("[WARNING] Race: turn budget exhausted")
+                race.abort()
+                break
+            if kind == "end":
+                ended += 1
+                if model_id == race.winner:
+                    winner_ttft, complete = payload
+                    break
+                # Nobody left to launch or answer once everybody has given up
+                if race.winner is None and all(o in ("failed", "cancelled") for o in race.outcomes.values()):
+                    break
+            elif model_id == race.winner:
+                deltas.append(payload)
+                yield payload
+    except GeneratorExit:
+        # The consumer stopped early (e.g. barge-in): close the winning stream too
+        race.abort()
+        raise
+    finally:
+        # Stop the contestants that have not been launched yet
+        race.decided.set()
+
+    if not deltas:
+        yield FALLBACK_RESPONSE
+    else:
+        print(f"[INFO] Race won by {race.winner} (first token after {winner_ttft or 0:.2f}s)")
+        if not complete:
+            print(f"[WARNING] Response of {race.winner} cut off after {len(deltas)} deltas")
+        # Only complete responses are cached
+        elif use_cache and not race.aborted:
+            response_cache.put(race.winner, prompt, temperature, max_tokens, "".join(deltas).strip())
+
+    record_race(race.winner, winner_ttft, time.perf_counter() - start, hedge_delay, race.outcomes,
+                truncated=bool(deltas) and not complete)
+
+
+def race(prompt: str, models: Optional[List[str]] = None, hedge_delay: Optional[float] = None,
+         temperature: float = 0.6, max_tokens: int = 150, state: Optional[str] = None,
+         deadline: Optional[float] = None, use_cache: bool = True) -> str:
+    """
+    Get the response of the fastest of several models (see race_stream).
+
+    Returns:
+        str: the winning response, or a fallback sentence if every model failed
+            or none answered before the deadline
+    """
+    return "".join(race_stream(prompt, models, hedge_delay, temperature, max_tokens, state, deadline,
+                               use_cache)).strip()
+
+
+def record_race(winner: Optional[str], ttft: Optional[float], total_time: float, hedge_delay: float,
+                outcomes: Dict[str, str], truncated: bool = False):
+    """
+    Append the result of one race to the race log.
+
+    Args:
+        winner (Optional[str]): model ID of the winner (None if every model failed)
+        ttft (Optional[float]): time to the winner's first token in seconds
+        total_time (float): time until the winner's last token in seconds
+        hedge_delay (float): delay between two launches in seconds
+        outcomes (Dict[str, str]): model ID → won / truncated / cancelled / failed / timed out / not launched
+        truncated (bool): the winner's response was cut off (error or deadline) after its first token
+    """
+    entry = {
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "winner": winner,
+        "ttft_s": round(ttft, 4) if ttft is not None else None,
+        "total_s": round(total_time, 4),
+        "hedge_delay_s": hedge_delay,
+        "launched": sum(outcome != "not launched" for outcome in outcomes.values()),
+        "outcomes": outcomes,
+        "truncated": truncated,
+    }
+
+    with _write_lock:
+        RACE_LOG.parent.mkdir(parents=True, exist_ok=True)
+        with RACE_LOG.open("a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+
+
+def summarize_races(entries: List[Dict]) -> Dict[str, Dict]:
+    """
+    Aggregate the wins and the latency of the winners per model.
+
+    Returns:
+        Dict[str, Dict]: model → {wins, win rate, ttft p50/p95, total p50/p95}
+    """
+    by_winner = {}
+    for entry in entries:
+        by_winner.setdefault(entry["winner"] or "(all failed)", []).append(entry)
+
+    summary = {}
+    for winner, races in by_winner.items():
+        ttfts = [r["ttft_s"] for r in races if r["ttft_s"] is not None]
+        totals = [r["total_s"] for r in races]
+        summary[winner] = {
+            "wins": len(races),
+            "win_rate": len(races) / len(entries),
+            "ttft_p50_s": percentile(ttfts, 50),
+            "ttft_p95_s": percentile(ttfts, 95),
+            "total_p50_s": percentile(totals, 50),
+            "total_p95_s": percentile(totals, 95),
+        }
+    return summary
+
+
+if __name__ == "__main__":
+    entries = []
+    if RACE_LOG.exists():
+        with RACE_LOG.open("r", encoding="utf-8") as f:
+            entries = [json.loads(line) for line in f if line.strip()]
+
+    if not entries:
+        print(f"[INFO] No races recorded yet in {RACE_LOG}")
+    else:
+        launched = sum(e["launched"] for e in entries) / len(entries)
+        print(f"[INFO] {len(entries)} races, {launched:.2f} models launched per race on average")
+        truncated = sum(e.get("truncated", False) for e in entries)
+        if truncated:
+            print(f"[WARNING] {truncated} winning responses were cut off before the end")
+
+    summary = summarize_races(entries)
+    print(f"{'winner':<40} {'wins':>5} {'rate':>6} {'TTFT p50':>9} {'TTFT p95':>9} {'total p50':>10} {'total p95':>10}")
+    for winner, s in sorted(summary.items()):
+        print(f"{winner:<40} {s['wins']:>5} {s['win_rate']:>6.1%} {format_metric(s['ttft_p50_s']):>9} {format_metric(s['ttft_p95_s']):>9} "
+              f"{format_metric(s['total_p50_s']):>10} {format_metric(s['total_p95_s']):>10}")
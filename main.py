@@ -2,15 +2,18 @@ from dialogue_manager.dialog_manager import DialogueManager
 from dialogue_manager.state import State
 from preferences_database.init_preferences import init_user_preferences
 from preferences_database.preferences_loader import load_user_preferences, is_preferences_file_empty
-from utils.tts import speak
+from utils.tts import TTSService, speak_streamed
 import json
 
+# Speech runs on its own thread: the dialogue keeps going while the assistant talks,
+# and the driver can interrupt it by speaking
+tts = TTSService(barge_in=True)
 
 if is_preferences_file_empty():
     text1 = "Hello ! I'm delighted to welcome you on board. I'm your driving assistant, at your service to navigate according " \
     "to your points of interest. Before we start, please answer a few questions so that I can get to know your preferences better."
 
-    speak(text1)
+    tts.say(text1).wait()
 
     # Initialize user preferences
     init_user_preferences()
@@ -19,7 +22,7 @@ else:
     text2 = "Hello ! I'm delighted to welcome you on board. I'm your driving assistant, at your service to navigate according " \
     "to your points of interest. Let's get started."
 
-    speak(text2)
+    tts.say(text2)
 
 # Load user preferences from the JSON file
 user_preferences = load_user_preferences()
@@ -33,6 +36,21 @@ while not dm.exit:
     reply = dm.handle_input()
     if reply:
         print("\n")
-        print(f"Assistant: {reply}")
-        speak(reply)
+        if isinstance(reply, str):
+            print(f"Assistant: {reply}")
+            # Return as soon as playback begins, the DialogueManager waits for it
+            # to end (or to be interrupted) before listening again
+            dm.playback = tts.say(reply)
+        else:
+            # Streamed LLM response: display it as it arrives and speak it sentence by sentence
+            print("Assistant: ", end="", flush=True)
+            speech = speak_streamed(reply, tts, on_delta=lambda delta: print(delta, end="", flush=True))
+            dm.playback = speech.last_handle
+            print(f"\n[INFO] Time to first audio: {speech.time_to_first_audio() or 0:.2f} seconds")
+
+        if dm.playback:
+            dm.playback.started.wait()
         print("\n")
+
+# Let the goodbye message finish
+tts.shutdown()
@@ -0,0 +1,120 @@
+######################################################################
+# preference_profile.py
+
+# Compiled form of user_preferences.json for the hot paths.
+#
+# The retriever and the recommender test every candidate POI against the
+# preferences: provider membership, "avoid" and blacklist substrings,
+# distance / rating / budget thresholds. PreferenceProfile resolves all of
+# it once when the preferences are loaded:
+# - preferred providers as a frozenset
+# - avoid / blacklist terms lowercased and stripped into one regex each
+#   (blank terms, left by empty answers to init_preferences, are dropped)
+# - budgets mapped to price levels and missing thresholds to their defaults
+#   (a missing distance limit means no limit, not 0 km)
+#
+# Functions:
+### - compile_preferences
+######################################################################
+
+import math
+import re
+from typing import Dict, Iterable, Optional
+
+# Price levels (1 = cheap, 2 = moderate, 3 = expensive) used for scoring
+BUDGET_MAP = {"cheap": 1, "moderate": 2, "expensive": 3}
+# Google Places maxprice levels used for searching
+SEARCH_PRICE_MAP = {"inexpensive": 0, "cheap": 1, "moderate": 2, "expensive": 3, "very_expensive": 4}
+
+
+def _substring_regex(terms: Iterable[str]) -> Optional[re.Pattern]:
+    """
+    Compile terms into one regex matching any of them inside a lowercased text.
+
+    Returns:
+        Optional[re.Pattern]: None when there is no (non-blank) term
+    """
+    terms = sorted({term.strip().lower() for term in terms if term and term.strip()}, key=len, reverse=True)
+    if not terms:
+        return None
+    return re.compile("|".join(re.escape(term) for term in terms))
+
+
+def _distance_limit(value) -> float:
+    """
+    Distance limit in km, math.inf when it is missing or null (a 0 km default
+    would filter out every point of interest).
+    """
+    return float(value) if value is not None else math.inf
+
+
+class StationRules:
+    __slots__ = ("preferred_providers", "max_detour_km", "charging_power_min_kw", "avoid_re")
+
+    def __init__(self, prefs: Dict):
+        self.preferred_providers = frozenset(p.strip() for p in prefs.get("preferred_providers", []) if p and p.strip())
+        self.max_detour_km = _distance_limit(prefs.get("max_detour_km"))
+        # None for petrol profiles: no power requirement
+        self.charging_power_min_kw = prefs.get("charging_power_min_kw") or 0
+        self.avoid_re = _substring_regex(prefs.get("avoid", []))
+
+    def is_avoided(self, name: str) -> bool:
+        return self.avoid_re is not None and self.avoid_re.search(name.lower()) is not None
+
+
+class PlaceRules:
+    __slots__ = ("max_distance_km", "min_rating", "max_price", "search_max_price", "blacklist_re")
+
+    def __init__(self, prefs: Dict, budget_key: str, blacklist_key: Optional[str] = None, default_min_rating: float = 0.0):
+        budget = (prefs.get(budget_key) or "moderate").strip().lower()
+        self.max_distance_km = _distance_limit(prefs.get("max_distance_from_route_km"))
+        self.min_rating = float(prefs.get("min_rating", default_min_rating) or 0)
+        self.max_price = BUDGET_MAP.get(budget, 2)
+        self.search_max_price = SEARCH_PRICE_MAP.get(budget, 2)
+        self.blacklist_re = _substring_regex(prefs.get(blacklist_key, [])) if blacklist_key else None
+
+    def is_blacklisted(self, name: str) -> bool:
+        return self.blacklist_re is not None and self.blacklist_re.search(name.lower()) is not None
+
+
+class PreferenceProfile:
+    __slots__ = ("stations", "restaurants", "hobbies")
+
+    def __init__(self, user_preferences: Dict):
+        """
+        Compile the preferences.
+
+        Args:
+            user_preferences (Dict): preferences loaded from user_preferences.json
+        """
+        self.stations = StationRules(user_preferences.get("stations", {}))
+        self.restaurants = PlaceRules(user_preferences.get("restaurants", {}), "average_budget", "blacklisted_restaurants")
+        self.hobbies = PlaceRules(user_preferences.get("hobbies", {}), "max_budget_per_activity", default_min_rating=4.0)
+
+    def rules(self, POI_type: str):
+        """
+        Rules of a point of interest type ("stations", "restaurants" or "hobbies").
+        """
+        return getattr(self, POI_type)
+
+
+def compile_preferences(user_preferences: Dict) -> PreferenceProfile:
+    """
+    Compile the preferences once, for the retriever and the recommender.
+
+    Args:
+        user_preferences (Dict): preferences loaded from user_preferences.json
+
+    Returns:
+        PreferenceProfile: compiled preferences
+    """
+    return PreferenceProfile(user_preferences)
+
+
+if __name__ == "__main__":
+    from preferences_database.preferences_loader import load_user_preferences
+
+    profile = compile_preferences(load_user_preferences())
+    for POI_type in ("stations", "restaurants", "hobbies"):
+        rules = profile.rules(POI_type)
+        print(POI_type, {slot: getattr(rules, slot) for slot in rules.__slots__})
@@ -0,0 +1,223 @@
+######################################################################
+# context_manager.py
+
+# Keeps the prompt of the follow-up turns bounded.
+#
+# The conversation file written by prompt_builder grows with every
+# exchange (instructions, then "User: ..." / "Assistant: ..." turns).
+# Instead of sending all of it back to the LLM, the prompt is built from:
+# - the instruction block (the recommendations and the rules)
+# - a summary of the older turns, cached in recommendation_engine/summaries/
+#   so that each turn is only summarized once
+# - the last N turns verbatim
+# within a token budget (tiktoken, cl100k_base).
+#
+# Functions:
+### - count_tokens
+### - split_history
+### - extractive_summary
+### - llm_summary
+######################################################################
+
+import json
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+from recommendation_engine.prompt_builder import PROMPT_DIR, load_prompt
+
+# Not inside PROMPT_DIR: the dialogue manager takes the last file of PROMPT_DIR
+SUMMARY_DIR = Path("recommendation_engine/summaries")
+
+MAX_RECENT_TURNS = 4
+TOKEN_BUDGET = 1000
+SUMMARY_WORDS_PER_TURN = 25
+
+TURN_RE = re.compile(r"^(User|Assistant): ", re.MULTILINE)
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        print(f"[WARNING] tiktoken unavailable ({e}), estimating tokens from characters")
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """
+    Number of tokens of a text (about 4 characters per token without tiktoken).
+    """
+    encoding = _encoding()
+    if encoding is None:
+        return (len(text) + 3) // 4
+    return len(encoding.encode(text))
+
+
+def split_history(text: str) -> Tuple[str, List[Tuple[str, str]]]:
+    """
+    Split a conversation file into its instruction block and its turns.
+
+    Args:
+        text (str): content of the conversation file
+
+    Returns:
+        Tuple[str, List[Tuple[str, str]]]: the instructions and the
+            (speaker, message) turns in chronological order
+    """
+    matches = list(TURN_RE.finditer(text))
+    if not matches:
+        return text, []
+
+    instructions = text[:matches[0].start()]
+    turns = []
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
+        turns.append((match.group(1), text[match.end():end].strip()))
+    return instructions, turns
+
+
+def extractive_summary(previous: str, turns: List[Tuple[str, str]]) -> str:
+    """
+    Summarize turns locally: the first sentence of each message, shortened.
+
+    Args:
+        previous (str): summary of the turns before these ones
+        turns (List[Tuple[str, str]]): (speaker, message) turns to add
+
+    Returns:
+        str: the updated summary
+    """
+    lines = [previous] if previous else []
+    for speaker, message in turns:
+        sentence = re.split(r"(?<=[.!?])\s", message, maxsplit=1)[0]
+        words = sentence.split()
+        if len(words) > SUMMARY_WORDS_PER_TURN:
+            sentence = " ".join(words[:SUMMARY_WORDS_PER_TURN]) + "…"
+        lines.append(f"- {speaker}: {sentence}")
+    return "\n".join(lines)
+
+
+def llm_summary(previous: str, turns: List[Tuple[str, str]]) -> str:
+    """
+    Summarize turns with the language model (one extra call per summarized turn batch).
+    """
+    from language_model.client import chat
+
+    dialogue = "\n".join(f"{speaker}: {message}" for speaker, message in turns)
+    prompt = ("Summarize this conversation between a driver and an in-car assistant in at most "
+              "three short sentences, keeping the places mentioned and the driver's choices.\n\n")
+    if previous:
+        prompt += f"Summary so far:\n{previous}\n\n"
+    prompt += f"New turns:\n{dialogue}"
+    return chat(prompt, temperature=0.0, max_tokens=120)
+
+
+class DialogueContext:
+    def __init__(self, max_recent_turns: int = MAX_RECENT_TURNS, token_budget: int = TOKEN_BUDGET,
+                 summarizer: Callable[[str, List[Tuple[str, str]]], str] = extractive_summary):
+        """
+        Initialize the context manager.
+
+        Args:
+            max_recent_turns (int): number of turns kept verbatim
+            token_budget (int): maximum number of tokens of the prompt
+            summarizer (Callable): (previous summary, turns) → updated summary
+        """
+        self.max_recent_turns = max_recent_turns
+        self.token_budget = token_budget
+        self.summarizer = summarizer
+        # Token counts of the last built prompt
+        self.last_stats = None
+
+    @staticmethod
+    def _summary_path(file: str) -> Path:
+        return SUMMARY_DIR / f"{Path(file).stem}.json"
+
+    def _load_summary(self, file: str) -> Tuple[int, str]:
+        path = self._summary_path(file)
+        if not path.exists():
+            return 0, ""
+        with path.open("r", encoding="utf-8") as f:
+            cached = json.load(f)
+        return cached["turns"], cached["summary"]
+
+    def _save_summary(self, file: str, turns: int, summary: str):
+        SUMMARY_DIR.mkdir(parents=True, exist_ok=True)
+        with self._summary_path(file).open("w", encoding="utf-8") as f:
+            json.dump({"turns": turns, "summary": summary}, f, indent=4)
+
+    @staticmethod
+    def _render(instructions: str, summary: str, recent: List[Tuple[str, str]]) -> str:
+        prompt = instructions
+        if summary:
+            prompt += f"Summary of the earlier conversation:\n{summary}\n\n"
+        for speaker, message in recent:
+            prompt += f"{speaker}: {message}\n\n"
+        return prompt
+
+    def build(self, file: str) -> str:
+        """
+        Build the bounded prompt of a conversation file.
+
+        Args:
+            file (str): filename of the conversation in PROMPT_DIR
+
+        Returns:
+            str: instructions + summary of the older turns + recent turns
+        """
+        instructions, turns = split_history(load_prompt(file))
+
+        summarized, summary = self._load_summary(file)
+        if summarized > len(turns):
+            # The conversation file was rewritten: start over
+            summarized, summary = 0, ""
+
+        # Turns before `start` are summarized, the following ones are kept verbatim
+        start = max(summarized, len(turns) - self.max_recent_turns)
+        while True:
+            if start > summarized:
+                # Only the turns not covered by the cached summary are summarized
+                summary = self.summarizer(summary, turns[summarized:start])
+                summarized = start
+                self._save_summary(file, summarized, summary)
+
+            prompt = self._render(instructions, summary, turns[start:])
+            tokens = count_tokens(prompt)
+            # Move the oldest verbatim turn into the summary until the prompt fits
+            if tokens <= self.token_budget or start >= len(turns) - 1:
+                break
+            start += 1
+
+        if tokens > self.token_budget and summary:
+            # Still too long: drop the oldest summary lines
+            lines = summary.split("\n")
+            while len(lines) > 1 and tokens > self.token_budget:
+                lines.pop(0)
+                prompt = self._render(instructions, "\n".join(lines), turns[start:])
+                tokens = count_tokens(prompt)
+
+        keep = len(turns) - start
+        self.last_stats = {
+            "prompt_tokens": tokens,
+            "full_history_tokens": count_tokens(self._render(instructions, "", turns)),
+            "recent_turns": keep,
+            "summarized_turns": len(turns) - keep,
+        }
+        print(f"[INFO] Prompt context: {tokens} tokens ({keep} recent turns, "
+              f"{len(turns) - keep} summarized; full history: {self.last_stats['full_history_tokens']} tokens)")
+        return prompt
+
+
+if __name__ == "__main__":
+    import os
+
+    files = sorted(os.listdir(PROMPT_DIR)) if PROMPT_DIR.exists() else []
+    files = [f for f in files if f.endswith(".txt")]
+    if not files:
+        print(f"[INFO] No conversation in {PROMPT_DIR}")
+    else:
+        print(DialogueContext().build(files[-1]))
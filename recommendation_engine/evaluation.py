@@ -16,13 +16,15 @@
 ### - is_empty_log_feedback
 #######################################################################################
 
-from typing import List, Dict
+from typing import List, Dict, Optional
 from pathlib import Path
 from datetime import datetime
 from bert_score import score
 from rouge_score import rouge_scorer
 import json
 
+from recommendation_engine.feedback_store import update_feedback_store
+
 # Path to log evaluation data
 EVAL_LOG = Path("recommendation_engine/evaluation_log.json")
 
@@ -112,15 +114,16 @@ def compute_ROUGE_L(generated_response: str) -> float:
     return round(scores['rougeL'].fmeasure, 3)
 
 
-def evaluate_recommendations(recommended: str, feedback: Dict, BERTScore: float, RougeScore: float) -> Dict:
+def evaluate_recommendations(recommended: str, feedback: Dict, BERTScore: Optional[float],
+                             RougeScore: Optional[float]) -> Dict:
     """
     Calculate precision and recall based on user feedback.
     A station is considered relevant if it has a rating ≥ 4.
 
     Args:
         recommended (str): name of the recommended point of interest
-        BERTScore (float): BERTScore F1 score for the generated response
-        RougeScore (float): ROUGE-L F1 score for the generated response
+        BERTScore (Optional[float]): BERTScore F1 score for the generated response (None if not scored)
+        RougeScore (Optional[float]): ROUGE-L F1 score for the generated response (None if not scored)
         feedback (Dict): POIs name → user rating (1 to 5)
 
     Returns:
@@ -131,8 +134,8 @@ def evaluate_recommendations(recommended: str, feedback: Dict, BERTScore: float,
         "timestamp": datetime.utcnow().isoformat() + "Z",
         "recommended": recommended,
         "feedback": feedback,
-        "BERTScore": round(BERTScore, 3),
-        "RougeScore": round(RougeScore, 3),
+        "BERTScore": round(BERTScore, 3) if BERTScore is not None else None,
+        "RougeScore": round(RougeScore, 3) if RougeScore is not None else None,
     }
 
     log_evaluation(result)
@@ -142,11 +145,13 @@ def evaluate_recommendations(recommended: str, feedback: Dict, BERTScore: float,
 
 def log_evaluation(entry: Dict):
     """
-    Save the evaluation result and feedback into a log file for future analysis.
+    Save the evaluation result and feedback into a log file for future analysis,
+    and add its rating to the per-POI feedback aggregate.
 
     Args:
         entry (Dict): evaluation result to store
     """
+    previous_size = EVAL_LOG.stat().st_size if EVAL_LOG.exists() else 0
     if not EVAL_LOG.exists() or EVAL_LOG.stat().st_size == 0:
         # File doesn't exist or is empty → create and write first entry
         with EVAL_LOG.open("w") as f:
@@ -163,6 +168,8 @@ def log_evaluation(entry: Dict):
             json.dump(data, f, indent=4)
             f.truncate()
 
+    update_feedback_store(entry, previous_log_size=previous_size)
+
 
 def is_empty_log_feedback() -> bool:
     """
@@ -0,0 +1,158 @@
+######################################################################
+# feedback_store.py
+
+# Running aggregate of the user ratings per point of interest.
+#
+# evaluation_log.json keeps every evaluation ever made; averaging it on
+# each recommendation gets slower with every rating. This store keeps,
+# per POI, the sum and count of its ratings and when it was last rated.
+# log_evaluation() updates it with each new entry, and the recommender
+# reads it in O(1) per POI. It also records the size of the log it
+# reflects: if the log was changed by other means, the aggregate is
+# rebuilt from it on the next read.
+#
+# Usage:
+#   python -m recommendation_engine.feedback_store            (show the aggregate)
+#   python -m recommendation_engine.feedback_store --rebuild  (recompute it from the log)
+#
+# Functions:
+### - update_feedback_store
+### - rebuild_feedback_store
+### - load_feedback_aggregates
+######################################################################
+
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+EVAL_LOG = Path("recommendation_engine/evaluation_log.json")
+FEEDBACK_STORE = Path("recommendation_engine/feedback_scores.json")
+
+# Store file as last read or written: (mtime, size, data)
+_cached = None
+
+
+def _add_rating(entries: Dict[str, Dict], entry: Dict):
+    # Same rules as the averages computed from the log: named POI, numeric rating
+    feedback = entry.get("feedback", {})
+    poi_name = feedback.get("point_of_interest")
+    rating = feedback.get("rating")
+
+    if poi_name and isinstance(rating, (int, float)):
+        aggregate = entries.setdefault(poi_name, {"sum": 0, "count": 0, "last_updated": None})
+        aggregate["sum"] += rating
+        aggregate["count"] += 1
+        aggregate["last_updated"] = entry.get("timestamp") or datetime.utcnow().isoformat() + "Z"
+
+
+def _log_size(log_path: Path) -> int:
+    return log_path.stat().st_size if log_path.exists() else 0
+
+
+def _save(entries: Dict[str, Dict], log_path: Path, path: Path):
+    global _cached
+
+    data = {"log_size": _log_size(log_path), "entries": entries}
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    with tmp_path.open("w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    # Atomic replace: a crash never leaves a half-written store
+    os.replace(tmp_path, path)
+
+    stat = path.stat()
+    _cached = (stat.st_mtime_ns, stat.st_size, data)
+
+
+def _read(path: Path) -> Optional[Dict]:
+    global _cached
+
+    if not path.exists():
+        return None
+    stat = path.stat()
+    if _cached is not None and _cached[:2] == (stat.st_mtime_ns, stat.st_size):
+        return _cached[2]
+
+    try:
+        with path.open("r", encoding="utf-8") as f:
+            data = json.load(f)
+    except json.JSONDecodeError:
+        print(f"[WARNING] Corrupted feedback store {path}")
+        return None
+    _cached = (stat.st_mtime_ns, stat.st_size, data)
+    return data
+
+
+def rebuild_feedback_store(log_path: Path = EVAL_LOG, path: Path = FEEDBACK_STORE) -> Dict[str, Dict]:
+    """
+    Recompute the aggregate from the whole evaluation log.
+
+    Returns:
+        Dict[str, Dict]: {poi_name: {"sum": float, "count": int, "last_updated": str}}
+    """
+    entries = {}
+    if log_path.exists():
+        with log_path.open("r", encoding="utf-8") as f:
+            content = f.read().strip()
+        try:
+            for entry in json.loads(content) if content else []:
+                _add_rating(entries, entry)
+        except json.JSONDecodeError:
+            print(f"[WARNING] Corrupted evaluation log {log_path}, feedback aggregate left empty")
+
+    _save(entries, log_path, path)
+    return entries
+
+
+def update_feedback_store(entry: Dict, previous_log_size: Optional[int] = None, log_path: Path = EVAL_LOG,
+                          path: Path = FEEDBACK_STORE):
+    """
+    Add one evaluation to the aggregate (called once the entry is in the log).
+
+    Args:
+        entry (Dict): evaluation appended to the log
+        previous_log_size (Optional[int]): size of the log before the entry was
+            appended, to detect changes the aggregate has not seen
+    """
+    data = _read(path)
+    if data is None or (previous_log_size is not None and data.get("log_size") != previous_log_size):
+        # The log, which already holds the entry, is the reference
+        rebuild_feedback_store(log_path, path)
+        return
+
+    # New dicts: readers may still hold the previous aggregate
+    entries = {name: dict(aggregate) for name, aggregate in data["entries"].items()}
+    _add_rating(entries, entry)
+    _save(entries, log_path, path)
+
+
+def load_feedback_aggregates(log_path: Path = EVAL_LOG, path: Path = FEEDBACK_STORE) -> Dict[str, Dict]:
+    """
+    Read the aggregate, rebuilding it if it is missing or out of date with the log.
+
+    The file is only parsed again when it changed since the last call.
+
+    Returns:
+        Dict[str, Dict]: {poi_name: {"sum": float, "count": int, "last_updated": str}}
+    """
+    data = _read(path)
+    if data is None or data.get("log_size") != _log_size(log_path):
+        if data is not None:
+            print("[INFO] Evaluation log changed outside log_evaluation(), rebuilding the feedback aggregate")
+        return rebuild_feedback_store(log_path, path)
+    return data["entries"]
+
+
+if __name__ == "__main__":
+    import sys
+
+    if "--rebuild" in sys.argv:
+        entries = rebuild_feedback_store()
+        print(f"[INFO] Feedback aggregate rebuilt from {EVAL_LOG}: {len(entries)} points of interest")
+    else:
+        entries = load_feedback_aggregates()
+        for name, aggregate in sorted(entries.items(), key=lambda item: -item[1]["count"]):
+            print(f"{name:<50} {aggregate['sum'] / aggregate['count']:.2f} ({aggregate['count']} ratings, "
+                  f"last {aggregate['last_updated']})")
@@ -10,21 +10,33 @@
 #
 ### - load_feedback_scores
 ### - compute_score
+### - score_batch
 ### - recommend_places
+### - recommendation_pages
 ######################################################################
 
-import json
+from numbers import Real
 from pathlib import Path
-from typing import List, Dict
+from typing import Iterator, List, Dict, Optional
 
+import numpy as np
+
+from preferences_database.preference_profile import PreferenceProfile, compile_preferences
+from recommendation_engine.feedback_store import load_feedback_aggregates
 
 PREF_FILE = Path("preferences_database/user_preferences.json")
 EVAL_LOG = Path("recommendation_engine/evaluation_log.json")
 
+NUMBER_TYPES = {int, float, bool}
+
+# (aggregate, averages) of the last load_feedback_scores() call
+_feedback_scores = (None, {})
+
 
 def load_feedback_scores() -> Dict[str, Dict[str, float]]:
     """
-    Load average feedback ratings and counts per POI from evaluation logs.
+    Load average feedback ratings and counts per POI from the feedback aggregate
+    (see feedback_store.py), kept up to date by log_evaluation.
 
     Returns:
         Dict[str, Dict]: {
@@ -34,38 +46,23 @@ def load_feedback_scores() -> Dict[str, Dict[str, float]]:
             }
         }
     """
-    if not EVAL_LOG.exists():
-        return {}
-
-    with EVAL_LOG.open() as f:
-        content = f.read().strip()
-        if not content:
-            return {}
-        logs = json.loads(content)
-
-    scores = {}
-    counts = {}
-
-    for entry in logs:
-        feedback = entry.get("feedback", {})
-        poi_name = feedback.get("point_of_interest")
-        rating = feedback.get("rating")
-
-        if poi_name and isinstance(rating, (int, float)):
-            scores[poi_name] = scores.get(poi_name, 0) + rating
-            counts[poi_name] = counts.get(poi_name, 0) + 1
-
-    return {
-        poi: {
-            "avg_rating": round(scores[poi] / counts[poi], 2),
-            "count": counts[poi]
-        }
-        for poi in scores
-    }
-
+    global _feedback_scores
+
+    aggregates = load_feedback_aggregates(EVAL_LOG)
+    # Averages are only recomputed when the aggregate changed
+    if _feedback_scores[0] is not aggregates:
+        _feedback_scores = (aggregates, {
+            poi: {
+                "avg_rating": round(aggregate["sum"] / aggregate["count"], 2),
+                "count": aggregate["count"]
+            }
+            for poi, aggregate in aggregates.items()
+        })
+    return _feedback_scores[1]
 
 
-def compute_score(point_of_interest: Dict, preferences: Dict, feedback_scores: Dict[str, Dict[str, float]], POI_type: str = "stations", _feedback=False) -> float:
+def compute_score(point_of_interest: Dict, preferences: Dict, feedback_scores: Dict[str, Dict[str, float]], POI_type: str = "stations", _feedback=False,
+                  profile: Optional[PreferenceProfile] = None) -> float:
     """
     Compute the recommendation score of a point of interest based on user preferences and feedback history.
 
@@ -75,30 +72,33 @@ def compute_score(point_of_interest: Dict, preferences: Dict, feedback_scores: D
         feedback_scores (Dict[str, float]): past average ratings per station
         POI_type (str): type of point of interest (e.g. "stations", "restaurants", "hobbies")
         _feedback (bool): whether to include feedback in scoring
+        profile (Optional[PreferenceProfile]): the preferences compiled beforehand
+            (compiled here if not given)
 
     Returns:
         float: final score (negative if filtered out)
     """
+    profile = profile or compile_preferences(preferences)
     score = 0.0
     
     if POI_type == "stations":
         station = point_of_interest
-        prefs = preferences["stations"]
+        rules = profile.stations
 
         # Preferred providers
-        if station["provider"] in prefs["preferred_providers"]:
+        if station["provider"] in rules.preferred_providers:
             score += 1.0
 
         # Filtering by max detour distance
-        if station["distance_km"] > prefs["max_detour_km"]:
+        if station["distance_km"] > rules.max_detour_km:
             return -1.0  # Filter out
 
         # Avoid conditions (e.g. avoid 'small providers')
-        if any(avoid.lower() in station["name"].lower() for avoid in prefs["avoid"]):
+        if rules.is_avoided(station["name"]):
             score -= 0.3
 
         # Charging power match
-        if station.get("charging_power_kw", 0) >= prefs["charging_power_min_kw"]:
+        if station.get("charging_power_kw", 0) >= rules.charging_power_min_kw:
             score += 0.5
 
         # Past feedback: rating ∈ [1,5] → offset around neutral (3)
@@ -110,118 +110,245 @@ def compute_score(point_of_interest: Dict, preferences: Dict, feedback_scores: D
         # Distance penalty
         score -= 0.05 * station["distance_km"]
     
-    elif POI_type == "restaurants":
-        restaurant = point_of_interest
-        prefs = preferences["restaurants"]
+    elif POI_type in ["restaurants", "hobbies"]:
+        place = point_of_interest
+        rules = profile.rules(POI_type)
 
         # Filter: too far from allowed detour
-        if restaurant["distance_km"] > prefs["max_distance_from_route_km"]:
+        if place["distance_km"] > rules.max_distance_km:
             return -1.0  # filtered out
 
         # Rating score
-        rating = restaurant.get("rating", 0)
-        if rating >= prefs["min_rating"]:
-            score += (rating - prefs["min_rating"]) * 1.0  # up to +1.0 if perfect match
+        rating = place.get("rating", 0)
+        if rating >= rules.min_rating:
+            score += (rating - rules.min_rating) * 1.0  # up to +1.0 if perfect match
 
         # Price level match (1 = cheap, 2 = moderate, 3 = expensive)
-        budget_map = {"cheap": 1, "moderate": 2, "expensive": 3}
-        max_price = budget_map.get(prefs["average_budget"], 2)
-        if "price_level" in restaurant:
-            if restaurant["price_level"] <= max_price:
+        if "price_level" in place:
+            if place["price_level"] <= rules.max_price:
                 score += 0.5 # within budget
             else:
                 return -1.0  # too expensive → filtered
 
         # Opening status
-        if restaurant.get("open_now") is True:
+        if place.get("open_now") is True:
             score += 0.7
-        elif restaurant.get("open_now") is False:
+        elif place.get("open_now") is False:
             score -= 0.8
 
         # Distance penalty
-        score -= 0.05 * restaurant["distance_km"]
+        score -= 0.05 * place["distance_km"]
 
         # Feedback history (if enabled)
         if _feedback:
-            rating = feedback_scores.get(restaurant["name"], {}).get("avg_rating", 0)
+            rating = feedback_scores.get(place["name"], {}).get("avg_rating", 0)
             if rating:
                 score += (rating - 3) * 0.3
-    
-    elif POI_type == "hobbies":
-        hobby = point_of_interest
-        prefs = preferences["hobbies"]
 
-        # Filter: too far from allowed detour
-        if hobby["distance_km"] > prefs["max_distance_from_route_km"]:
-            return -1.0  # filtered out
+    return score
 
-        # Rating score
-        rating = hobby.get("rating", 0)
-        if rating >= prefs["min_rating"]:
-            score += (rating - prefs["min_rating"]) * 1.0  # up to +1.0 if perfect match
-        
-        # Price level match (1 = cheap, 2 = moderate, 3 = expensive)
-        budget_map = {"cheap": 1, "moderate": 2, "expensive": 3}
-        max_price = budget_map.get(prefs["max_budget_per_activity"], 2)
-        if "price_level" in hobby:
-            if hobby["price_level"] <= max_price:
-                score += 0.5 # within budget
-            else:
-                return -1.0  # too expensive → filtered
 
-        # Opening status
-        if hobby.get("open_now") is True:
-            score += 0.7
-        elif hobby.get("open_now") is False:
-            score -= 0.8
+def _numeric(values: List, valid: np.ndarray) -> np.ndarray:
+    # Column of real numbers; rows holding anything else are marked invalid (scored one by one)
+    if set(map(type, values)) <= NUMBER_TYPES:
+        return np.fromiter(values, np.float64, len(values))
 
-        # Distance penalty
-        score -= 0.05 * hobby["distance_km"]
+    column = np.zeros(len(values))
+    for i, value in enumerate(values):
+        if type(value) in NUMBER_TYPES or isinstance(value, Real):
+            column[i] = value
+        else:
+            valid[i] = False
+    return column
 
-        # Feedback history (if enabled)
-        if _feedback:
-            rating = feedback_scores.get(hobby["name"], {}).get("avg_rating", 0)
-            if rating:
-                score += (rating - 3) * 0.3
 
-    return score
+def _feedback_column(POIs: List[Dict], feedback_scores: Dict[str, Dict[str, float]], valid: np.ndarray) -> np.ndarray:
+    ratings = [feedback_scores.get(poi.get("name"), {}).get("avg_rating", 0) for poi in POIs]
+    ratings = _numeric(ratings, valid)
+    # rating ∈ [1,5] → offset around neutral (3), nothing without feedback
+    return np.where(ratings != 0, (ratings - 3) * 0.3, 0.0)
 
 
-def recommend_places(user_preferences: Dict, nearby_POIs: List[Dict], POI_type: str = "stations", _feedback: bool = False) -> List[Dict]:
+def score_batch(POIs: List[Dict], preferences: Dict, feedback_scores: Dict[str, Dict[str, float]],
+                POI_type: str = "stations", _feedback: bool = False, profile: Optional[PreferenceProfile] = None) -> np.ndarray:
     """
-    Generate 1 to 3 personalized recommendations according to the point of interest of the user.
+    Vectorized compute_score() over a list of points of interest.
+
+    The fields are gathered into NumPy columns once and every rule is applied
+    to the whole column, in the same order as compute_score(), so the scores
+    are bit-for-bit identical. Points of interest with a non-numeric field
+    (e.g. price_level "Unknown") are scored by compute_score() itself.
 
     Args:
-        user_preferences (Dict): preferences loaded from user_preferences.json
-        nearby_POIs (List[Dict]): candidate points of interest with fields: name, provider, distance_km, charging_power_kw
-        POI_type (str): type of point of interest (e.g. "stations", "restaurants", "hobbies")
+        POIs (List[Dict]): points of interest of one type
+        preferences (Dict): user preferences from JSON
+        feedback_scores (Dict[str, Dict[str, float]]): past average ratings per name
+        POI_type (str): "stations", "restaurants" or "hobbies"
+        _feedback (bool): whether to include feedback in scoring
+        profile (Optional[PreferenceProfile]): the preferences compiled beforehand
 
     Returns:
-        List[Dict]: top scored points of interest
+        np.ndarray: one score per point of interest (-1.0 if filtered out)
     """
+    n = len(POIs)
+    if n == 0 or POI_type not in ("stations", "restaurants", "hobbies"):
+        return np.zeros(n)
+
+    profile = profile or compile_preferences(preferences)
+    rules = profile.rules(POI_type)
+
+    valid = np.ones(n, dtype=bool)
+    score = np.zeros(n)
+    distance = _numeric([poi.get("distance_km") for poi in POIs], valid)
+
+    if POI_type == "stations":
+        # Preferred providers, tested once per distinct provider
+        codes: Dict = {}
+        try:
+            provider_codes = np.array([codes.setdefault(poi.get("provider"), len(codes)) for poi in POIs])
+            preferred = np.array([provider in rules.preferred_providers for provider in codes], dtype=bool)
+            score += np.where(preferred[provider_codes], 1.0, 0.0)
+        except TypeError:  # unhashable provider
+            valid[:] = False
+
+        filtered = distance > rules.max_detour_km
+
+        # Avoid conditions: one regex over the lowercased names
+        names = [poi.get("name") for poi in POIs]
+        if not set(map(type, names)) <= {str}:
+            valid &= np.array([isinstance(name, str) for name in names], dtype=bool)
+            names = [name if isinstance(name, str) else "" for name in names]
+        if rules.avoid_re is not None:
+            search = rules.avoid_re.search
+            score -= np.where(np.fromiter((search(name.lower()) is not None for name in names), bool, n), 0.3, 0.0)
+
+        power = _numeric([poi.get("charging_power_kw", 0) for poi in POIs], valid)
+        score += np.where(power >= rules.charging_power_min_kw, 0.5, 0.0)
+
+        if _feedback:
+            score += _feedback_column(POIs, feedback_scores, valid)
+
+        score -= 0.05 * distance
+
+    else:
+        filtered = distance > rules.max_distance_km
+
+        rating = _numeric([poi.get("rating", 0) for poi in POIs], valid)
+        score += np.where(rating >= rules.min_rating, (rating - rules.min_rating) * 1.0, 0.0)
+
+        # Price level: within budget or filtered out, nothing when unknown
+        has_price = np.fromiter(("price_level" in poi for poi in POIs), bool, n)
+        price_valid = valid.copy()
+        price = _numeric([poi.get("price_level", 0) for poi in POIs], price_valid)
+        valid &= price_valid | ~has_price
+        within_budget = price <= rules.max_price
+        score += np.where(has_price & within_budget, 0.5, 0.0)
+        filtered |= has_price & ~within_budget
+
+        # Opening status: True / False / unknown
+        open_now = np.array([1 if status is True else -1 if status is False else 0
+                             for status in [poi.get("open_now") for poi in POIs]], dtype=np.int8)
+        score += np.where(open_now == 1, 0.7, 0.0)
+        score -= np.where(open_now == -1, 0.8, 0.0)
+
+        score -= 0.05 * distance
+
+        if _feedback:
+            score += _feedback_column(POIs, feedback_scores, valid)
+
+    scores = np.where(filtered, -1.0, score)
+    for i in np.flatnonzero(~valid):
+        scores[i] = compute_score(POIs[i], preferences, feedback_scores, POI_type=POI_type, _feedback=_feedback,
+                                  profile=profile)
+    return scores
+
+
+def _scored_places(user_preferences: Dict, nearby_POIs: List[Dict], POI_type: str, _feedback: bool,
+                   profile: Optional[PreferenceProfile]) -> List[Dict]:
+    # Candidates that pass the filters, with their rounded score, in input order
     feedback_scores = load_feedback_scores()
     scored = []
-    top = []
 
-    if POI_type == "stations":
-        for poi in nearby_POIs:
-            score = compute_score(poi, user_preferences, feedback_scores, POI_type=POI_type, _feedback=_feedback)
+    if POI_type in ["stations", "restaurants", "hobbies"]:
+        scores = score_batch(nearby_POIs, user_preferences, feedback_scores, POI_type=POI_type, _feedback=_feedback,
+                             profile=profile)
+        for poi, score in zip(nearby_POIs, scores.tolist()):
             if score >= 0:
                 poi["score"] = round(score, 2)
                 scored.append(poi)
 
-        top = sorted(scored, key=lambda x: x["score"], reverse=True)
+    return scored
 
-    elif POI_type in ["restaurants", "hobbies"]:
-        for poi in nearby_POIs:
-            score = compute_score(poi, user_preferences, feedback_scores, POI_type=POI_type, _feedback=_feedback)
-            if score >= 0:
-                poi["score"] = round(score, 2)
-                scored.append(poi)
 
-        top = sorted(scored, key=lambda x: x["score"], reverse=True)
-    
-    return top
+def _top_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Indices of the k best scores, best first, equal scores in index order.
+
+    Same result as np.argsort(-scores, kind="stable")[:k] in O(n + k log k).
+    """
+    n = len(scores)
+    if k >= n:
+        return np.argsort(-scores, kind="stable")
+
+    # k-th largest score: everything above it is in, ties are taken in index order
+    threshold = np.partition(scores, n - k)[n - k]
+    above = np.flatnonzero(scores > threshold)
+    ties = np.flatnonzero(scores == threshold)[:k - len(above)]
+    selected = np.sort(np.concatenate([above, ties]))
+    return selected[np.argsort(-scores[selected], kind="stable")]
+
+
+def recommend_places(user_preferences: Dict, nearby_POIs: List[Dict], POI_type: str = "stations", _feedback: bool = False,
+                     top_k: Optional[int] = None, profile: Optional[PreferenceProfile] = None) -> List[Dict]:
+    """
+    Generate 1 to 3 personalized recommendations according to the point of interest of the user.
+
+    Args:
+        user_preferences (Dict): preferences loaded from user_preferences.json
+        nearby_POIs (List[Dict]): candidate points of interest with fields: name, provider, distance_km, charging_power_kw
+        POI_type (str): type of point of interest (e.g. "stations", "restaurants", "hobbies")
+        top_k (Optional[int]): only select the k best, without sorting the rest
+            (None: all of them, fully sorted)
+        profile (Optional[PreferenceProfile]): the preferences compiled beforehand
+
+    Returns:
+        List[Dict]: top scored points of interest (equal scores keep the candidates' order)
+    """
+    scored = _scored_places(user_preferences, nearby_POIs, POI_type, _feedback, profile)
+    if top_k is not None:
+        scores = np.fromiter((poi["score"] for poi in scored), np.float64, len(scored))
+        return [scored[i] for i in _top_indices(scores, top_k).tolist()]
+    return sorted(scored, key=lambda x: x["score"], reverse=True)
+
+
+def recommendation_pages(user_preferences: Dict, nearby_POIs: List[Dict], POI_type: str = "stations",
+                         _feedback: bool = False, page_size: int = 3,
+                         profile: Optional[PreferenceProfile] = None) -> Iterator[List[Dict]]:
+    """
+    Yield the recommendations page by page, best first, ranking only what is consumed.
+
+    The candidates are scored once; each page is then a top-k selection in
+    O(n + k log k) rather than a sort of the whole pool. The pages concatenate
+    to recommend_places().
+
+    Args:
+        user_preferences (Dict): preferences loaded from user_preferences.json
+        nearby_POIs (List[Dict]): candidate points of interest
+        POI_type (str): type of point of interest (e.g. "stations", "restaurants", "hobbies")
+        page_size (int): recommendations per page
+        profile (Optional[PreferenceProfile]): the preferences compiled beforehand
+
+    Yields:
+        List[Dict]: the next (at most page_size) recommendations
+    """
+    scored = _scored_places(user_preferences, nearby_POIs, POI_type, _feedback, profile)
+    scores = np.fromiter((poi["score"] for poi in scored), np.float64, len(scored))
+
+    ranked = 0
+    while ranked < len(scored):
+        k = min(ranked + page_size, len(scored))
+        yield [scored[i] for i in _top_indices(scores, k)[ranked:].tolist()]
+        ranked = k
 
 if __name__ == "__main__":
     feedback = load_feedback_scores()
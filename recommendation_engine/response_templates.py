@@ -0,0 +1,225 @@
+######################################################################
+# response_templates.py
+
+# Deterministic spoken answers for the plain listing turns
+# ("here are three nearby chargers..."), rendered in microseconds
+# instead of a full LLM round-trip, and the policy that picks the
+# template or the LLM for each turn:
+#   RESPONSE_MODE=auto      template for simple listings (default)
+#   RESPONSE_MODE=template  always the template
+#   RESPONSE_MODE=llm       always the LLM
+#
+# The latency and the quality scores (BERTScore, ROUGE-L) of every
+# response are appended to recommendation_engine/logs/ so that both
+# paths can be compared.
+#
+# Usage:
+#   python -m recommendation_engine.response_templates   (summary)
+#
+# Functions:
+### - render_recommendations
+### - record_response_metrics
+### - summarize_responses
+######################################################################
+
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from dotenv import load_dotenv
+
+from language_model.metrics import format_metric, percentile
+
+RESPONSE_LOG = Path("recommendation_engine/logs/response_metrics.jsonl")
+
+load_dotenv()
+
+RESPONSE_MODES = ("auto", "template", "llm")
+
+NUMBER_WORDS = ["no", "one", "two", "three", "four", "five"]
+POI_WORDS = {
+    "stations": ("station", "stations"),
+    "restaurants": ("restaurant", "restaurants"),
+    "hobbies": ("place", "places"),
+}
+
+_write_lock = threading.Lock()
+
+
+def _distance(rec: dict) -> str:
+    distance = rec.get("distance_km")
+    if not isinstance(distance, (int, float)):
+        return ""
+    if distance < 1:
+        return f"{int(round(distance * 1000, -1))} metres away"
+    return f"{distance:.1f} km away"
+
+
+def _describe(rec: dict, POIs_type: str) -> str:
+    parts = [rec.get("name", "Unknown")]
+
+    if POIs_type == "stations":
+        provider = rec.get("provider")
+        if provider and provider != "N/A" and provider.lower() not in parts[0].lower():
+            parts[0] += f" by {provider}"
+    else:
+        rating = rec.get("rating")
+        if isinstance(rating, (int, float)) and rating > 0:
+            parts.append(f"rated {rating:g}")
+
+    distance = _distance(rec)
+    if distance:
+        parts.append(distance)
+
+    if POIs_type != "stations":
+        website = rec.get("website")
+        if website and website != "N/A":
+            parts.append(f"website {website}")
+
+    return ", ".join(parts)
+
+
+def render_recommendations(recommendations: List[dict], POIs_type: str = "stations") -> str:
+    """
+    Render a ranked list of points of interest as a short spoken answer.
+
+    Args:
+        recommendations (List[dict]): ranked POIs with name, distance_km and
+            provider (stations) or rating and website (restaurants, hobbies)
+        POIs_type (str): "stations", "restaurants" or "hobbies"
+
+    Returns:
+        str: e.g. "I found two stations nearby: one, Cranfield University by
+            BP Pulse, 1.4 km away; two, ... Which one would you like?"
+    """
+    singular, plural = POI_WORDS.get(POIs_type, ("place", "places"))
+
+    if not recommendations:
+        return f"Sorry, I couldn't find any {plural} nearby."
+
+    if len(recommendations) == 1:
+        return f"I found one {singular} nearby: {_describe(recommendations[0], POIs_type)}. Shall we go there?"
+
+    count = NUMBER_WORDS[len(recommendations)] if len(recommendations) < len(NUMBER_WORDS) else str(len(recommendations))
+    items = "; ".join(
+        f"{NUMBER_WORDS[i + 1] if i + 1 < len(NUMBER_WORDS) else i + 1}, {_describe(rec, POIs_type)}"
+        for i, rec in enumerate(recommendations)
+    )
+    return f"I found {count} {plural} nearby: {items}. Which one would you like?"
+
+
+class ResponsePolicy:
+    def __init__(self, mode: Optional[str] = None):
+        """
+        Initialize the policy.
+
+        Args:
+            mode (Optional[str]): "auto", "template" or "llm" (default: RESPONSE_MODE in .env)
+        """
+        mode = (mode or os.getenv("RESPONSE_MODE", "auto")).strip().lower()
+        if mode not in RESPONSE_MODES:
+            print(f"[WARNING] Unknown response mode '{mode}', using 'auto'")
+            mode = "auto"
+        self.mode = mode
+
+    def use_template(self, intent_source: Optional[str]) -> bool:
+        """
+        Decide whether a listing turn is answered with the template.
+
+        In auto mode the template is used when the query was fully understood
+        locally (intent and slots without ambiguity): the answer is then a
+        plain listing. Queries that needed the LLM to be understood get an
+        LLM answer as well.
+
+        Args:
+            intent_source (Optional[str]): "local", "embedding" or "llm", how the intent
+                was classified
+
+        Returns:
+            bool: True for the template, False for the LLM
+        """
+        if self.mode == "auto":
+            return intent_source in ("local", "embedding")
+        return self.mode == "template"
+
+
+def record_response_metrics(source: str, intent: str, latency: float, bert_score: Optional[float] = None,
+                            rouge_l: Optional[float] = None, interrupted: bool = False):
+    """
+    Append the latency and quality of one response to the response log.
+
+    Args:
+        source (str): "template" or "llm"
+        intent (str): "stations", "restaurants" or "hobbies"
+        latency (float): time to produce the response in seconds
+        bert_score (Optional[float]): BERTScore F1 of the response
+        rouge_l (Optional[float]): ROUGE-L F1 of the response
+        interrupted (bool): the driver cut the response off before its end
+    """
+    entry = {
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "source": source,
+        "intent": intent,
+        "latency_s": round(latency, 6),
+        "BERTScore": bert_score,
+        "RougeScore": rouge_l,
+        "interrupted": interrupted,
+    }
+
+    with _write_lock:
+        RESPONSE_LOG.parent.mkdir(parents=True, exist_ok=True)
+        with RESPONSE_LOG.open("a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+
+
+def summarize_responses(entries: List[Dict]) -> Dict[str, Dict]:
+    """
+    Aggregate latency and quality per response source.
+
+    Returns:
+        Dict[str, Dict]: source → {responses, interrupted, latency p50/p95, mean BERTScore, mean ROUGE-L}
+    """
+    by_source = {}
+    for entry in entries:
+        by_source.setdefault(entry["source"], []).append(entry)
+
+    summary = {}
+    for source, responses in by_source.items():
+        latencies = [r["latency_s"] for r in responses]
+        berts = [r["BERTScore"] for r in responses if r.get("BERTScore") is not None]
+        rouges = [r["RougeScore"] for r in responses if r.get("RougeScore") is not None]
+        summary[source] = {
+            "responses": len(responses),
+            "interrupted": sum(r.get("interrupted", False) for r in responses),
+            "latency_p50_s": percentile(latencies, 50),
+            "latency_p95_s": percentile(latencies, 95),
+            "BERTScore": sum(berts) / len(berts) if berts else None,
+            "RougeScore": sum(rouges) / len(rouges) if rouges else None,
+        }
+    return summary
+
+
+if __name__ == "__main__":
+    import time
+
+    stations = [
+        {"name": "Cranfield University", "provider": "BP Pulse", "distance_km": 1.42},
+        {"name": "Martell House", "provider": "N/A", "distance_km": 1.63},
+        {"name": "Marston Vale Forest Centre", "provider": "Pod Point", "distance_km": 4.99},
+    ]
+    start = time.perf_counter()
+    print(render_recommendations(stations, "stations"))
+    print(f"[INFO] Rendered in {(time.perf_counter() - start) * 1e6:.0f} µs\n")
+
+    entries = []
+    if RESPONSE_LOG.exists():
+        with RESPONSE_LOG.open("r", encoding="utf-8") as f:
+            entries = [json.loads(line) for line in f if line.strip()]
+
+    print(f"{'source':<10} {'count':>6} {'cut off':>8} {'p50 (s)':>9} {'p95 (s)':>9} {'BERTScore':>10} {'ROUGE-L':>8}")
+    for source, s in sorted(summarize_responses(entries).items()):
+        print(f"{source:<10} {s['responses']:>6} {s['interrupted']:>8} {format_metric(s['latency_p50_s']):>9} {format_metric(s['latency_p95_s']):>9} "
+              f"{format_metric(s['BERTScore']):>10} {format_metric(s['RougeScore']):>8}")
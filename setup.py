@@ -1,10 +1,23 @@
 import os 
 
-file_paths = ["intent_classifier/Dataset/", "intent_classifier/Models/", "intent_classifier/Visualisation/", "prompts/", "user/audio/", "user/logs/"]
+file_paths = ["intent_classifier/Dataset/", "intent_classifier/Models/", "intent_classifier/Visualisation/", "prompts/", "recommendation_engine/summaries/", "user/audio/", "user/logs/", "utils/tts_cache/"]
 
 for file_path in file_paths:
     if not os.path.exists(file_path):
         os.makedirs(file_path)
         print(f"Directory {file_path} created.")
     else:
-        print(f"Directory {file_path} already exists.")
\ No newline at end of file
+        print(f"Directory {file_path} already exists.")
+
+# Pre-render the fixed assistant phrases so they are played without synthesis
+try:
+    import pyttsx3
+    from utils.tts import set_zira_voice
+    from utils.phrase_cache import PhraseCache
+
+    engine = pyttsx3.init()
+    set_zira_voice(engine)
+    rendered = PhraseCache(engine.getProperty("voice")).render(engine)
+    print(f"{rendered} assistant phrases pre-rendered.")
+except Exception as e:
+    print(f"Could not pre-render assistant phrases (they will be rendered on first use): {e}")
@@ -0,0 +1,24 @@
+from intent_classifier.slot_extractor import ACTIVITIES, CUISINES, SlotExtractor
+
+# Gazetteers without the mined dataset names, so that the results do not depend on the datasets
+extractor = SlotExtractor(cuisines=CUISINES, activities=ACTIVITIES)
+
+
+def test_known_names_and_conditions():
+    query = "Recommend me a seafood restaurant in 5km with a minimum rating of 4.4 stars."
+    assert extractor.extract(query, "restaurants") == (["restaurants", "seafood", "5km", "4.4"], False)
+    assert extractor.extract("Find me a place for biking near here.", "hobbies") == (["hobbies", "biking"], False)
+
+
+def test_unknown_cuisine_is_ambiguous():
+    assert extractor.extract("Find me a Peruvian restaurant", "restaurants") == (["restaurants"], True)
+
+
+def test_unknown_activity_is_ambiguous():
+    assert extractor.extract("Find me a place for horse riding", "hobbies") == (["hobbies"], True)
+
+
+def test_descriptive_words_are_not_names():
+    assert extractor.extract("Where is the nearest restaurant", "restaurants") == (["restaurants"], False)
+    assert extractor.extract("Find a good fish and chips restaurant", "restaurants") == \
+        (["restaurants", "fish and chips"], False)
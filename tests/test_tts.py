@@ -0,0 +1,49 @@
+import queue
+
+import pytest
+
+pytest.importorskip("pyttsx3")
+pytest.importorskip("sounddevice")
+
+from utils.tts import TTSService, speak_streamed
+
+
+def make_service() -> TTSService:
+    # Service without its TTS thread: utterances stay in the queue
+    service = TTSService.__new__(TTSService)
+    service.queue = queue.Queue()
+    service.current = None
+    service.interruptions = 0
+    return service
+
+
+def test_segments_are_queued_in_order():
+    service = make_service()
+    speech = speak_streamed(["Turn left. ", "Then ", "go straight."], service)
+
+    assert [h.text for h in speech.handles] == ["Turn left.", "Then go straight."]
+    assert not speech.interrupted
+
+
+def test_barge_in_mid_stream_stops_speaking():
+    service = make_service()
+    closed = []
+
+    def deltas():
+        try:
+            yield "The first station is Ionity. "
+            # The driver starts talking while the first sentence is played
+            service.cancel_all()
+            yield "The second one is Tesla. "
+            yield "The third one is Allego."
+        finally:
+            closed.append(True)
+
+    speech = speak_streamed(deltas(), service)
+
+    assert speech.interrupted
+    assert closed == [True]
+    assert [h.text for h in speech.handles] == ["The first station is Ionity."]
+    assert speech.handles[0].cancelled
+    # Nothing left to be spoken after the barge-in
+    assert service.queue.empty()
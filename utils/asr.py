@@ -4,17 +4,45 @@ from scipy.io.wavfile import write
 from pathlib import Path
 from datetime import datetime
 import time
+import queue
+import numpy as np
+from functools import lru_cache
+from typing import Callable, Optional, Tuple
 from faster_whisper import WhisperModel
 
-
-# Load Whisper-small model once
-model = whisper.load_model("small")
-fast_model = WhisperModel("small", device="cpu", compute_type="int8")
-
 # Define the output directory
 AUDIO_DIR = Path("user/audio")
 AUDIO_DIR.mkdir(parents=True, exist_ok=True)
 
+
+@lru_cache(maxsize=None)
+def load_whisper_model(model_size: str = "small"):
+    """
+    Load a Whisper model once per process and reuse it afterwards.
+
+    Args:
+        model_size (str): Whisper model size (e.g. "tiny", "base", "small")
+
+    Returns:
+        whisper.Whisper: the loaded model
+    """
+    return whisper.load_model(model_size)
+
+
+@lru_cache(maxsize=None)
+def load_fast_model(model_size: str = "small", compute_type: str = "int8") -> WhisperModel:
+    """
+    Load a faster-whisper model once per process and reuse it afterwards.
+
+    Args:
+        model_size (str): Whisper model size (e.g. "tiny", "base", "small")
+        compute_type (str): CTranslate2 compute type (e.g. "int8", "float32")
+
+    Returns:
+        WhisperModel: the loaded model
+    """
+    return WhisperModel(model_size, device="cpu", compute_type=compute_type)
+
 def record_audio(duration: int = 5, fs: int = 16000) -> str:
     """
     Record audio from the microphone and save it to user/audio/ as a .wav file.
@@ -39,22 +67,25 @@ def record_audio(duration: int = 5, fs: int = 16000) -> str:
     return str(file_path)
 
 
-def recognize_speech(audio_path: str) -> str:
+def recognize_speech(audio_path: str, model_size: str = "small", beam_size: Optional[int] = None) -> str:
     """
     Transcribe speech from an audio file using Whisper-small.
 
     Args:
         audio_path (str): Path to the audio file (.wav)
+        model_size (str): Whisper model size (default "small")
+        beam_size (Optional[int]): beam width, None for greedy decoding
 
     Returns:
         str: Transcribed text
     """
-    print("[INFO] Transcribing audio with Whisper-small...")
-    result = model.transcribe(audio_path)
+    print(f"[INFO] Transcribing audio with Whisper-{model_size}...")
+    model = load_whisper_model(model_size)
+    result = model.transcribe(audio_path, beam_size=beam_size)
     return result["text"].strip()
 
 
-def recognize_speech_fast(audio_path: str) -> str:
+def recognize_speech_fast(audio_path: str, model_size: str = "small", compute_type: str = "int8", beam_size: int = 5) -> str:
     """
     Transcribe speech from an audio file using faster-whisper.
 
@@ -64,16 +95,73 @@ def recognize_speech_fast(audio_path: str) -> str:
 
     Args:
         audio_path (str): Path to the audio file (.wav) to transcribe.
+        model_size (str): Whisper model size (default "small").
+        compute_type (str): CTranslate2 compute type (default "int8").
+        beam_size (int): beam width used during decoding (default 5).
 
     Returns:
         str: The transcribed text from the audio file.
     """
     print("[INFO] Transcribing audio with faster-whisper...")
-    segments, _ = fast_model.transcribe(audio_path)
+    fast_model = load_fast_model(model_size, compute_type)
+    segments, _ = fast_model.transcribe(audio_path, beam_size=beam_size)
     result = " ".join(segment.text for segment in segments)
     return result.strip()
 
 
+def record_audio_streaming(duration: int = 5, fs: int = 16000, step: float = 1.0,
+                           on_partial: Optional[Callable[[str], None]] = None) -> Tuple[str, str]:
+    """
+    Record audio from the microphone while transcribing it incrementally.
+
+    Every `step` seconds the audio captured so far is transcribed with a
+    greedy faster-whisper pass and the partial hypothesis is handed to
+    `on_partial`, so downstream components can react before the driver
+    has finished talking. Once the recording is over, the full audio is
+    saved to user/audio/ and transcribed with the regular beam search.
+
+    Args:
+        duration (int): Duration in seconds (default 5s)
+        fs (int): Sampling rate (default 16kHz)
+        step (float): Interval in seconds between two partial hypotheses
+        on_partial (Callable[[str], None]): callback receiving each partial hypothesis
+
+    Returns:
+        Tuple[str, str]: path to the saved audio file and final transcription
+    """
+    print(f"[INFO] Recording {duration}s of audio (streaming)...")
+    fast_model = load_fast_model()
+    blocks = queue.Queue()
+
+    def callback(indata, frames, time_info, status):
+        blocks.put(indata.copy())
+
+    chunks = []
+    recorded = 0
+    next_partial = int(step * fs)
+
+    with sd.InputStream(samplerate=fs, channels=1, dtype="float32", callback=callback):
+        while recorded < duration * fs:
+            chunk = blocks.get()
+            chunks.append(chunk)
+            recorded += len(chunk)
+
+            if on_partial and recorded >= next_partial and recorded < duration * fs:
+                next_partial += int(step * fs)
+                segments, _ = fast_model.transcribe(np.concatenate(chunks).flatten(), beam_size=1)
+                partial = " ".join(segment.text for segment in segments).strip()
+                if partial:
+                    on_partial(partial)
+
+    audio = np.concatenate(chunks)[:duration * fs]
+
+    filename = f"audio_{datetime.now().strftime('%Y%m%d_%H%M%S')}.wav"
+    file_path = AUDIO_DIR / filename
+    write(file_path, fs, audio)
+    print(f"[INFO] Audio saved to: {file_path}")
+
+    return str(file_path), recognize_speech_fast(str(file_path))
+
 
 if __name__ == "__main__":
     # Audio recording timing
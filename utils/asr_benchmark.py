@@ -0,0 +1,267 @@
+######################################################################
+# asr_benchmark.py
+
+# Batch-transcribes a directory of .wav files (e.g. user/audio/) with
+# Whisper and faster-whisper across several model configurations and
+# reports, for each configuration:
+# - real-time factor (transcription time / audio duration)
+# - p50 / p95 latency per file
+# - peak resident memory of the worker processes
+# - word error rate (WER) against reference transcripts
+#
+# Reference transcripts are read from a sidecar <audio>.txt file next to
+# each recording, or from a JSON file mapping file names to text.
+#
+# Usage:
+#   python -m utils.asr_benchmark --audio-dir user/audio \
+#       --backends whisper faster --model-sizes tiny base small \
+#       --compute-types int8 float32 --beam-sizes 1 5 --workers 2
+######################################################################
+
+import argparse
+import json
+import multiprocessing
+import re
+import sys
+import time
+import wave
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from language_model.metrics import percentile
+
+AUDIO_DIR = Path("user/audio")
+
+# Worker-local transcription settings, set once by _init_worker
+_backend = None
+_model_size = None
+_compute_type = None
+# Shared by all the workers of a pool, see _warm_up
+_ready = None
+
+
+def _peak_rss_mb() -> float:
+    """
+    Return the peak resident set size of the current process in MB.
+    """
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS and in kilobytes on Linux
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    except ImportError:
+        # Windows: no resource module, psutil exposes the peak working set
+        import psutil
+        info = psutil.Process().memory_info()
+        return getattr(info, "peak_wset", info.rss) / (1024 * 1024)
+
+
+def _init_worker(backend: str, model_size: str, compute_type: str, ready):
+    """
+    Load the model of the benchmarked configuration once per worker process.
+    """
+    global _backend, _model_size, _compute_type, _ready
+    from utils.asr import load_fast_model, load_whisper_model
+
+    _backend, _model_size, _compute_type, _ready = backend, model_size, compute_type, ready
+    if backend == "whisper":
+        load_whisper_model(model_size)
+    else:
+        load_fast_model(model_size, compute_type)
+
+
+def _warm_up(_: int) -> float:
+    """
+    No-op task used to force the pool to start (and load) its workers.
+
+    Each task waits on the pool's barrier, so a worker that is done loading
+    cannot take the task of one that is still loading: every worker runs
+    exactly one warm-up task, after its model is loaded.
+    """
+    _ready.wait()
+    return _peak_rss_mb()
+
+
+def _transcribe(audio_path: str, beam_size: int) -> Tuple[str, str, float, float]:
+    """
+    Transcribe one file in a worker process.
+
+    Returns:
+        Tuple[str, str, float, float]: (audio path, text, latency in s, peak RSS in MB)
+    """
+    from utils.asr import recognize_speech, recognize_speech_fast
+
+    start = time.perf_counter()
+    if _backend == "whisper":
+        text = recognize_speech(audio_path, model_size=_model_size, beam_size=beam_size if beam_size > 1 else None)
+    else:
+        text = recognize_speech_fast(audio_path, model_size=_model_size, compute_type=_compute_type, beam_size=beam_size)
+    elapsed = time.perf_counter() - start
+
+    return audio_path, text, elapsed, _peak_rss_mb()
+
+
+def audio_duration(audio_path: Path) -> float:
+    """
+    Return the duration of a .wav file in seconds.
+    """
+    with wave.open(str(audio_path), "rb") as f:
+        return f.getnframes() / float(f.getframerate())
+
+
+def load_references(audio_files: List[Path], references_file: Optional[Path] = None) -> Dict[str, str]:
+    """
+    Load reference transcripts for the given audio files.
+
+    Args:
+        audio_files (List[Path]): recordings to benchmark
+        references_file (Optional[Path]): JSON file {file name: transcript}
+
+    Returns:
+        Dict[str, str]: file name → reference transcript
+    """
+    references = {}
+    if references_file:
+        with references_file.open("r", encoding="utf-8") as f:
+            references.update(json.load(f))
+
+    for audio_file in audio_files:
+        sidecar = audio_file.with_suffix(".txt")
+        if audio_file.name not in references and sidecar.exists():
+            references[audio_file.name] = sidecar.read_text(encoding="utf-8").strip()
+
+    return references
+
+
+def normalize_words(text: str) -> List[str]:
+    """
+    Lowercase a transcript, drop punctuation and split it into words.
+    """
+    return re.sub(r"[^\w\s']", " ", text.lower()).split()
+
+
+def word_edit_distance(reference: List[str], hypothesis: List[str]) -> int:
+    """
+    Levenshtein distance between two word sequences (substitutions, insertions, deletions).
+    """
+    previous = list(range(len(hypothesis) + 1))
+    for i, ref_word in enumerate(reference, start=1):
+        current = [i] + [0] * len(hypothesis)
+        for j, hyp_word in enumerate(hypothesis, start=1):
+            current[j] = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ref_word != hyp_word),
+            )
+        previous = current
+    return previous[-1]
+
+
+def benchmark_config(audio_files: List[Path], durations: Dict[str, float], references: Dict[str, str],
+                     backend: str, model_size: str, compute_type: str, beam_size: int, workers: int = 2) -> Dict:
+    """
+    Transcribe all audio files with one configuration using a process pool.
+
+    Returns:
+        Dict: configuration and its aggregated metrics
+    """
+    print(f"[INFO] Benchmarking {backend} {model_size} ({compute_type}, beam={beam_size}) on {len(audio_files)} files...")
+
+    load_start = time.perf_counter()
+    ready = multiprocessing.Barrier(workers)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(backend, model_size, compute_type, ready)) as pool:
+        # Make sure every worker has loaded its model before timing the files
+        list(pool.map(_warm_up, range(workers)))
+        load_time = time.perf_counter() - load_start
+
+        run_start = time.perf_counter()
+        results = list(pool.map(_transcribe, [str(f) for f in audio_files], [beam_size] * len(audio_files)))
+        wall_time = time.perf_counter() - run_start
+
+    latencies = [elapsed for _, _, elapsed, _ in results]
+    total_audio = sum(durations.values())
+
+    errors, ref_words = 0, 0
+    transcripts = {}
+    for audio_path, text, _, _ in results:
+        name = Path(audio_path).name
+        transcripts[name] = text
+        if name in references:
+            reference = normalize_words(references[name])
+            errors += word_edit_distance(reference, normalize_words(text))
+            ref_words += len(reference)
+
+    return {
+        "backend": backend,
+        "model_size": model_size,
+        "compute_type": compute_type,
+        "beam_size": beam_size,
+        "files": len(results),
+        "load_time_s": round(load_time, 3),
+        "wall_time_s": round(wall_time, 3),
+        "rtf": round(sum(latencies) / total_audio, 3) if total_audio else None,
+        "p50_latency_s": round(percentile(latencies, 50), 3),
+        "p95_latency_s": round(percentile(latencies, 95), 3),
+        "peak_rss_mb": round(max(rss for _, _, _, rss in results), 1) if results else 0.0,
+        "wer": round(errors / ref_words, 4) if ref_words else None,
+        "transcripts": transcripts,
+    }
+
+
+def print_report(results: List[Dict]):
+    """
+    Print a comparison table of all benchmarked configurations.
+    """
+    header = f"{'backend':<8} {'model':<8} {'compute':<8} {'beam':>4} {'RTF':>7} {'p50 (s)':>8} {'p95 (s)':>8} {'RSS (MB)':>9} {'WER':>7}"
+    print("\n" + header)
+    print("-" * len(header))
+    for r in results:
+        rtf = f"{r['rtf']:.3f}" if r["rtf"] is not None else "n/a"
+        wer = f"{r['wer']:.3f}" if r["wer"] is not None else "n/a"
+        print(f"{r['backend']:<8} {r['model_size']:<8} {r['compute_type']:<8} {r['beam_size']:>4} {rtf:>7} "
+              f"{r['p50_latency_s']:>8.3f} {r['p95_latency_s']:>8.3f} {r['peak_rss_mb']:>9.1f} {wer:>7}")
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Benchmark Whisper / faster-whisper on recorded audio.")
+    parser.add_argument("--audio-dir", type=Path, default=AUDIO_DIR, help="directory containing .wav files")
+    parser.add_argument("--references", type=Path, default=None, help="JSON file mapping file names to transcripts")
+    parser.add_argument("--backends", nargs="+", choices=["whisper", "faster"], default=["whisper", "faster"])
+    parser.add_argument("--model-sizes", nargs="+", default=["small"])
+    parser.add_argument("--compute-types", nargs="+", default=["int8"], help="faster-whisper compute types")
+    parser.add_argument("--beam-sizes", nargs="+", type=int, default=[5])
+    parser.add_argument("--workers", type=int, default=2, help="number of worker processes")
+    parser.add_argument("--limit", type=int, default=None, help="only use the first N files")
+    parser.add_argument("--output", type=Path, default=None, help="write the full results as JSON")
+    args = parser.parse_args(argv)
+
+    audio_files = sorted(args.audio_dir.glob("*.wav"))[:args.limit]
+    if not audio_files:
+        print(f"[ERROR] No .wav files found in {args.audio_dir}")
+        return
+
+    durations = {f.name: audio_duration(f) for f in audio_files}
+    references = load_references(audio_files, args.references)
+    print(f"[INFO] {len(audio_files)} files, {sum(durations.values()):.1f}s of audio, {len(references)} reference transcripts")
+
+    results = []
+    for backend, model_size, beam_size in product(args.backends, args.model_sizes, args.beam_sizes):
+        # Whisper runs in fp32 on CPU, compute types only apply to faster-whisper
+        compute_types = args.compute_types if backend == "faster" else ["float32"]
+        for compute_type in compute_types:
+            results.append(benchmark_config(audio_files, durations, references, backend,
+                                            model_size, compute_type, beam_size, args.workers))
+
+    print_report(results)
+
+    if args.output:
+        with args.output.open("w", encoding="utf-8") as f:
+            json.dump(results, f, indent=4)
+        print(f"\n[INFO] Results saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
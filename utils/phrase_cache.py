@@ -0,0 +1,125 @@
+######################################################################
+# phrase_cache.py
+
+# Pre-rendered audio for the fixed sentences of the assistant.
+#
+# Greetings, prompts and error messages never change, so they are
+# synthesized once to .wav files (at install time with setup.py, or the
+# first time the TTS service starts) and played directly afterwards.
+# Files are keyed by voice + text: changing the voice or the wording
+# simply produces a new file. Any other text falls back to live synthesis.
+#
+# Usage:
+#   python -m utils.phrase_cache        (pre-render all known phrases)
+######################################################################
+
+import hashlib
+import time
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+import sounddevice as sd
+from scipy.io import wavfile
+
+CACHE_DIR = Path("utils/tts_cache")
+
+# Constant utterances of main.py and the DialogueManager
+KNOWN_PHRASES = [
+    "Hello ! I'm delighted to welcome you on board. I'm your driving assistant, at your service to navigate according "
+    "to your points of interest. Before we start, please answer a few questions so that I can get to know your preferences better.",
+    "Hello ! I'm delighted to welcome you on board. I'm your driving assistant, at your service to navigate according "
+    "to your points of interest. Let's get started.",
+    "What would you like to know?",
+    "Sorry, I couldn't record your audio. Please try again.",
+    "No points of interest found nearby.",
+    "No recommendations available based on your preferences.",
+    "Okay, I’ll search for alternative recommendations.",
+    "No more recommendations to suggest.",
+    "Thanks for your feedback! It's been logged for future improvements.",
+    "Thank you for using our service. Goodbye!",
+]
+
+
+class PhraseCache:
+    def __init__(self, voice: str, cache_dir: Path = CACHE_DIR):
+        """
+        Initialize the cache for a given voice.
+
+        Args:
+            voice (str): identifier of the TTS voice (part of the cache key)
+            cache_dir (Path): directory holding the rendered .wav files
+        """
+        self.voice = voice or "default"
+        self.cache_dir = cache_dir
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def path(self, text: str) -> Path:
+        """
+        Return the file a text is (or would be) rendered to.
+        """
+        key = hashlib.sha1(f"{self.voice}\n{text.strip()}".encode("utf-8")).hexdigest()
+        return self.cache_dir / f"{key}.wav"
+
+    def get(self, text: str) -> Optional[Path]:
+        """
+        Return the rendered file of a text, or None if it is not cached.
+        """
+        path = self.path(text)
+        if path.exists() and path.stat().st_size > 0:
+            return path
+        return None
+
+    def render(self, engine, texts: Iterable[str] = KNOWN_PHRASES) -> int:
+        """
+        Synthesize the texts that are not cached yet.
+
+        Args:
+            engine: pyttsx3 engine (must be used from the thread that owns it)
+            texts (Iterable[str]): texts to pre-render
+
+        Returns:
+            int: number of newly rendered files
+        """
+        missing = [text for text in texts if self.get(text) is None]
+        if not missing:
+            return 0
+
+        print(f"[INFO] Pre-rendering {len(missing)} assistant phrases...")
+        for text in missing:
+            engine.save_to_file(text, str(self.path(text)))
+        engine.runAndWait()
+        return len(missing)
+
+
+def play_file(path: Path, should_stop: Callable[[], bool] = lambda: False) -> bool:
+    """
+    Play a .wav file, stopping early if `should_stop()` becomes true.
+
+    Args:
+        path (Path): audio file to play
+        should_stop (Callable[[], bool]): polled during playback
+
+    Returns:
+        bool: True if the file was played entirely
+    """
+    fs, data = wavfile.read(path)
+    sd.play(data, fs)
+    while sd.get_stream().active:
+        if should_stop():
+            sd.stop()
+            return False
+        time.sleep(0.02)
+    return True
+
+
+if __name__ == "__main__":
+    import pyttsx3
+    from utils.tts import set_zira_voice
+
+    engine = pyttsx3.init()
+    set_zira_voice(engine)
+    cache = PhraseCache(engine.getProperty("voice"))
+
+    start = time.time()
+    rendered = cache.render(engine)
+    print(f"[INFO] {rendered} phrases rendered in {time.time() - start:.2f} seconds ({cache.cache_dir})")
@@ -1,9 +1,20 @@
 import pyttsx3
+import queue
+import re
+import threading
 import time
+import numpy as np
+import sounddevice as sd
+from concurrent.futures import Future
+from typing import Callable, Iterable, List, Optional
 
-engine = pyttsx3.init()
+from utils.phrase_cache import PhraseCache, play_file
 
-def set_zira_voice():
+# Words ending with a period that do not end a sentence
+ABBREVIATIONS = {"dr", "st", "mr", "mrs", "ms", "vs", "etc", "approx", "ave", "rd", "e.g", "i.e"}
+
+
+def set_zira_voice(engine):
     # Use "Microsoft Zira" voice if available
     for voice in engine.getProperty('voices'):
         if "zira" in voice.name.lower():
@@ -11,11 +22,390 @@ def set_zira_voice():
             return
     print("Zira voice not found. Using default.")
 
-set_zira_voice()
+
+class SpeechHandle:
+    def __init__(self, text: str):
+        """
+        Track one utterance queued on the TTS service.
+
+        Attributes:
+            text (str): the text to speak
+            started (threading.Event): set as soon as playback begins
+                (or when the utterance is dropped without being played)
+            done (Future): resolved with True once fully spoken,
+                False if it was cancelled or interrupted
+        """
+        self.text = text
+        self.started = threading.Event()
+        self.done = Future()
+        self.started_at = None
+        self.cancelled = False
+
+    def cancel(self):
+        """
+        Stop this utterance (or skip it if it has not started yet).
+        """
+        self.cancelled = True
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until the utterance has been spoken or cancelled.
+
+        Returns:
+            bool: True if it was fully spoken
+        """
+        return self.done.result(timeout=timeout)
+
+
+class BargeInMonitor:
+    def __init__(self, on_speech: Callable[[], None], threshold: float = 0.02, min_blocks: int = 3, fs: int = 16000, block_ms: int = 50):
+        """
+        Listen to the microphone and call `on_speech` when the driver starts talking.
+
+        Speech is detected with a simple energy threshold: `min_blocks`
+        consecutive blocks whose RMS is above `threshold`. The threshold must
+        be high enough not to trigger on the assistant's own voice.
+
+        Args:
+            on_speech (Callable): called once when speech is detected
+            threshold (float): RMS level (float32 samples) considered as speech
+            min_blocks (int): number of consecutive loud blocks required
+            fs (int): sampling rate
+            block_ms (int): block duration in milliseconds
+        """
+        self.on_speech = on_speech
+        self.threshold = threshold
+        self.min_blocks = min_blocks
+        self.fs = fs
+        self.blocksize = int(fs * block_ms / 1000)
+        self.loud_blocks = 0
+        self.triggered = False
+        self.stream = None
+
+    def _callback(self, indata, frames, time_info, status):
+        if self.triggered:
+            return
+        rms = float(np.sqrt(np.mean(np.square(indata))))
+        self.loud_blocks = self.loud_blocks + 1 if rms > self.threshold else 0
+        if self.loud_blocks >= self.min_blocks:
+            self.triggered = True
+            self.on_speech()
+
+    def start(self):
+        self.loud_blocks = 0
+        self.triggered = False
+        try:
+            self.stream = sd.InputStream(samplerate=self.fs, channels=1, dtype="float32",
+                                         blocksize=self.blocksize, callback=self._callback)
+            self.stream.start()
+        except Exception as e:
+            print(f"[WARNING] Barge-in monitor unavailable: {e}")
+            self.stream = None
+
+    def stop(self):
+        if self.stream is not None:
+            self.stream.stop()
+            self.stream.close()
+            self.stream = None
+
+
+class TTSService:
+    def __init__(self, barge_in: bool = False, barge_in_threshold: float = 0.02, use_phrase_cache: bool = True):
+        """
+        Speak text on a dedicated thread so the caller is never blocked.
+
+        Utterances are queued and spoken in order. Each call to say() returns
+        a SpeechHandle that can be waited on or cancelled.
+
+        Args:
+            barge_in (bool): interrupt playback when the driver starts speaking
+            barge_in_threshold (float): microphone RMS level considered as speech
+            use_phrase_cache (bool): play pre-rendered audio for the fixed assistant phrases
+        """
+        self.queue = queue.Queue()
+        self.use_phrase_cache = use_phrase_cache
+        self.phrases = None
+        self.current = None
+        # Incremented by cancel_all(), so that producers (speak_streamed) stop queuing
+        self.interruptions = 0
+        self.barge_in = barge_in
+        self.barge_in_threshold = barge_in_threshold
+        self.thread = threading.Thread(target=self._run, name="tts", daemon=True)
+        self.thread.start()
+
+    def say(self, text: str) -> SpeechHandle:
+        """
+        Queue a text to be spoken.
+
+        Args:
+            text (str): the text to speak
+
+        Returns:
+            SpeechHandle: handle to track or cancel the utterance
+        """
+        handle = SpeechHandle(text)
+        self.queue.put(handle)
+        return handle
+
+    def cancel_all(self):
+        """
+        Drop every queued utterance and interrupt the one being spoken.
+        """
+        self.interruptions += 1
+        while True:
+            try:
+                handle = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if handle is None:
+                # Keep the shutdown request
+                self.queue.put(None)
+                break
+            handle.cancel()
+            handle.started.set()
+            handle.done.set_result(False)
+        if self.current is not None:
+            self.current.cancel()
+
+    def is_speaking(self) -> bool:
+        return self.current is not None
+
+    def shutdown(self, wait: bool = True):
+        """
+        Stop the service once the queued utterances have been spoken.
+        """
+        self.queue.put(None)
+        if wait:
+            self.thread.join()
+
+    def _on_barge_in(self):
+        if self.current is not None:
+            print("[INFO] Barge-in detected, stopping playback")
+            # The driver is talking: drop the rest of the answer as well
+            self.cancel_all()
+
+    def _on_word(self, name, location, length):
+        # pyttsx3 callbacks run on the TTS thread, the only place where
+        # engine.stop() can interrupt runAndWait()
+        if self.current is not None and self.current.cancelled:
+            self.engine.stop()
+
+    def _play_cached(self, handle: SpeechHandle) -> bool:
+        """
+        Play the pre-rendered audio of the utterance if there is one.
+
+        Returns:
+            bool: True if the utterance was handled from the cache
+        """
+        path = self.phrases.get(handle.text) if self.phrases else None
+        if path is None:
+            return False
+        try:
+            handle.started_at = time.time()
+            handle.started.set()
+            play_file(path, should_stop=lambda: handle.cancelled)
+            return True
+        except Exception as e:
+            print(f"[WARNING] Could not play cached phrase, synthesizing it: {e}")
+            return False
+
+    def _run(self):
+        # The engine must be created and driven from the same thread
+        self.engine = pyttsx3.init()
+        set_zira_voice(self.engine)
+
+        if self.use_phrase_cache:
+            # Render the fixed phrases that are not cached yet (first use only)
+            self.phrases = PhraseCache(self.engine.getProperty("voice"))
+            try:
+                self.phrases.render(self.engine)
+            except Exception as e:
+                print(f"[WARNING] Could not pre-render assistant phrases: {e}")
+
+        self.engine.connect("started-word", self._on_word)
+        monitor = BargeInMonitor(self._on_barge_in, threshold=self.barge_in_threshold) if self.barge_in else None
+
+        while True:
+            handle = self.queue.get()
+            if handle is None:
+                break
+            if handle.cancelled:
+                handle.started.set()
+                handle.done.set_result(False)
+                continue
+
+            self.current = handle
+            if monitor:
+                monitor.start()
+
+            try:
+                if not self._play_cached(handle):
+                    self.engine.say(handle.text)
+                    handle.started_at = time.time()
+                    handle.started.set()
+                    self.engine.runAndWait()
+            except Exception as e:
+                print(f"[ERROR] Speech synthesis failed: {e}")
+                handle.cancel()
+            finally:
+                if monitor:
+                    monitor.stop()
+                self.current = None
+
+            handle.started.set()
+            handle.done.set_result(not handle.cancelled)
+
+
+class SentenceSegmenter:
+    def __init__(self, min_clause_chars: int = 80):
+        """
+        Split a stream of text deltas into speakable segments.
+
+        A segment ends at a sentence boundary (., !, ? followed by a space),
+        at a line break (e.g. bullet lists), or at a clause boundary (, ; :)
+        once the segment is long enough to be worth speaking on its own.
+
+        Args:
+            min_clause_chars (int): minimum length before splitting on a clause boundary
+        """
+        self.min_clause_chars = min_clause_chars
+        self.buffer = ""
+
+    def _boundary(self) -> int:
+        """
+        Return the end index of the first complete segment in the buffer, or -1.
+        """
+        for match in re.finditer(r"[.!?]+(?=\s)|\n|[,;:](?=\s)", self.buffer):
+            end = match.end()
+            char = match.group()[0]
+
+            if char == ".":
+                # "St. Albans", "Dr. Smith" are not the end of a sentence
+                words = self.buffer[:match.start()].split()
+                if words and words[-1].lower().strip("(") in ABBREVIATIONS:
+                    continue
+            elif char in ",;:" and end < self.min_clause_chars:
+                continue
+
+            return end
+        return -1
+
+    def feed(self, delta: str) -> List[str]:
+        """
+        Add a text delta and return the segments it completed.
+        """
+        self.buffer += delta
+        segments = []
+        end = self._boundary()
+        while end != -1:
+            segment = self.buffer[:end].strip()
+            self.buffer = self.buffer[end:]
+            if segment:
+                segments.append(segment)
+            end = self._boundary()
+        return segments
+
+    def flush(self) -> List[str]:
+        """
+        Return whatever is left in the buffer at the end of the stream.
+        """
+        segment = self.buffer.strip()
+        self.buffer = ""
+        return [segment] if segment else []
+
+
+class StreamedSpeech:
+    def __init__(self):
+        """
+        Result of speak_streamed(): the full text and one handle per spoken segment.
+        """
+        self.text = ""
+        self.handles = []
+        self.start_time = time.time()
+        # Set when the stream was abandoned because playback was interrupted
+        self.interrupted = False
+
+    @property
+    def last_handle(self) -> Optional[SpeechHandle]:
+        return self.handles[-1] if self.handles else None
+
+    def time_to_first_audio(self) -> Optional[float]:
+        """
+        Seconds between the start of the stream and the beginning of playback.
+        """
+        if not self.handles:
+            return None
+        first = self.handles[0]
+        first.started.wait()
+        if first.started_at is None:
+            return None
+        return first.started_at - self.start_time
+
+
+def speak_streamed(deltas: Iterable[str], service: "TTSService", on_delta: Optional[Callable[[str], None]] = None) -> StreamedSpeech:
+    """
+    Speak a streamed text (e.g. LLM token deltas) segment by segment.
+
+    Each sentence or long clause is queued on the TTS service as soon as it is
+    complete, so playback starts after the first sentence instead of after the
+    whole response. Returns once the stream is exhausted, while the last
+    segments may still be playing. If playback is interrupted (barge-in or
+    cancel_all()), nothing more is queued and the stream is closed, which also
+    cancels the underlying request.
+
+    Args:
+        deltas (Iterable[str]): successive pieces of text
+        service (TTSService): service used to speak the segments
+        on_delta (Callable[[str], None]): optional callback for each delta (e.g. display)
+
+    Returns:
+        StreamedSpeech: full text and the handles of the queued segments
+    """
+    speech = StreamedSpeech()
+    segmenter = SentenceSegmenter()
+    interruptions = service.interruptions
+
+    def queue_segments(segments: List[str]) -> bool:
+        for segment in segments:
+            if service.interruptions != interruptions:
+                # The driver took over: do not start talking again
+                speech.interrupted = True
+                return False
+            speech.handles.append(service.say(segment))
+        return True
+
+    try:
+        for delta in deltas:
+            speech.text += delta
+            if on_delta:
+                on_delta(delta)
+            if not queue_segments(segmenter.feed(delta)):
+                break
+        else:
+            queue_segments(segmenter.flush())
+    finally:
+        if speech.interrupted and hasattr(deltas, "close"):
+            deltas.close()
+
+    return speech
+
+
+_service = None
+
+
+def get_tts_service() -> TTSService:
+    """
+    Return the shared TTS service, starting it on first use.
+    """
+    global _service
+    if _service is None:
+        _service = TTSService()
+    return _service
+
 
 def speak(text):
-    engine.say(text)
-    engine.runAndWait()
+    # Blocking helper: queue the text and wait until it has been spoken
+    get_tts_service().say(text).wait()
 
 # Example usage (for testing or manual call)
 if __name__ == "__main__":
@@ -24,5 +414,13 @@ if __name__ == "__main__":
     start = time.time()
     speak(texte)
     end = time.time()
-    
-    print(f"[INFO] Speech synthesis completed in {end - start:.2f} seconds")
\ No newline at end of file
+
+    print(f"[INFO] Speech synthesis completed in {end - start:.2f} seconds")
+
+    # Non-blocking usage with cancellation
+    service = get_tts_service()
+    handle = service.say("This sentence will be interrupted after one second.")
+    handle.started.wait()
+    time.sleep(1)
+    handle.cancel()
+    print(f"[INFO] Fully spoken: {handle.wait()}")